@@ -0,0 +1,265 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - TRIAL ABUSE GUARD
+# In-memory sliding-window limits on trial starts per IP address, per /24
+# subnet and per Discord ID, answered before the request touches SQLite and
+# replayed from the trials table after a restart
+# ==============================================================================
+
+from __future__ import annotations
+
+import ipaddress
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple
+
+from config import Config
+from database import Database, db
+from metrics import metrics, TRIAL_GUARD_DECISIONS
+
+# ==============================================================================
+# 🔧 LOGGING
+# ==============================================================================
+
+log = logging.getLogger("abuse_guard")
+
+# ==============================================================================
+# 🪟 SLIDING WINDOW
+# ==============================================================================
+
+class SlidingWindowLimit:
+    """
+    At most `limit` events per key in any `window`-second span.
+
+    Each key keeps only its newest `limit` timestamps, oldest first, so the
+    key is over the limit exactly when that deque is full and its oldest
+    entry is still inside the window: one comparison per check, and memory
+    per key never grows past `limit`. A limit of 0 disables the rule.
+    """
+
+    __slots__ = ("name", "limit", "window", "events", "denied")
+
+    def __init__(self, name: str, limit: int, window: int):
+        self.name = name
+        self.limit = max(0, limit)
+        self.window = window
+        self.events: Dict[Hashable, Deque[float]] = {}
+        self.denied = 0
+
+    def retry_after(self, key: Hashable, now: float) -> float:
+        """Seconds until `key` may start again (0 when it may start now)."""
+        if not self.limit or key is None:
+            return 0.0
+        events = self.events.get(key)
+        if events is None or len(events) < self.limit:
+            return 0.0
+        return max(0.0, events[0] + self.window - now)
+
+    def record(self, key: Hashable, at: float) -> None:
+        if not self.limit or key is None:
+            return
+        events = self.events.get(key)
+        if events is None:
+            events = self.events[key] = deque(maxlen=self.limit)
+        events.append(at)
+
+    def count(self, key: Hashable, now: float) -> int:
+        cutoff = now - self.window
+        return sum(1 for at in self.events.get(key, ()) if at > cutoff)
+
+    def prune(self, now: float) -> int:
+        """Drop keys whose newest event has left the window."""
+        cutoff = now - self.window
+        stale = [key for key, events in self.events.items() if events[-1] <= cutoff]
+        for key in stale:
+            del self.events[key]
+        return len(stale)
+
+    def hottest(self, now: float, limit: int = 10) -> List[Dict[str, Any]]:
+        counts = ((key, self.count(key, now)) for key in self.events)
+        ranked = sorted((item for item in counts if item[1]), key=lambda item: item[1], reverse=True)
+        return [{'key': str(key), 'starts': starts} for key, starts in ranked[:limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        return {'limit': self.limit, 'window': self.window, 'tracked': len(self.events), 'denied': self.denied}
+
+# ==============================================================================
+# 🛡️ TRIAL GUARD
+# ==============================================================================
+
+def subnet_of(ip: Optional[str]) -> Optional[str]:
+    """/24 for IPv4, /64 for IPv6 (one customer allocation); None for junk."""
+    if not ip:
+        return None
+    if ':' not in ip:
+        head, sep, _ = ip.rpartition('.')
+        return f"{head}.0/24" if sep else None
+    try:
+        return str(ipaddress.ip_network(f"{ip}/64", strict=False))
+    except ValueError:
+        return None
+
+
+def is_public(ip: Optional[str]) -> bool:
+    """True for a routable client address (not private, loopback, link-local or junk)."""
+    if not ip:
+        return False
+    try:
+        return ipaddress.ip_address(ip).is_global
+    except ValueError:
+        return False
+
+
+class TrialGuard:
+    """
+    Decides whether a trial flow may start, from memory only.
+
+    `check(ip)` peeks at the address and subnet limits before any database
+    work and `check(ip, discord_id)` is the final gate before
+    `create_trial_session`; `record` counts the start only once a session
+    exists. Refused attempts are never recorded, so a client hammering the
+    endpoint doesn't push its own window forward. Two racing requests can
+    both pass the gate; the database's per-user check still backs that up.
+
+    Private, loopback and unparseable addresses skip the address and subnet
+    rules: behind an unconfigured proxy every client would share one.
+
+    State is lost on restart; `warm_up` replays recent trials (through the
+    (ip_address, created_at) index) and trial sessions, which the reaper
+    keeps for a day past expiry.
+    """
+
+    PRUNE_INTERVAL = 300
+
+    def __init__(
+        self,
+        database: Database,
+        window: int = Config.TRIAL_GUARD_WINDOW,
+        per_ip: int = Config.TRIAL_STARTS_PER_IP,
+        per_subnet: int = Config.TRIAL_STARTS_PER_SUBNET,
+        per_user: int = Config.TRIAL_STARTS_PER_USER,
+    ):
+        self.database = database
+        self.window = window
+        self.ip = SlidingWindowLimit("ip", per_ip, window)
+        self.subnet = SlidingWindowLimit("subnet", per_subnet, window)
+        self.user = SlidingWindowLimit("discord_id", per_user, window)
+        self._lock = threading.Lock()
+        self._last_prune = time.time()
+        self.allowed = 0
+        self.decisions = 0
+        self.decision_ns = 0
+        self.warmed: Optional[Dict[str, Any]] = None
+
+    def _rules(self, ip: Optional[str], discord_id: Optional[int | str]) -> Tuple[Tuple[SlidingWindowLimit, Hashable], ...]:
+        user = int(discord_id) if discord_id is not None else None
+        if not is_public(ip):
+            ip = None
+        return ((self.ip, ip), (self.subnet, subnet_of(ip)), (self.user, user))
+
+    # ==========================================================================
+    # ⚖️ DECISIONS
+    # ==========================================================================
+
+    def check(self, ip: Optional[str], discord_id: Optional[int | str] = None) -> Optional[Tuple[str, int]]:
+        """
+        None if the start is allowed, else (rule, retry_after_seconds) for
+        the first limit it would exceed. Nothing is recorded.
+        """
+        started = time.perf_counter_ns()
+        rules = self._rules(ip, discord_id)
+        now = time.time()
+        denial: Optional[Tuple[str, int]] = None
+
+        with self._lock:
+            for rule, key in rules:
+                wait = rule.retry_after(key, now)
+                if wait > 0:
+                    rule.denied += 1
+                    denial = (rule.name, int(wait) + 1)
+                    break
+            if now - self._last_prune > self.PRUNE_INTERVAL:
+                self._prune(now)
+            self.decisions += 1
+            self.decision_ns += time.perf_counter_ns() - started
+
+        if denial:
+            metrics.inc(TRIAL_GUARD_DECISIONS, outcome='denied', rule=denial[0])
+        return denial
+
+    def record(self, ip: Optional[str], discord_id: Optional[int | str]) -> None:
+        """Count a trial start that the database accepted against every key."""
+        rules = self._rules(ip, discord_id)
+        now = time.time()
+        with self._lock:
+            for rule, key in rules:
+                rule.record(key, now)
+            self.allowed += 1
+        metrics.inc(TRIAL_GUARD_DECISIONS, outcome='allowed', rule='none')
+
+    def forget(self, key: str) -> int:
+        """Clear one address, subnet or Discord ID from every rule (false positives)."""
+        removed = 0
+        with self._lock:
+            for rule in (self.ip, self.subnet, self.user):
+                for candidate in (key, int(key) if key.isdigit() else None):
+                    if candidate is not None and rule.events.pop(candidate, None) is not None:
+                        removed += 1
+        return removed
+
+    def _prune(self, now: float) -> None:
+        for rule in (self.ip, self.subnet, self.user):
+            rule.prune(now)
+        self._last_prune = now
+
+    # ==========================================================================
+    # 🔥 WARM-UP
+    # ==========================================================================
+
+    def warm_up(self) -> Dict[str, Any]:
+        """Rebuild the windows from trials and trial sessions in the database."""
+        started = time.perf_counter()
+        now = time.time()
+        starts = self.database.get_recent_trial_starts(int(now - self.window))
+
+        with self._lock:
+            for rule in (self.ip, self.subnet, self.user):
+                rule.events.clear()
+            for ip, discord_id, created_at in starts:
+                for rule, key in self._rules(ip, discord_id):
+                    rule.record(key, created_at)
+            self._last_prune = now
+            self.warmed = {
+                'at': int(now),
+                'starts': len(starts),
+                'ms': round((time.perf_counter() - started) * 1000, 2),
+            }
+
+        log.info(f"✅ Trial guard warmed with {len(starts)} recent starts in {self.warmed['ms']}ms")
+        return self.warmed
+
+    # ==========================================================================
+    # 📊 STATS
+    # ==========================================================================
+
+    def stats(self, hottest: int = 10) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            rules = (self.ip, self.subnet, self.user)
+            return {
+                'window': self.window,
+                'allowed': self.allowed,
+                'denied': sum(rule.denied for rule in rules),
+                'decisions': self.decisions,
+                'avg_decision_us': round(self.decision_ns / self.decisions / 1000, 2) if self.decisions else 0.0,
+                'rules': {rule.name: rule.stats() for rule in rules},
+                'hottest': {rule.name: rule.hottest(now, hottest) for rule in rules},
+                'warmed': self.warmed,
+            }
+
+# ==============================================================================
+# 🌍 GLOBAL GUARD INSTANCE
+# ==============================================================================
+
+trial_guard = TrialGuard(db)
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import aiohttp
 
 log = logging.getLogger("bot_api_client")
@@ -102,6 +103,76 @@ class BananaAPI:
         log.info("Fetching system stats")
         return await self._make_request('GET', '/api/stats')
     
+    async def get_users_page(
+        self,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Get one page of users, newest first.
+        
+        Args:
+            limit: Users per page (1-100)
+            cursor: `next_cursor` from the previous page, or None for the first
+            include_total: Also return the total user count
+            offset: Start at this position instead (only without a cursor)
+            
+        Returns:
+            {
+                'success': bool,
+                'users': [...],
+                'next_cursor': str | None,
+                'total': int  # only with include_total
+            }
+        """
+        params: Dict[str, Any] = {'limit': limit}
+        if cursor:
+            params['cursor'] = cursor
+        elif offset:
+            params['offset'] = offset
+        if include_total:
+            params['include_total'] = '1'
+        return await self._make_request('GET', '/api/admin/users/page', params=params)
+    
+    async def search_logs(
+        self,
+        query: str,
+        event_types: Optional[List[str]] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        limit: int = 10,
+        sort: str = 'rank'
+    ) -> Dict[str, Any]:
+        """
+        Full-text search over analytics details.
+        
+        Args:
+            query: Words, "quoted phrases", prefix* and -excluded terms
+            event_types: Only these event types (None for all)
+            since: Epoch seconds, inclusive
+            until: Epoch seconds, exclusive
+            limit: Maximum hits (1-100)
+            sort: 'rank' (best match first) or 'recent'
+            
+        Returns:
+            {
+                'success': bool,
+                'results': [{'id', 'event_type', 'discord_id', 'details', 'timestamp', 'score', 'snippet'}],
+                'count': int,
+                'took_ms': float
+            }
+        """
+        params: Dict[str, Any] = {'q': query, 'limit': limit, 'sort': sort}
+        if event_types:
+            params['type'] = ','.join(event_types)
+        if since is not None:
+            params['since'] = since
+        if until is not None:
+            params['until'] = until
+        return await self._make_request('GET', '/api/admin/search', params=params)
+    
     async def whitelist_user(self, user_id: str) -> Dict[str, Any]:
         """
         Whitelist a user with auto-generated key.
@@ -235,7 +306,7 @@ class BananaAPI:
         return await self._make_request(
             'POST',
             '/api/generate-key',
-            json_data={'count': count}
+            json_data={'count': count, 'format': 'json'}
         )
     
     async def check_key(self, key: str) -> Dict[str, Any]:
@@ -0,0 +1,666 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - BROADCAST DELIVERY
+# DM fan-out for /broadcast: recipients are streamed from `users` in batches,
+# delivered by a bounded worker pool behind a global token bucket, and
+# checkpointed in SQLite so a restart resumes where it left off
+#
+#   python broadcast.py --recipients 2000                      # against a local stand-in Discord API
+#   python broadcast.py --recipients 2000 --interrupt-after 700  # kill mid-run, then resume
+# ==============================================================================
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import discord
+
+from config import Config
+from metrics import metrics, BROADCAST_DMS
+
+# ==============================================================================
+# 🔧 LOGGING
+# ==============================================================================
+
+log = logging.getLogger("broadcast")
+
+SendDM = Callable[[int, str], Awaitable[None]]
+ProgressCallback = Callable[["BroadcastJob"], Awaitable[None]]
+
+# ==============================================================================
+# 🪣 TOKEN BUCKET
+# ==============================================================================
+
+class TokenBucket:
+    """
+    Async token bucket shared by every broadcast.
+
+    discord.py already waits out per-route buckets and 429s; this keeps the
+    fan-out as a whole well under the global request limit so interactive
+    commands are not starved while a broadcast runs.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = max(0.1, rate)
+        self.capacity = burst if burst is not None else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+# ==============================================================================
+# 💾 CHECKPOINT STORE
+# ==============================================================================
+
+class BroadcastStore:
+    """SQL for the `broadcasts` table and the recipient stream, on fresh connections."""
+
+    _RECIPIENTS_SQL = """
+        SELECT u.discord_id FROM users u
+        WHERE u.discord_id > ? AND typeof(u.discord_id) = 'integer'
+          AND NOT EXISTS (SELECT 1 FROM blacklist b WHERE b.discord_id = u.discord_id)
+        ORDER BY u.discord_id LIMIT ?
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection]):
+        self.connect = connect
+
+    def create(self, author_id: int, message: str) -> Dict[str, Any]:
+        conn = None
+        try:
+            conn = self.connect()
+            total = conn.execute(
+                "SELECT COUNT(*) FROM (" + self._RECIPIENTS_SQL + ")", (0, -1)
+            ).fetchone()[0]
+            now = int(time.time())
+            cur = conn.execute(
+                "INSERT INTO broadcasts (author_id, message, total, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (int(author_id), message, total, now, now)
+            )
+            conn.commit()
+            return {'id': cur.lastrowid, 'author_id': int(author_id), 'message': message,
+                    'status': 'running', 'cursor': 0, 'total': total, 'sent': 0, 'failed': 0, 'reasons': None}
+        finally:
+            if conn:
+                conn.close()
+
+    def running(self) -> List[Dict[str, Any]]:
+        conn = None
+        try:
+            conn = self.connect()
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT id, author_id, message, status, cursor, total, sent, failed, reasons, "
+                "created_at, updated_at, finished_at "
+                "FROM broadcasts WHERE status = 'running' ORDER BY id"
+            ).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            if conn:
+                conn.close()
+
+    def recipients(self, after_id: int, limit: int) -> List[int]:
+        conn = None
+        try:
+            conn = self.connect()
+            return [row[0] for row in conn.execute(self._RECIPIENTS_SQL, (after_id, limit)).fetchall()]
+        finally:
+            if conn:
+                conn.close()
+
+    def checkpoint(self, job: "BroadcastJob", finished: bool = False) -> None:
+        conn = None
+        try:
+            conn = self.connect()
+            now = int(time.time())
+            conn.execute(
+                """
+                UPDATE broadcasts SET status = ?, cursor = ?, sent = ?, failed = ?, reasons = ?,
+                    updated_at = ?, finished_at = ?
+                WHERE id = ?
+                """,
+                (job.status, job.cursor, job.saved_sent, job.saved_failed,
+                 json.dumps(job.saved_reasons, sort_keys=True), now, now if finished else None, job.id)
+            )
+            conn.commit()
+        finally:
+            if conn:
+                conn.close()
+
+# ==============================================================================
+# 📨 JOB
+# ==============================================================================
+
+class _Batch:
+    """Recipients read in one go; counted into the job's saved totals once every DM in it was attempted."""
+
+    __slots__ = ("last_id", "outstanding", "sent", "failed", "reasons")
+
+    def __init__(self, last_id: int, size: int):
+        self.last_id = last_id
+        self.outstanding = size
+        self.sent = 0
+        self.failed = 0
+        self.reasons: Dict[str, int] = {}
+
+    def record(self, outcome: str) -> None:
+        self.outstanding -= 1
+        if outcome == 'sent':
+            self.sent += 1
+        else:
+            self.failed += 1
+            self.reasons[outcome] = self.reasons.get(outcome, 0) + 1
+
+
+class BroadcastJob:
+    """
+    Live state of one broadcast; counters include deliveries from before a resume.
+
+    `saved_*` cover every recipient up to `cursor` and are what gets
+    checkpointed; batches still in flight add to `sent`, `failed` and
+    `reasons` for progress reports, but only reach the saved totals when the
+    cursor moves past them, since a resume sends them again.
+    """
+
+    def __init__(self, row: Dict[str, Any]):
+        self.id: int = row['id']
+        self.author_id: int = row['author_id']
+        self.message: str = row['message']
+        self.status: str = row.get('status', 'running')
+        self.cursor: int = row.get('cursor', 0)
+        self.total: int = row.get('total', 0)
+        self.saved_sent: int = row.get('sent', 0)
+        self.saved_failed: int = row.get('failed', 0)
+        self.saved_reasons: Dict[str, int] = json.loads(row.get('reasons') or '{}')
+        self.batches: Deque[_Batch] = deque()  # in flight, oldest first
+        self.resumed = bool(self.cursor)
+        self.started = time.monotonic()
+        self.attempted = 0  # this run only, for the rate
+
+    @property
+    def sent(self) -> int:
+        return self.saved_sent + sum(batch.sent for batch in self.batches)
+
+    @property
+    def failed(self) -> int:
+        return self.saved_failed + sum(batch.failed for batch in self.batches)
+
+    @property
+    def reasons(self) -> Dict[str, int]:
+        reasons = dict(self.saved_reasons)
+        for batch in self.batches:
+            for reason, count in batch.reasons.items():
+                reasons[reason] = reasons.get(reason, 0) + count
+        return reasons
+
+    @property
+    def done(self) -> int:
+        return self.sent + self.failed
+
+    def save(self, batch: _Batch) -> None:
+        """Fold a finished batch's counts into the saved totals."""
+        self.saved_sent += batch.sent
+        self.saved_failed += batch.failed
+        for reason, count in batch.reasons.items():
+            self.saved_reasons[reason] = self.saved_reasons.get(reason, 0) + count
+
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.attempted / elapsed if elapsed > 0 else 0.0
+
+    def eta(self) -> Optional[float]:
+        rate = self.rate()
+        remaining = max(0, self.total - self.done)
+        return remaining / rate if rate > 0 else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'status': self.status,
+            'total': self.total,
+            'sent': self.sent,
+            'failed': self.failed,
+            'reasons': self.reasons,
+            'per_sec': round(self.rate(), 1),
+            'elapsed_s': round(time.monotonic() - self.started, 1),
+            'resumed': self.resumed,
+        }
+
+# ==============================================================================
+# ⚙️ ENGINE
+# ==============================================================================
+
+class BroadcastEngine:
+    """
+    Runs broadcasts as asyncio tasks.
+
+    A producer reads recipients `batch_size` at a time in discord_id order
+    and feeds `concurrency` workers. Batches complete in order for
+    checkpointing purposes: the stored cursor only moves past a batch once
+    every DM in it (and in all earlier batches) has been attempted. At most
+    `max_pending_batches` batches are in flight, so a crash re-sends at most
+    that many batches and never skips anyone.
+    """
+
+    def __init__(
+        self,
+        store: BroadcastStore,
+        send_dm: SendDM,
+        concurrency: int = Config.BROADCAST_CONCURRENCY,
+        rate: float = Config.BROADCAST_RATE,
+        batch_size: int = Config.BROADCAST_BATCH_SIZE,
+        progress_interval: float = Config.BROADCAST_PROGRESS_INTERVAL,
+        max_retries: int = 2,
+        max_pending_batches: int = 4,
+    ):
+        self.store = store
+        self.send_dm = send_dm
+        self.concurrency = max(1, concurrency)
+        self.bucket = TokenBucket(rate)
+        self.batch_size = max(1, batch_size)
+        self.progress_interval = progress_interval
+        self.max_retries = max_retries
+        self.max_pending_batches = max(1, max_pending_batches)
+        self.jobs: Dict[int, BroadcastJob] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    # ========== LIFECYCLE ==========
+
+    async def start(self, author_id: int, message: str, on_progress: Optional[ProgressCallback] = None) -> BroadcastJob:
+        row = await asyncio.to_thread(self.store.create, author_id, message)
+        job = BroadcastJob(row)
+        self._spawn(job, on_progress)
+        log.info(f"📢 Broadcast #{job.id} started by {author_id} for {job.total} recipients")
+        return job
+
+    async def resume_pending(
+        self, on_progress: Optional[Callable[[BroadcastJob], Optional[ProgressCallback]]] = None
+    ) -> List[BroadcastJob]:
+        """Restart every broadcast a previous process left running."""
+        jobs = []
+        for row in await asyncio.to_thread(self.store.running):
+            if row['id'] in self._tasks:
+                continue
+            job = BroadcastJob(row)
+            self._spawn(job, on_progress(job) if on_progress else None)
+            log.info(f"📢 Resuming broadcast #{job.id} after discord_id {job.cursor} ({job.done}/{job.total} done)")
+            jobs.append(job)
+        return jobs
+
+    def _spawn(self, job: BroadcastJob, on_progress: Optional[ProgressCallback]) -> None:
+        self.jobs[job.id] = job
+        task = self._tasks[job.id] = asyncio.create_task(self.run(job, on_progress))
+        task.add_done_callback(lambda _t, job_id=job.id: self._tasks.pop(job_id, None))
+
+    def task(self, job_id: int) -> Optional[asyncio.Task]:
+        return self._tasks.get(job_id)
+
+    async def shutdown(self) -> None:
+        """Stop workers without finishing; the jobs stay `running` and resume next boot."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ========== DELIVERY ==========
+
+    async def run(self, job: BroadcastJob, on_progress: Optional[ProgressCallback] = None) -> BroadcastJob:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.batch_size)
+        batches = job.batches
+        # A slow DM at the head would otherwise let workers run far past the checkpoint
+        window = asyncio.Semaphore(self.max_pending_batches)
+        checkpoint_lock = asyncio.Lock()
+        reporter = asyncio.create_task(self._report(job, on_progress)) if on_progress else None
+
+        async def produce() -> None:
+            after = job.cursor
+            while True:
+                batch = await asyncio.to_thread(self.store.recipients, after, self.batch_size)
+                if not batch:
+                    break
+                await window.acquire()
+                entry = _Batch(batch[-1], len(batch))
+                batches.append(entry)
+                for user_id in batch:
+                    await queue.put((user_id, entry))
+                after = batch[-1]
+            for _ in range(self.concurrency):
+                await queue.put(None)
+
+        async def work() -> None:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                user_id, entry = item
+                entry.record(await self._deliver(job, user_id))
+                if batches and batches[0] is entry and entry.outstanding == 0:
+                    async with checkpoint_lock:
+                        while batches and batches[0].outstanding == 0:
+                            done = batches.popleft()
+                            job.save(done)
+                            job.cursor = done.last_id
+                            window.release()
+                        await asyncio.to_thread(self.store.checkpoint, job)
+
+        tasks = [asyncio.create_task(produce())]
+        tasks.extend(asyncio.create_task(work()) for _ in range(self.concurrency))
+        try:
+            await asyncio.gather(*tasks)
+            job.status = 'done'
+        except asyncio.CancelledError:
+            log.info(f"⏸️ Broadcast #{job.id} paused at discord_id {job.cursor} ({job.done}/{job.total})")
+            raise
+        except Exception as e:
+            job.status = 'failed'
+            log.error(f"❌ Broadcast #{job.id} failed: {e}", exc_info=True)
+        finally:
+            # gather() leaves the other tasks running when one raises
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if reporter:
+                reporter.cancel()
+            if job.status != 'running':
+                # A failed job is never resumed, so its partial batches count as they stand
+                while batches:
+                    job.save(batches.popleft())
+                await asyncio.to_thread(self.store.checkpoint, job, True)
+                log.info(
+                    f"📢 Broadcast #{job.id} {job.status}: {job.sent} sent, {job.failed} failed "
+                    f"({job.rate():.1f}/s) {job.reasons or ''}"
+                )
+                if on_progress:
+                    try:
+                        await on_progress(job)
+                    except Exception as e:
+                        log.warning(f"Broadcast #{job.id} final report failed: {e}")
+        return job
+
+    async def _deliver(self, job: BroadcastJob, user_id: int) -> str:
+        outcome = 'sent'
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                await self.send_dm(user_id, job.message)
+                outcome = 'sent'
+                break
+            except discord.Forbidden:
+                outcome = 'dms_closed'
+                break
+            except discord.NotFound:
+                outcome = 'unknown_user'
+                break
+            except discord.HTTPException as e:
+                # discord.py already slept through 429s; reaching here means it gave up
+                outcome = f"http_{e.status}"
+                if e.status != 429 and e.status < 500:
+                    break
+            except Exception as e:
+                outcome = 'error'
+                log.warning(f"Broadcast #{job.id} DM to {user_id} failed: {e}")
+            if attempt < self.max_retries:
+                await asyncio.sleep(0.5 * 2 ** attempt)
+
+        job.attempted += 1
+        metrics.inc(BROADCAST_DMS, outcome=outcome)
+        return outcome
+
+    async def _report(self, job: BroadcastJob, on_progress: ProgressCallback) -> None:
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            try:
+                await on_progress(job)
+            except Exception as e:
+                log.warning(f"Broadcast #{job.id} progress report failed: {e}")
+
+
+def dm_sender(client: discord.Client, render: Optional[Callable[[str], discord.Embed]] = None) -> SendDM:
+    """SendDM over a logged-in client; the DM channel lookup is cached by discord.py."""
+    async def send(user_id: int, message: str) -> None:
+        channel = await client.create_dm(discord.Object(id=user_id))
+        if render:
+            await channel.send(embed=render(message))
+        else:
+            await channel.send(message)
+    return send
+
+# ==============================================================================
+# 🧪 STAND-IN DISCORD API
+# Just enough of the REST API for DMs: login, open DM channel, send message.
+# Emits per-route rate limit headers, a global limit and injected failures.
+# ==============================================================================
+
+def _json_response(data: Any, status: int = 200, headers: Optional[Dict[str, str]] = None):
+    # discord.py only decodes bodies whose Content-Type is exactly application/json
+    from aiohttp import web
+    # and only waits out a 429 that came through Discord's proxy (Via), not Cloudflare
+    return web.Response(body=json.dumps(data).encode("utf-8"), status=status,
+                        headers={**(headers or {}), 'Content-Type': 'application/json', 'Via': '1.1 google'})
+
+
+class StandInDiscord:
+    """Local aiohttp server that records every DM it accepts."""
+
+    def __init__(self, global_rate: int = 50, closed_ratio: float = 0.05, throttle_ratio: float = 0.01, seed: int = 1337):
+        self.global_rate = global_rate
+        self.closed_ratio = closed_ratio
+        self.throttle_ratio = throttle_ratio
+        self.random = random.Random(seed)
+        self.delivered: Dict[int, int] = {}
+        self.attempted: set = set()
+        self.requests = 0
+        self.throttled = 0
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._next_id = 10_000
+        self.runner = None
+        self.port = 0
+
+    def _snowflake(self) -> str:
+        self._next_id += 1
+        return str(self._next_id)
+
+    def _user(self, user_id: int) -> Dict[str, Any]:
+        return {'id': str(user_id), 'username': f"user{user_id}", 'discriminator': '0', 'avatar': None, 'global_name': None}
+
+    def _limited(self):
+        self.requests += 1
+        now = time.monotonic()
+        if now - self._window_start >= 1:
+            self._window_start, self._window_count = now, 0
+        self._window_count += 1
+        if self._window_count > self.global_rate:
+            self.throttled += 1
+            retry = round(1 - (now - self._window_start), 3)
+            return _json_response(
+                {'message': 'You are being rate limited.', 'retry_after': retry, 'global': True},
+                status=429, headers={'Retry-After': str(retry), 'X-RateLimit-Global': 'true', 'X-RateLimit-Scope': 'global'},
+            )
+        if self.random.random() < self.throttle_ratio:
+            self.throttled += 1
+            return _json_response(
+                {'message': 'You are being rate limited.', 'retry_after': 0.05, 'global': False},
+                status=429, headers={'Retry-After': '0.05', 'X-RateLimit-Scope': 'user', 'X-RateLimit-Bucket': 'dm',
+                                     'X-RateLimit-Limit': '5', 'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset-After': '0.05'},
+            )
+        return None
+
+    @staticmethod
+    def _bucket_headers(bucket: str, limit: int, reset_after: float) -> Dict[str, str]:
+        # Each DM goes to a fresh channel, so only the first slot of a bucket is ever used
+        return {'X-RateLimit-Bucket': bucket, 'X-RateLimit-Limit': str(limit),
+                'X-RateLimit-Remaining': str(limit - 1), 'X-RateLimit-Reset-After': str(reset_after)}
+
+    async def _me(self, request):
+        return _json_response(dict(self._user(1), bot=True))
+
+    async def _application(self, request):
+        return _json_response({
+            'id': '1', 'name': 'Stand-in', 'icon': None, 'description': '', 'bot_public': False,
+            'bot_require_code_grant': False, 'verify_key': '', 'owner': self._user(2),
+        })
+
+    async def _open_dm(self, request):
+        limited = self._limited()
+        if limited is not None:
+            return limited
+        recipient = int((await request.json())['recipient_id'])
+        return _json_response(
+            {'id': str(recipient + 1), 'type': 1, 'recipients': [self._user(recipient)], 'last_message_id': None},
+            headers=self._bucket_headers('open_dm', 1000, 1.0),
+        )
+
+    async def _send(self, request):
+        limited = self._limited()
+        if limited is not None:
+            return limited
+        channel_id = int(request.match_info['channel_id'])
+        user_id = channel_id - 1
+        self.attempted.add(user_id)
+        if (user_id * 2654435761 % 1000) < self.closed_ratio * 1000:
+            return _json_response({'message': 'Cannot send messages to this user', 'code': 50007}, status=403)
+        payload = await request.json()
+        self.delivered[user_id] = self.delivered.get(user_id, 0) + 1
+        return _json_response({
+            'id': self._snowflake(), 'channel_id': str(channel_id), 'author': dict(self._user(1), bot=True),
+            'content': payload.get('content') or '', 'embeds': payload.get('embeds') or [], 'attachments': [],
+            'mentions': [], 'mention_roles': [], 'mention_everyone': False, 'pinned': False, 'tts': False,
+            'type': 0, 'flags': 0, 'components': [], 'edited_timestamp': None,
+            'timestamp': discord.utils.utcnow().isoformat(),
+        }, headers=self._bucket_headers(f"channel:{channel_id}", 5, 5.0))
+
+    async def start(self) -> str:
+        from aiohttp import web
+        app = web.Application()
+        app.router.add_get('/api/v10/users/@me', self._me)
+        app.router.add_get('/api/v10/oauth2/applications/@me', self._application)
+        app.router.add_post('/api/v10/users/@me/channels', self._open_dm)
+        app.router.add_post('/api/v10/channels/{channel_id}/messages', self._send)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{self.port}/api/v10"
+
+    async def stop(self) -> None:
+        if self.runner:
+            await self.runner.cleanup()
+
+# ==============================================================================
+# 🖥️ CLI
+# ==============================================================================
+
+def _seed_database(path: str, recipients: int) -> Callable[[], sqlite3.Connection]:
+    from synthetic_data import open_database
+    conn = open_database(path, force=True)
+    conn.executemany(
+        "INSERT INTO users (discord_id, key) VALUES (?, ?)",
+        ((100_000 + i * 7, f"BANANA-SIM-{i:06d}") for i in range(recipients)),
+    )
+    conn.commit()
+    conn.close()
+    return lambda: sqlite3.connect(path, timeout=30.0)
+
+
+async def _run_harness(args: argparse.Namespace, db_path: str) -> Dict[str, Any]:
+    connect = _seed_database(db_path, args.recipients)
+    server = StandInDiscord(global_rate=args.global_rate, closed_ratio=args.closed_ratio, throttle_ratio=args.throttle_ratio)
+    discord.http.Route.BASE = await server.start()
+    client = discord.Client(intents=discord.Intents.none())
+    await client.login("stand-in-token")
+
+    def engine() -> BroadcastEngine:
+        return BroadcastEngine(BroadcastStore(connect), dm_sender(client), concurrency=args.concurrency,
+                               rate=args.rate, batch_size=args.batch_size, progress_interval=1.0)
+
+    async def progress(job: BroadcastJob) -> None:
+        log.info(f"📨 #{job.id} {job.status}: {job.done}/{job.total} ({job.rate():.1f}/s) {job.reasons}")
+
+    started = time.perf_counter()
+    try:
+        first = engine()
+        job = await first.start(1, "Stand-in broadcast", progress)
+        if args.interrupt_after:
+            while job.done < args.interrupt_after and not first.task(job.id).done():
+                await asyncio.sleep(0.01)
+            await first.shutdown()
+            log.info(f"💥 Interrupted after {job.done} deliveries; resuming from the checkpoint")
+            second = engine()
+            resumed = await second.resume_pending(lambda _job: progress)
+            if resumed:
+                job = resumed[0]
+                await second.task(job.id)
+        else:
+            await first.task(job.id)
+    finally:
+        await client.close()
+        await server.stop()
+
+    elapsed = time.perf_counter() - started
+    expected = set(BroadcastStore(connect).recipients(0, -1))
+    return {
+        'recipients': args.recipients,
+        'job': job.snapshot(),
+        'elapsed_s': round(elapsed, 2),
+        'dms_per_sec': round(job.done / elapsed, 1) if elapsed else 0.0,
+        'server': {
+            'requests': server.requests,
+            'throttled_429': server.throttled,
+            'delivered_unique': len(server.delivered),
+            'duplicates': sum(n - 1 for n in server.delivered.values()),
+            'never_attempted': len(expected - server.attempted),
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the broadcast engine against a local stand-in Discord API")
+    parser.add_argument("--recipients", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=Config.BROADCAST_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=200, help="Token bucket rate (DMs/second)")
+    parser.add_argument("--batch-size", type=int, default=Config.BROADCAST_BATCH_SIZE)
+    parser.add_argument("--global-rate", type=int, default=500, help="Stand-in global limit (requests/second)")
+    parser.add_argument("--closed-ratio", type=float, default=0.05, help="Share of users with DMs closed")
+    parser.add_argument("--throttle-ratio", type=float, default=0.01, help="Share of requests answered with a 429")
+    parser.add_argument("--interrupt-after", type=int, default=0, help="Cancel after N deliveries, then resume")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    with tempfile.TemporaryDirectory(prefix="banana_broadcast_") as tmp:
+        report = asyncio.run(_run_harness(args, os.path.join(tmp, "broadcast.db")))
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0 if report['server']['never_attempted'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - COMMAND SYNC GATE
+# Hashes the slash command payload the tree would upload and remembers the
+# last one Discord accepted, so restarts skip the rate-limited bulk upsert
+# when nothing changed
+# ==============================================================================
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import discord
+from discord import app_commands
+
+from config import Config
+
+# ==============================================================================
+# 🔧 LOGGING
+# ==============================================================================
+
+log = logging.getLogger("command_sync")
+
+# ==============================================================================
+# #️⃣ CANONICAL HASH
+# ==============================================================================
+
+def command_payload(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> List[Dict[str, Any]]:
+    """The payload `tree.sync(guild=guild)` would upload, sorted by (type, name)."""
+    # No `type` filter: slash commands plus user and message context menus
+    payload = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+    payload.sort(key=lambda c: (c.get('type', 1), c['name']))
+    return payload
+
+
+def command_tree_hash(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """Stable sha256 of the command payload; independent of registration order."""
+    canonical = json.dumps(command_payload(tree, guild), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def sync_scope(application_id: Optional[int], guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """Key for one sync target: the application plus the guild (or `global`)."""
+    return f"{application_id}:{guild.id if guild else 'global'}"
+
+# ==============================================================================
+# 💾 STATE FILE
+# ==============================================================================
+
+class CommandSyncState:
+    """
+    JSON file of {scope: {hash, count, synced_at}} for the last successful sync.
+
+    A missing or unreadable file just means every scope syncs once.
+    """
+
+    def __init__(self, path: str = Config.COMMAND_SYNC_STATE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log.warning(f"Ignoring unreadable command sync state {self.path}: {e}")
+            return {}
+
+    def get(self, scope: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._load().get(scope)
+
+    def is_current(self, scope: str, digest: str) -> bool:
+        entry = self.get(scope)
+        return bool(entry) and entry.get('hash') == digest
+
+    def record(self, scope: str, digest: str, count: int) -> None:
+        with self._lock:
+            data = self._load()
+            data[scope] = {'hash': digest, 'count': count, 'synced_at': int(time.time())}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+
+# ==============================================================================
+# 🌍 GLOBAL STATE
+# ==============================================================================
+
+sync_state = CommandSyncState()
@@ -0,0 +1,275 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - COMPONENTS V2 BENCHMARKS
+# Times embed -> Components v2 conversion and the patched send path, with the
+# layout cache on and off, in a diffable JSON report
+#
+#   python components_bench.py --output v2.json
+#   python components_bench.py --compare v2.json --fail-on-regression
+# ==============================================================================
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import discord
+
+from components_v2 import (
+    ComponentsV2Config,
+    clear_layout_cache,
+    container_from_embed,
+    container_from_template,
+    layout_cache_info,
+    layout_template_from_embed,
+    patch_components_v2,
+)
+
+# ==============================================================================
+# 🔧 LOGGING
+# ==============================================================================
+
+log = logging.getLogger("components_bench")
+
+# ==============================================================================
+# 🧪 FIXTURES
+# Shapes of the embeds the bot actually sends: a /help-style card with many
+# fields, a short status reply and an announcement with an image.
+# ==============================================================================
+
+def _help_embed() -> discord.Embed:
+    embed = discord.Embed(
+        title="🍌 Banana Hub Commands",
+        description="Everything you can do with the bot. Staff commands are listed separately.",
+        color=0xFFD700,
+    )
+    for name in ("panel", "redeem", "status", "script", "trial", "support", "invite", "changelog"):
+        embed.add_field(name=f"/{name}", value=f"Use `/{name}` to open the {name} flow.", inline=False)
+    embed.set_thumbnail(url="https://cdn.discordapp.com/embed/avatars/0.png")
+    embed.set_footer(text="Banana Hub • Premium Script Hub")
+    embed.timestamp = discord.utils.utcnow()
+    return embed
+
+
+def _status_embed() -> discord.Embed:
+    return discord.Embed(title="✅ Key Active", description="Your license is valid.", color=0x10B981)
+
+
+def _announcement_embed() -> discord.Embed:
+    embed = discord.Embed(title="📢 Update v5.0", description="New dashboard, faster loader.", color=0x3B82F6)
+    embed.add_field(name="Changes", value="- Faster script delivery\n- Trial checkpoints", inline=False)
+    embed.set_image(url="https://cdn.discordapp.com/embed/avatars/1.png")
+    return embed
+
+
+FIXTURES: Dict[str, Callable[[], discord.Embed]] = {
+    'help': _help_embed,
+    'status': _status_embed,
+    'announcement': _announcement_embed,
+}
+
+# ==============================================================================
+# ⏱️ MEASUREMENT
+# ==============================================================================
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))]
+
+
+def _summarize(samples: List[float]) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    total = sum(samples)
+    return {
+        'iterations': len(samples),
+        'ops_per_sec': round(len(samples) / total, 1) if total else 0.0,
+        'mean_us': round(statistics.fmean(samples) * 1e6, 1) if samples else 0.0,
+        'p50_us': round(_percentile(ordered, 0.50) * 1e6, 1),
+        'p95_us': round(_percentile(ordered, 0.95) * 1e6, 1),
+    }
+
+
+def _time_sync(func: Callable[[], Any], iterations: int) -> Dict[str, Any]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return _summarize(samples)
+
+
+async def _time_async(func: Callable[[], Awaitable[Any]], iterations: int) -> Dict[str, Any]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - started)
+    return _summarize(samples)
+
+# ==============================================================================
+# 📨 PATCHED SEND PATH
+# ==============================================================================
+
+class _Sink:
+    """Stands in for a channel; the captured payload is serialized like discord.py would."""
+
+    sent = 0
+
+
+async def _capture_send(self: Any, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+    view = kwargs.get("view")
+    if view is not None:
+        view.to_components()
+    _Sink.sent += 1
+    return kwargs
+
+
+def _install_sink() -> Callable[..., Awaitable[Any]]:
+    """Route Messageable.send into the capture before patching, so no network is touched."""
+    discord.abc.Messageable.send = _capture_send  # type: ignore
+    patch_components_v2()
+    return discord.abc.Messageable.send
+
+
+async def bench_fixture(make: Callable[[], discord.Embed], send: Callable[..., Awaitable[Any]],
+                        iterations: int) -> Dict[str, Any]:
+    sink = _Sink()
+    # A fresh Embed per call, like the command handlers build them
+    embeds = [make() for _ in range(iterations)]
+    it = iter(embeds)
+    result: Dict[str, Any] = {}
+
+    result['convert_uncached'] = _time_sync(
+        lambda: container_from_template(layout_template_from_embed(next(it))), iterations)
+    it = iter(embeds)
+    container_from_embed(embeds[0])
+    result['convert_cached'] = _time_sync(lambda: container_from_embed(next(it)), iterations)
+
+    saved_size = ComponentsV2Config.layout_cache_size
+    try:
+        ComponentsV2Config.layout_cache_size = 0
+        it = iter(embeds)
+        result['send_uncached'] = await _time_async(lambda: send(sink, embed=next(it)), iterations)
+    finally:
+        ComponentsV2Config.layout_cache_size = saved_size
+    it = iter(embeds)
+    result['send_cached'] = await _time_async(lambda: send(sink, embed=next(it)), iterations)
+    return result
+
+
+async def bench_passthrough(send: Callable[..., Awaitable[Any]], iterations: int) -> Dict[str, Any]:
+    """Sends with nothing to convert (view-only) take the fast path."""
+    sink = _Sink()
+    view = discord.ui.View(timeout=None)
+    view.add_item(discord.ui.Button(label="Refresh", custom_id="bench:refresh"))
+    return {'send_view_only': await _time_async(lambda: send(sink, view=view), iterations)}
+
+# ==============================================================================
+# 📊 COMPARISON
+# ==============================================================================
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Rows of ops/sec deltas; `regressed` when throughput drops beyond tolerance."""
+    rows = []
+    for fixture, cases in current['results'].items():
+        for case, now in cases.items():
+            then = baseline.get('results', {}).get(fixture, {}).get(case)
+            if not then or not then['ops_per_sec']:
+                continue
+            delta = (now['ops_per_sec'] - then['ops_per_sec']) / then['ops_per_sec']
+            rows.append({
+                'fixture': fixture,
+                'case': case,
+                'before': then['ops_per_sec'],
+                'after': now['ops_per_sec'],
+                'delta': round(delta, 4),
+                'regressed': delta < -tolerance,
+            })
+    return rows
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except Exception:
+        return None
+
+# ==============================================================================
+# 🖥️ CLI
+# ==============================================================================
+
+async def _run(iterations: int, fixtures: List[str]) -> Dict[str, Any]:
+    send = _install_sink()
+    results: Dict[str, Any] = {}
+    for name in fixtures:
+        clear_layout_cache()
+        results[name] = await bench_fixture(FIXTURES[name], send, iterations)
+        for case, stats in results[name].items():
+            log.info(f"⏱️ [{name}] {case}: {stats['ops_per_sec']:,} ops/s, p95 {stats['p95_us']}us")
+    results['passthrough'] = await bench_passthrough(send, iterations)
+    log.info(f"⏱️ [passthrough] send_view_only: {results['passthrough']['send_view_only']['ops_per_sec']:,} ops/s")
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Components v2 conversion and send path")
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per case")
+    parser.add_argument("--fixtures", default=",".join(FIXTURES), help="Comma-separated subset of fixtures")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="Baseline report to diff against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed ops/sec drop as a fraction")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when a case regresses")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    fixtures = [f.strip() for f in args.fixtures.split(",") if f.strip() in FIXTURES]
+    report: Dict[str, Any] = {
+        'meta': {
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'discord.py': discord.__version__,
+            'platform': platform.platform(),
+            'iterations': args.iterations,
+        },
+        'results': asyncio.run(_run(args.iterations, fixtures)),
+    }
+    report['meta']['layout_cache'] = layout_cache_info()
+
+    regressed = False
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            rows = compare(report, json.load(f), args.tolerance)
+        report['comparison'] = rows
+        for row in rows:
+            marker = "⚠️" if row['regressed'] else "  "
+            log.info(f"{marker} [{row['fixture']}] {row['case']}: "
+                     f"{row['before']:,} -> {row['after']:,} ops/s ({row['delta']:+.1%})")
+            regressed = regressed or row['regressed']
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,10 +9,12 @@ Features:
 - Optional monkeypatch for transparent v2 adoption
 - Granular control: global settings, per-message flags, or manual conversion
 - Preserves interactive components (buttons, selects) in ActionRows
+- Caches embed conversions as immutable layout templates
 """
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from datetime import datetime
 import re
 from typing import Any, Optional, Literal
@@ -38,6 +40,9 @@ class ComponentsV2Config:
     
     enabled: bool = True
     """Whether to convert embeds to v2 layouts by default."""
+
+    layout_cache_size: int = 256
+    """Max embed layouts kept by the conversion cache (0 disables it)."""
     
     @classmethod
     def enable(cls) -> None:
@@ -52,6 +57,11 @@ class ComponentsV2Config:
 
 def _component_type(item: discord.ui.Item[Any]) -> Optional[int]:
     """Extract the component type from a UI item."""
+    # item.type avoids serializing the whole subtree just to read one int
+    try:
+        return int(item.type.value)
+    except Exception:
+        pass
     try:
         data = item.to_component_dict()
         t = data.get("type")
@@ -229,9 +239,58 @@ def _accent_color_from_embed(embed: discord.Embed) -> Optional[int]:
     return None
 
 
-def container_from_embed(embed: discord.Embed) -> discord.ui.Container:
+# A layout template is (accent, parts): plain tuples describing the Container
+# tree, so one conversion can be shared by every send of the same embed.
+# Parts are ("text", content), ("section", content, thumbnail_url),
+# ("separator", spacing) and ("gallery", image_url).
+LayoutTemplate = tuple[Optional[int], tuple[tuple[Any, ...], ...]]
+
+_layout_cache: "OrderedDict[Any, LayoutTemplate]" = OrderedDict()
+_layout_cache_stats = {"hits": 0, "misses": 0}
+
+
+# Embed keeps its parts in these slots; reading them directly avoids building
+# an EmbedProxy per field. Fall back to to_dict() if discord.py ever renames them.
+_EMBED_KEY_SLOTS = ("title", "description", "_colour", "_author", "_thumbnail", "_image", "_footer", "_fields")
+_FAST_EMBED_KEY = set(_EMBED_KEY_SLOTS).issubset(getattr(discord.Embed, "__slots__", ()))
+
+
+def _freeze(value: Any) -> Any:
+    """Turn nested dicts/lists into hashable tuples."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _embed_cache_key(embed: discord.Embed) -> Any:
+    """Structural key of everything the conversion reads from an embed."""
+    if _FAST_EMBED_KEY:
+        author = getattr(embed, "_author", None) or {}
+        thumbnail = getattr(embed, "_thumbnail", None) or {}
+        image = getattr(embed, "_image", None) or {}
+        footer = getattr(embed, "_footer", None) or {}
+        colour = getattr(embed, "_colour", None)
+        return (
+            embed.title,
+            embed.description,
+            colour.value if isinstance(colour, discord.Colour) else colour,
+            author.get("name"),
+            thumbnail.get("url"),
+            image.get("url"),
+            footer.get("text"),
+            tuple((f.get("name"), f.get("value")) for f in getattr(embed, "_fields", ())),
+        )
+    data = embed.to_dict()
+    # Timestamps are not rendered in v2 cards; keep them out of the key
+    data.pop("timestamp", None)
+    return _freeze(data)
+
+
+def layout_template_from_embed(embed: discord.Embed) -> LayoutTemplate:
     """
-    Convert a discord.Embed to a Components v2 Container.
+    Build the immutable layout template for an embed.
 
     Mapping:
     - embed.author.name → Bold header text
@@ -242,15 +301,9 @@ def container_from_embed(embed: discord.Embed) -> discord.ui.Container:
     - embed.image → MediaGallery at bottom
     - embed.footer → Italicized metadata (if not timestamp-only)
     - embed.color → Container accent color
-
-    Args:
-        embed: The embed to convert
-
-    Returns:
-        A Container representing the embed
     """
     accent = _accent_color_from_embed(embed)
-    children: list[discord.ui.Item[Any]] = []
+    parts: list[tuple[Any, ...]] = []
 
     # Build header from author, title, and description
     title = (embed.title or "").strip()
@@ -276,14 +329,9 @@ def container_from_embed(embed: discord.Embed) -> discord.ui.Container:
     
     if header_text:
         if thumb_url:
-            children.append(
-                discord.ui.Section(
-                    discord.ui.TextDisplay(header_text),
-                    accessory=discord.ui.Thumbnail(thumb_url),
-                )
-            )
+            parts.append(("section", header_text, thumb_url))
         else:
-            children.append(discord.ui.TextDisplay(header_text))
+            parts.append(("text", header_text))
 
     # Add fields with separators
     for field in embed.fields:
@@ -292,32 +340,104 @@ def container_from_embed(embed: discord.Embed) -> discord.ui.Container:
         if not name and not value:
             continue
             
-        children.append(discord.ui.Separator(spacing=discord.SeparatorSpacing.small))
+        parts.append(("separator", discord.SeparatorSpacing.small))
         
         if name and value:
-            children.append(discord.ui.TextDisplay(f"**{name}**\n{value}"))
+            parts.append(("text", f"**{name}**\n{value}"))
         elif name:
-            children.append(discord.ui.TextDisplay(f"**{name}**"))
+            parts.append(("text", f"**{name}**"))
         else:
-            children.append(discord.ui.TextDisplay(value))
+            parts.append(("text", value))
 
     # Add image gallery if present
     image_url = _get_embed_image_url(embed)
     if image_url:
-        children.append(discord.ui.Separator(spacing=discord.SeparatorSpacing.large))
-        children.append(discord.ui.MediaGallery(discord.MediaGalleryItem(image_url)))
+        parts.append(("separator", discord.SeparatorSpacing.large))
+        parts.append(("gallery", image_url))
 
     # Add footer metadata (excluding timestamp-only footers)
     footer_text = _get_embed_footer_text(embed)
     if footer_text:
-        children.append(discord.ui.Separator(spacing=discord.SeparatorSpacing.small))
-        children.append(discord.ui.TextDisplay(f"*{footer_text}*"))
+        parts.append(("separator", discord.SeparatorSpacing.small))
+        parts.append(("text", f"*{footer_text}*"))
+
+    return (accent, tuple(parts))
+
+
+def container_from_template(template: LayoutTemplate) -> discord.ui.Container:
+    """Instantiate fresh UI items for a layout template."""
+    accent, parts = template
+    children: list[discord.ui.Item[Any]] = []
+    for part in parts:
+        kind = part[0]
+        if kind == "text":
+            children.append(discord.ui.TextDisplay(part[1]))
+        elif kind == "separator":
+            children.append(discord.ui.Separator(spacing=part[1]))
+        elif kind == "section":
+            children.append(
+                discord.ui.Section(
+                    discord.ui.TextDisplay(part[1]),
+                    accessory=discord.ui.Thumbnail(part[2]),
+                )
+            )
+        elif kind == "gallery":
+            children.append(discord.ui.MediaGallery(discord.MediaGalleryItem(part[1])))
 
     if accent is not None:
         return discord.ui.Container(*children, accent_color=accent)
     return discord.ui.Container(*children)
 
 
+def cached_layout_template(embed: discord.Embed) -> LayoutTemplate:
+    """Return the layout template for an embed, converting at most once per structure."""
+    size = ComponentsV2Config.layout_cache_size
+    if size <= 0:
+        return layout_template_from_embed(embed)
+
+    key = _embed_cache_key(embed)
+    template = _layout_cache.get(key)
+    if template is not None:
+        _layout_cache.move_to_end(key)
+        _layout_cache_stats["hits"] += 1
+        return template
+
+    _layout_cache_stats["misses"] += 1
+    template = layout_template_from_embed(embed)
+    _layout_cache[key] = template
+    while len(_layout_cache) > size:
+        _layout_cache.popitem(last=False)
+    return template
+
+
+def layout_cache_info() -> dict[str, int]:
+    """Hit/miss counters and current size of the conversion cache."""
+    return {**_layout_cache_stats, "size": len(_layout_cache), "max_size": ComponentsV2Config.layout_cache_size}
+
+
+def clear_layout_cache() -> None:
+    """Drop all cached layouts and reset the counters."""
+    _layout_cache.clear()
+    _layout_cache_stats["hits"] = 0
+    _layout_cache_stats["misses"] = 0
+
+
+def container_from_embed(embed: discord.Embed) -> discord.ui.Container:
+    """
+    Convert a discord.Embed to a Components v2 Container.
+
+    See layout_template_from_embed for the mapping. Conversions are cached
+    by embed structure; each call still returns new, unattached items.
+
+    Args:
+        embed: The embed to convert
+
+    Returns:
+        A Container representing the embed
+    """
+    return container_from_template(cached_layout_template(embed))
+
+
 def _normalize_embeds(
     *,
     embed: Any = None,
@@ -325,7 +445,9 @@ def _normalize_embeds(
 ) -> list[discord.Embed]:
     """Normalize embed/embeds arguments into a list of Embeds."""
     out: list[discord.Embed] = []
-    if embed and isinstance(embed, discord.Embed):
+    # No truthiness check on the Embed itself: Embed.__bool__ inspects every
+    # part, and an empty embed converts to an empty Container that is skipped
+    if isinstance(embed, discord.Embed):
         out.append(embed)
     if embeds:
         for e in embeds:
@@ -334,6 +456,40 @@ def _normalize_embeds(
     return out
 
 
+def _needs_v2_rewrite(*, content: Any, embed: Any, embeds: Any, view: Any) -> bool:
+    """
+    Whether a send/edit has anything for the v2 patch to convert.
+
+    Calls with no embeds, no content and no LayoutView (e.g. a plain
+    ``edit_message(view=...)`` from a button callback) skip the patch entirely.
+    """
+    MISSING = discord.utils.MISSING
+    if embed is not MISSING and embed is not None:
+        return True
+    if embeds is not MISSING and embeds:
+        return True
+    if content is not MISSING and content not in (None, "", ...):
+        return True
+    return isinstance(view, discord.ui.LayoutView)
+
+
+def _payload_of(args: tuple[Any, ...], kwargs: dict[str, Any]) -> dict[str, Any]:
+    MISSING = discord.utils.MISSING
+    return {
+        "content": args[0] if args else kwargs.get("content", MISSING),
+        "embed": kwargs.get("embed", MISSING),
+        "embeds": kwargs.get("embeds", MISSING),
+        "view": kwargs.get("view", MISSING),
+    }
+
+
+def _drop_cleared_embeds(kwargs: dict[str, Any]) -> None:
+    """Mirror the slow edit path, which never forwards ``embed=None``/``embeds=None``."""
+    for key in ("embed", "embeds"):
+        if key in kwargs and kwargs[key] is None:
+            del kwargs[key]
+
+
 async def layout_view_from_embeds(
     *,
     content: Any = None,
@@ -445,11 +601,8 @@ def patch_components_v2() -> None:
         return ComponentsV2Config.enabled
 
     async def patched_interaction_send_message(self, *args, **kwargs):
-        if not _should_use_v2(kwargs):
-            content = args[0] if args else kwargs.get("content", MISSING)
-            if args:
-                return await original_interaction_send(self, *args, **kwargs)
-            return await original_interaction_send(self, **kwargs)
+        if not _should_use_v2(kwargs) or not _needs_v2_rewrite(**_payload_of(args, kwargs)):
+            return await original_interaction_send(self, *args, **kwargs)
 
         content = args[0] if args else kwargs.pop("content", MISSING)
         kwargs.pop("content", None)
@@ -546,11 +699,8 @@ def patch_components_v2() -> None:
         )
 
     async def patched_webhook_send(self, *args, **kwargs):
-        if not _should_use_v2(kwargs):
-            content = args[0] if args else kwargs.get("content", MISSING)
-            if args:
-                return await original_webhook_send(self, *args, **kwargs)
-            return await original_webhook_send(self, **kwargs)
+        if not _should_use_v2(kwargs) or not _needs_v2_rewrite(**_payload_of(args, kwargs)):
+            return await original_webhook_send(self, *args, **kwargs)
 
         content = args[0] if args else kwargs.pop("content", MISSING)
         kwargs.pop("content", None)
@@ -594,7 +744,7 @@ def patch_components_v2() -> None:
         return await original_webhook_send(self, content=content, **kwargs)
 
     async def patched_messageable_send(self, *args, **kwargs):
-        if not _should_use_v2(kwargs):
+        if not _should_use_v2(kwargs) or not _needs_v2_rewrite(**_payload_of(args, kwargs)):
             return await original_messageable_send(self, *args, **kwargs)
 
         content = args[0] if args else kwargs.pop("content", MISSING)
@@ -638,6 +788,9 @@ def patch_components_v2() -> None:
 
     async def patched_interaction_edit_original_response(self, *args, **kwargs):
         use_v2 = _should_use_v2(kwargs)
+        if not use_v2 or not _needs_v2_rewrite(**_payload_of((), kwargs)):
+            _drop_cleared_embeds(kwargs)
+            return await original_interaction_edit_original(self, *args, **kwargs)
         
         content = kwargs.get("content", MISSING)
         kwargs.pop("content", None)
@@ -666,6 +819,9 @@ def patch_components_v2() -> None:
 
     async def patched_interaction_response_edit_message(self, *args, **kwargs):
         use_v2 = _should_use_v2(kwargs)
+        if not use_v2 or not _needs_v2_rewrite(**_payload_of((), kwargs)):
+            _drop_cleared_embeds(kwargs)
+            return await original_interaction_response_edit(self, *args, **kwargs)
         
         content = kwargs.get("content", MISSING)
         kwargs.pop("content", None)
@@ -694,6 +850,9 @@ def patch_components_v2() -> None:
 
     async def patched_message_edit(self, *args, **kwargs):
         use_v2 = _should_use_v2(kwargs)
+        if not use_v2 or not _needs_v2_rewrite(**_payload_of((), kwargs)):
+            _drop_cleared_embeds(kwargs)
+            return await original_message_edit(self, *args, **kwargs)
         
         content = kwargs.get("content", MISSING)
         kwargs.pop("content", None)
@@ -722,6 +881,9 @@ def patch_components_v2() -> None:
 
     async def patched_webhook_edit_message(self, *args, **kwargs):
         use_v2 = _should_use_v2(kwargs)
+        if not use_v2 or not _needs_v2_rewrite(**_payload_of((), kwargs)):
+            _drop_cleared_embeds(kwargs)
+            return await original_webhook_edit_message(self, *args, **kwargs)
         
         content = kwargs.get("content", MISSING)
         kwargs.pop("content", None)
@@ -750,6 +912,9 @@ def patch_components_v2() -> None:
 
     async def patched_webhook_message_edit(self, *args, **kwargs):
         use_v2 = _should_use_v2(kwargs)
+        if not use_v2 or not _needs_v2_rewrite(**_payload_of((), kwargs)):
+            _drop_cleared_embeds(kwargs)
+            return await original_webhook_message_edit(self, *args, **kwargs)
         
         content = kwargs.get("content", MISSING)
         kwargs.pop("content", None)
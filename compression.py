@@ -0,0 +1,174 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - HTTP COMPRESSION
+# Content-coding helpers shared by the static page cache and the response
+# compression middleware
+# ==============================================================================
+
+from __future__ import annotations
+
+import gzip
+import zlib
+from typing import Dict, Iterable, Iterator, Optional
+
+from flask import Response
+
+from config import Config
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# ==============================================================================
+# 🗜️ CODECS
+# ==============================================================================
+
+# Server preference when the client accepts several codings equally
+PREFERRED_ENCODINGS = ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+
+# Dynamic responses trade ratio for speed; static pages use the maximum
+DYNAMIC_LEVELS = {"br": 4, "gzip": 6}
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress `data` with the given content-coding (`br` or `gzip`)."""
+    if encoding == "br":
+        if not BROTLI_AVAILABLE:
+            raise ValueError("brotli is not installed")
+        return brotli.compress(data, quality=11 if level is None else level)
+    if encoding == "gzip":
+        # mtime=0 keeps the output byte-identical across renders (stable ETags)
+        return gzip.compress(data, compresslevel=9 if level is None else level, mtime=0)
+    raise ValueError(f"Unsupported content-coding: {encoding}")
+
+
+def _stream_compressor(encoding: str, level: int):
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=level)
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str, level: Optional[int] = None) -> Iterator[bytes]:
+    """Compress an iterable chunk by chunk, flushing after each so clients see progress."""
+    process, flush, finish = _stream_compressor(encoding, DYNAMIC_LEVELS[encoding] if level is None else level)
+    for chunk in chunks:
+        if not chunk:
+            continue
+        data = process(chunk) + flush()
+        if data:
+            yield data
+    tail = finish()
+    if tail:
+        yield tail
+
+# ==============================================================================
+# 🤝 NEGOTIATION
+# ==============================================================================
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q}."""
+    accepted: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        coding, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def negotiate(header: Optional[str], available: Iterable[str] = PREFERRED_ENCODINGS) -> Optional[str]:
+    """
+    Pick the best content-coding the client accepts from `available`.
+
+    Returns None when the response should go out uncompressed. Ties on q
+    are broken by the order of `available`.
+    """
+    accepted = parse_accept_encoding(header)
+    if not accepted:
+        return None
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+# ==============================================================================
+# 🧩 RESPONSE MIDDLEWARE
+# ==============================================================================
+
+class ResponseCompressor:
+    """
+    Compresses outgoing Flask responses negotiated via Accept-Encoding.
+
+    Buffered bodies below `min_size` are left alone, as is anything outside
+    the content-type allowlist, anything already encoded, and responses that
+    ask for `no-transform`. Streamed bodies are compressed incrementally.
+    """
+
+    def __init__(
+        self,
+        min_size: int = Config.COMPRESS_MIN_SIZE,
+        mimetypes: Iterable[str] = Config.COMPRESS_MIMETYPES,
+        enabled: bool = Config.COMPRESS_RESPONSES,
+    ):
+        self.min_size = min_size
+        self.mimetypes = frozenset(mimetypes)
+        self.enabled = enabled
+
+    def _eligible(self, response: Response) -> bool:
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return False
+        if response.direct_passthrough or "Content-Encoding" in response.headers:
+            return False
+        if response.mimetype not in self.mimetypes:
+            return False
+        if "no-transform" in (response.headers.get("Cache-Control") or ""):
+            return False
+        return True
+
+    def process(self, response: Response, accept_encoding: Optional[str]) -> Response:
+        if not self.enabled or not self._eligible(response):
+            return response
+        # The representation depends on Accept-Encoding whether or not we compress
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate(accept_encoding)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.iter_encoded(), encoding)
+            response.headers.pop("Content-Length", None)
+        else:
+            body = response.get_data()
+            if len(body) < self.min_size:
+                return response
+            compressed = compress(body, encoding, DYNAMIC_LEVELS[encoding])
+            if len(compressed) >= len(body):
+                return response
+            response.set_data(compressed)
+
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak=weak)
+        return response
+
+# ==============================================================================
+# 🌍 GLOBAL COMPRESSOR
+# ==============================================================================
+
+compressor = ResponseCompressor()
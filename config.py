@@ -17,9 +17,53 @@ class Config:
     # Base URLs (Render will provide these)
     BASE_URL = os.getenv("BASE_URL", "http://localhost:5000")
     WEBSITE_URL = os.getenv("WEBSITE_URL", "http://localhost:5000")
+    TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", 0))  # Reverse proxies setting X-Forwarded-For (Render: 1)
+
+    # Request tracing
+    SERVER_TIMING = os.getenv("SERVER_TIMING", "False").lower() == "true"  # Emit Server-Timing header (admins only)
+    SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", 500))  # Keep span breakdowns of slower requests
+    SLOW_REQUEST_BUFFER = int(os.getenv("SLOW_REQUEST_BUFFER", 100))  # Ring buffer size
+
+    # Static page cache
+    STATIC_PAGE_MAX_AGE = int(os.getenv("STATIC_PAGE_MAX_AGE", 300))  # Cache-Control max-age for public pages
+
+    # Response compression
+    COMPRESS_RESPONSES = os.getenv("COMPRESS_RESPONSES", "True").lower() == "true"
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))  # Bytes; smaller bodies go out as-is
+    COMPRESS_MIMETYPES = (
+        'text/html', 'text/plain', 'text/css', 'text/javascript',
+        'application/json', 'application/javascript', 'image/svg+xml',
+    )
     
     # ========== DATABASE ==========
-    DB_FILE = "data/banana_hub.db"
+    DB_FILE = os.getenv("DB_FILE", "data/banana_hub.db")
+    
+    SQL_TRACE = os.getenv("SQL_TRACE", "False").lower() == "true"  # Per-statement timing via set_trace_callback
+    SQL_TRACE_SAMPLE = float(os.getenv("SQL_TRACE_SAMPLE", 1.0))  # Fraction of Database calls traced when enabled
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 100))  # Log statements slower than this
+    SEARCH_RANK_WINDOW = int(os.getenv("SEARCH_RANK_WINDOW", 5000))  # Newest matches bm25-ranked per search
+    
+    # ========== KEYS ==========
+    KEY_BATCH_LIMIT = int(os.getenv("KEY_BATCH_LIMIT", 10000))  # Max keys per mint request
+    KEY_FILE_THRESHOLD = int(os.getenv("KEY_FILE_THRESHOLD", 100))  # Larger batches are returned as a file
+    
+    # ========== MAINTENANCE ==========
+    REAPER_INTERVAL = int(os.getenv("REAPER_INTERVAL", 300))  # Seconds between expiry sweeps (0 disables)
+    REAPER_BATCH_SIZE = int(os.getenv("REAPER_BATCH_SIZE", 500))  # Rows deleted per transaction
+    TRIAL_RETENTION_HOURS = int(os.getenv("TRIAL_RETENTION_HOURS", 72))  # Keep expired trials this long
+    TRIAL_SESSION_RETENTION_HOURS = int(os.getenv("TRIAL_SESSION_RETENTION_HOURS", 24))  # Keep expired sessions for the 24h per-user limit
+    
+    # ========== TRIAL ABUSE GUARD ==========
+    TRIAL_GUARD_WINDOW = int(os.getenv("TRIAL_GUARD_WINDOW", 86400))  # Sliding window for trial start limits (seconds)
+    TRIAL_STARTS_PER_IP = int(os.getenv("TRIAL_STARTS_PER_IP", 3))  # Starts per address per window (0 disables)
+    TRIAL_STARTS_PER_SUBNET = int(os.getenv("TRIAL_STARTS_PER_SUBNET", 10))  # Starts per /24 (IPv6: /64) per window
+    TRIAL_STARTS_PER_USER = int(os.getenv("TRIAL_STARTS_PER_USER", 1))  # Starts per Discord ID per window
+    
+    # ========== BROADCAST ==========
+    BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", 8))  # DM workers per broadcast
+    BROADCAST_RATE = float(os.getenv("BROADCAST_RATE", 20))  # DMs/second across all broadcasts (each may cost 2 requests)
+    BROADCAST_BATCH_SIZE = int(os.getenv("BROADCAST_BATCH_SIZE", 50))  # Recipients per read and per checkpoint
+    BROADCAST_PROGRESS_INTERVAL = float(os.getenv("BROADCAST_PROGRESS_INTERVAL", 5))  # Seconds between live reports
     
     # ========== SCRIPT ==========
     SCRIPT_FILE = "script.lua"
@@ -31,6 +75,14 @@ class Config:
     
     # ========== DISCORD ==========
     GUILD_ID = os.getenv("GUILD_ID", None)  # Optional: for faster command sync
+    COMMAND_SYNC_STATE_FILE = os.getenv("COMMAND_SYNC_STATE_FILE", "data/command_sync.json")  # Last synced tree hash
+    GUILD_BOOTSTRAP_CONCURRENCY = int(os.getenv("GUILD_BOOTSTRAP_CONCURRENCY", 4))  # Guilds set up in parallel on ready
+    PRESENCE_DEBOUNCE = float(os.getenv("PRESENCE_DEBOUNCE", 10))  # Seconds to coalesce presence updates
+    FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "False").lower() == "true"  # Ignore the hash on boot
+    
+    PREMIUM_ROLE_NAME = os.getenv("PREMIUM_ROLE_NAME", "Premium User")  # Granted to licensed members
+    ROLE_SYNC_INTERVAL = int(os.getenv("ROLE_SYNC_INTERVAL", 3600))  # Seconds between full sweeps (0 disables)
+    ROLE_SYNC_RATE = float(os.getenv("ROLE_SYNC_RATE", 5))  # Role edits/second across all guilds
     
     # ========== MODE ==========
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
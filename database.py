@@ -8,8 +8,10 @@ from __future__ import annotations
 
 import logging
 import os
+import re
 import shutil
 import sqlite3
+import time
 import random
 import string
 import uuid
@@ -17,7 +19,7 @@ import secrets
 import hashlib
 from datetime import datetime, UTC, timedelta
 from pathlib import Path
-from typing import Dict, Optional, List, Any, Tuple
+from typing import Dict, Optional, List, Any, Set, Tuple
 
 try:
     import bcrypt
@@ -26,6 +28,11 @@ except ImportError:
     BCRYPT_AVAILABLE = False
 
 from config import Config
+from migrations import run_migrations, get_schema_version
+from metrics import metrics, instrument_methods, DB_LATENCY
+from sql_trace import tracer
+import identity_map
+import request_trace
 
 # ==============================================================================
 # 🔧 LOGGING
@@ -33,6 +40,158 @@ from config import Config
 
 log = logging.getLogger("database")
 
+# ==============================================================================
+# 🔑 KEY GENERATION
+# ==============================================================================
+
+KEY_ALPHABET = string.ascii_uppercase + string.digits
+# Largest multiple of len(KEY_ALPHABET) below 256, for unbiased byte sampling
+_KEY_BYTE_LIMIT = 256 - (256 % len(KEY_ALPHABET))
+# Keep IN (...) lookups under SQLite's default host-parameter limit
+_SQL_CHUNK_SIZE = 500
+
+
+def _random_key_chars(count: int) -> str:
+    """Draw `count` unbiased characters from KEY_ALPHABET using `secrets`."""
+    chars: List[str] = []
+    while len(chars) < count:
+        needed = count - len(chars)
+        chars.extend(
+            KEY_ALPHABET[b % len(KEY_ALPHABET)]
+            for b in secrets.token_bytes(needed + needed // 32 + 8)
+            if b < _KEY_BYTE_LIMIT
+        )
+    return ''.join(chars[:count])
+
+
+def generate_license_keys(count: int) -> List[str]:
+    """Generate `count` random license keys in BANANA-XXX-XXX-XXX format."""
+    chars = _random_key_chars(count * 9)
+    return [
+        f"BANANA-{chars[i:i + 3]}-{chars[i + 3:i + 6]}-{chars[i + 6:i + 9]}"
+        for i in range(0, count * 9, 9)
+    ]
+
+
+def generate_license_key() -> str:
+    """Generate a single random license key in BANANA-XXX-XXX-XXX format."""
+    return generate_license_keys(1)[0]
+
+# ==============================================================================
+# 🗜️ TYPE HELPERS
+# Rows store snowflakes as INTEGER and timestamps as epoch seconds; callers
+# still receive str IDs and ISO-8601 strings.
+# ==============================================================================
+
+_SNOWFLAKE_COLUMNS = frozenset({'discord_id', 'created_by', 'used_by'})
+_EPOCH_COLUMNS = frozenset({
+    'joined_at', 'last_login', 'created_at', 'used_at', 'banned_at', 'timestamp', 'expires_at'
+})
+
+# Explicit projections: rows keep their shape if columns are added later, and
+# queries stay answerable from the covering indexes (migration v7)
+_USER_COLUMNS = "discord_id, key, hwid, joined_at, last_login"
+_KEY_COLUMNS = "key, created_by, created_at, used, used_by, used_at"
+_BLACKLIST_COLUMNS = "discord_id, reason, banned_at"
+_TRIAL_COLUMNS = "key, discord_id, created_at, expires_at, ip_address"
+_TRIAL_SESSION_COLUMNS = "token, discord_id, created_at, expires_at, step1_done, step2_done, step3_done, ip_address"
+_ACCOUNT_COLUMNS = "id, discord_id, email, email_verified, username, password_hash, created_at"
+
+
+def _snowflake(value: Any) -> Any:
+    """Discord ID (int or str) -> INTEGER storage value; non-numeric IDs pass through."""
+    if value is None or isinstance(value, int):
+        return value
+    text = str(value).strip()
+    return int(text) if text.isdigit() else text
+
+
+def _epoch(moment: datetime) -> int:
+    return int(moment.timestamp())
+
+
+def _epoch_now() -> int:
+    return int(time.time())
+
+
+def _iso(value: Any) -> Optional[str]:
+    """Epoch seconds -> ISO-8601 UTC string (legacy text values pass through)."""
+    if value is None or isinstance(value, str):
+        return value
+    return datetime.fromtimestamp(value, UTC).isoformat()
+
+
+def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    """Convert a typed row back to the str/ISO dict shape callers expect."""
+    data = dict(row)
+    for column, value in data.items():
+        if value is None:
+            continue
+        if column in _SNOWFLAKE_COLUMNS:
+            data[column] = str(value)
+        elif column in _EPOCH_COLUMNS:
+            data[column] = _iso(value)
+    return data
+
+def _users_cursor(row: sqlite3.Row) -> str:
+    joined = row['joined_at']
+    return f"{'-' if joined is None else joined}:{row['discord_id']}"
+
+
+def _parse_users_cursor(cursor: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """`joined_at:discord_id` (joined_at `-` for undated users) -> typed values."""
+    if not cursor:
+        return None, None
+    joined, sep, discord_id = cursor.partition(':')
+    if not sep or not discord_id.isdigit() or not (joined == '-' or joined.isdigit()):
+        raise ValueError(f"Invalid users cursor: {cursor!r}")
+    return (None if joined == '-' else int(joined)), int(discord_id)
+
+# ==============================================================================
+# 🔎 FULL-TEXT QUERIES
+# Admin input is rebuilt as quoted FTS5 terms so punctuation (key dashes,
+# colons, stray quotes) can never be parsed as query syntax.
+# ==============================================================================
+
+_FTS_TERM = re.compile(r'(-?)"([^"]*)"|(\S+)')
+_FTS_WORD = re.compile(r"\w", re.UNICODE)
+
+
+def _fts_query(text: str) -> str:
+    """
+    Free text -> FTS5 MATCH expression.
+
+    Words and "quoted phrases" must all match, `word*` is a prefix search,
+    `-word` excludes and a bare `OR` between terms is kept. Raises ValueError
+    if nothing searchable is left.
+    """
+    include: List[str] = []
+    exclude: List[str] = []
+    for negated_phrase, phrase, word in _FTS_TERM.findall(text or ""):
+        negated = bool(negated_phrase)
+        if word:
+            if word == "OR":
+                if include and include[-1] != "OR":
+                    include.append("OR")
+                continue
+            negated = word.startswith("-") and len(word) > 1
+            phrase = word[1:] if negated else word
+        prefix = phrase.endswith("*")
+        phrase = phrase.replace('"', '').rstrip("*").strip()
+        if not _FTS_WORD.search(phrase):
+            continue
+        term = f'"{phrase}"' + ("*" if prefix else "")
+        (exclude if negated else include).append(term)
+
+    while include and include[-1] == "OR":
+        include.pop()
+    if not include:
+        raise ValueError("Search needs at least one word to look for")
+    expression = " ".join(include)
+    if exclude:
+        expression = f"({expression}) NOT " + " NOT ".join(exclude)
+    return expression
+
 # ==============================================================================
 # 💾 DATABASE CLASS
 # ==============================================================================
@@ -68,9 +227,11 @@ class Database:
         conn = sqlite3.connect(
             self.filepath,
             check_same_thread=False,
-            timeout=30.0
+            timeout=30.0,
+            factory=tracer.connection_class
         )
         conn.row_factory = sqlite3.Row
+        tracer.attach(conn)
         
         try:
             conn.execute("PRAGMA journal_mode=WAL")
@@ -80,98 +241,12 @@ class Database:
         return conn
 
     def _initialize_schema(self) -> None:
-        """Create database tables if they don't exist."""
-        schema = """
-        CREATE TABLE IF NOT EXISTS users (
-            discord_id TEXT PRIMARY KEY,
-            key TEXT,
-            hwid TEXT,
-            joined_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            last_login TEXT
-        );
-        
-        CREATE TABLE IF NOT EXISTS keys (
-            key TEXT PRIMARY KEY,
-            created_by TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            used INTEGER DEFAULT 0,
-            used_by TEXT,
-            used_at TEXT
-        );
-        
-        CREATE TABLE IF NOT EXISTS blacklist (
-            discord_id TEXT PRIMARY KEY,
-            reason TEXT,
-            banned_at TEXT DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        CREATE TABLE IF NOT EXISTS analytics (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            event_type TEXT,
-            discord_id TEXT,
-            ip_address TEXT,
-            details TEXT,
-            timestamp TEXT DEFAULT CURRENT_TIMESTAMP
-        );
-
-        CREATE TABLE IF NOT EXISTS trials (
-            key TEXT PRIMARY KEY,
-            discord_id TEXT,
-            created_at TEXT,
-            expires_at TEXT,
-            ip_address TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS trial_sessions (
-            token TEXT PRIMARY KEY,
-            discord_id TEXT,
-            created_at TEXT,
-            expires_at TEXT,
-            step1_done INTEGER DEFAULT 0,
-            step2_done INTEGER DEFAULT 0,
-            step3_done INTEGER DEFAULT 0,
-            ip_address TEXT
-        );
-
-        -- New accounts table for username/password authentication
-        CREATE TABLE IF NOT EXISTS accounts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            discord_id TEXT UNIQUE NOT NULL,
-            email TEXT NOT NULL,
-            email_verified INTEGER DEFAULT 0,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (discord_id) REFERENCES users(discord_id)
-        );
-
-        -- Email verification codes
-        CREATE TABLE IF NOT EXISTS email_codes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            discord_id TEXT NOT NULL,
-            email TEXT NOT NULL,
-            code TEXT NOT NULL,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            expires_at TEXT NOT NULL
-        );
-        
-        CREATE INDEX IF NOT EXISTS idx_users_key ON users(key);
-        CREATE INDEX IF NOT EXISTS idx_keys_used ON keys(used);
-        CREATE INDEX IF NOT EXISTS idx_analytics_discord ON analytics(discord_id);
-        CREATE INDEX IF NOT EXISTS idx_analytics_event ON analytics(event_type);
-        CREATE INDEX IF NOT EXISTS idx_trials_discord ON trials(discord_id);
-        CREATE INDEX IF NOT EXISTS idx_trial_sessions_discord ON trial_sessions(discord_id);
-        CREATE INDEX IF NOT EXISTS idx_accounts_username ON accounts(username);
-        CREATE INDEX IF NOT EXISTS idx_accounts_discord ON accounts(discord_id);
-        CREATE INDEX IF NOT EXISTS idx_email_codes_discord ON email_codes(discord_id);
-        """
-        
+        """Create or upgrade the schema through the versioned migrations."""
         conn = None
         try:
             conn = self.get_connection()
-            conn.executescript(schema)
-            conn.commit()
-            log.info("✅ Database schema initialized")
+            run_migrations(conn)
+            log.info(f"✅ Database schema initialized (v{get_schema_version(conn)})")
         except Exception as e:
             log.error(f"❌ Failed to initialize schema: {e}")
             raise
@@ -185,7 +260,7 @@ class Database:
 
     def register_user(self, discord_id: int | str, key: str) -> bool:
         """Register a new user or update existing user."""
-        discord_id_str = str(discord_id)
+        snowflake = _snowflake(discord_id)
         conn = None
         
         try:
@@ -197,10 +272,10 @@ class Database:
                 VALUES (?, ?, ?)
                 ON CONFLICT(discord_id) DO UPDATE SET key = excluded.key
                 """,
-                (discord_id_str, key, datetime.now(UTC).isoformat())
+                (snowflake, key, _epoch_now())
             )
             conn.commit()
-            log.info(f"✅ Registered user: {discord_id_str} with key: {key}")
+            log.info(f"✅ Registered user: {snowflake} with key: {key}")
             return True
             
         except Exception as e:
@@ -212,17 +287,17 @@ class Database:
 
     def get_user(self, discord_id: int | str) -> Optional[Dict[str, Any]]:
         """Get user data by Discord ID."""
-        discord_id_str = str(discord_id)
+        snowflake = _snowflake(discord_id)
         conn = None
         
         try:
             conn = self.get_connection()
             cur = conn.cursor()
-            cur.execute("SELECT * FROM users WHERE discord_id = ?", (discord_id_str,))
+            cur.execute(f"SELECT {_USER_COLUMNS} FROM users WHERE discord_id = ?", (snowflake,))
             row = cur.fetchone()
             
             if row:
-                return dict(row)
+                return _row_to_dict(row)
             return None
             
         except Exception as e:
@@ -234,8 +309,8 @@ class Database:
 
     def update_last_login(self, discord_id: int | str, ip_address: Optional[str] = None) -> bool:
         """Update user's last login time."""
-        discord_id_str = str(discord_id)
-        timestamp = datetime.now(UTC).isoformat()
+        snowflake = _snowflake(discord_id)
+        timestamp = _epoch_now()
         conn = None
         
         try:
@@ -243,10 +318,10 @@ class Database:
             cur = conn.cursor()
             cur.execute(
                 "UPDATE users SET last_login = ? WHERE discord_id = ?",
-                (timestamp, discord_id_str)
+                (timestamp, snowflake)
             )
             conn.commit()
-            self.log_event("login", discord_id_str, ip_address, "User logged in")
+            self.log_event("login", snowflake, ip_address, "User logged in")
             return True
             
         except Exception as e:
@@ -258,18 +333,18 @@ class Database:
 
     def reset_hwid(self, discord_id: int | str) -> bool:
         """Reset user's HWID."""
-        discord_id_str = str(discord_id)
+        snowflake = _snowflake(discord_id)
         conn = None
         
         try:
             conn = self.get_connection()
             cur = conn.cursor()
-            cur.execute("UPDATE users SET hwid = NULL WHERE discord_id = ?", (discord_id_str,))
+            cur.execute("UPDATE users SET hwid = NULL WHERE discord_id = ?", (snowflake,))
             rows_affected = cur.rowcount
             conn.commit()
             
             if rows_affected > 0:
-                log.info(f"✅ Reset HWID for user: {discord_id_str}")
+                log.info(f"✅ Reset HWID for user: {snowflake}")
                 return True
             return False
             
@@ -282,18 +357,18 @@ class Database:
 
     def unwhitelist(self, discord_id: int | str) -> int:
         """Remove a user's key (unwhitelist them)."""
-        discord_id_str = str(discord_id)
+        snowflake = _snowflake(discord_id)
         conn = None
         
         try:
             conn = self.get_connection()
             cur = conn.cursor()
-            cur.execute("UPDATE users SET key = NULL WHERE discord_id = ?", (discord_id_str,))
+            cur.execute("UPDATE users SET key = NULL WHERE discord_id = ?", (snowflake,))
             rows_affected = cur.rowcount
             conn.commit()
             
             if rows_affected > 0:
-                log.info(f"✅ Unwhitelisted user: {discord_id_str}")
+                log.info(f"✅ Unwhitelisted user: {snowflake}")
             
             return rows_affected
             
@@ -317,7 +392,7 @@ class Database:
             cur = conn.cursor()
             cur.execute(
                 "INSERT INTO keys (key, created_by, created_at) VALUES (?, ?, ?)",
-                (key, str(created_by), datetime.now(UTC).isoformat())
+                (key, _snowflake(created_by), _epoch_now())
             )
             conn.commit()
             log.info(f"✅ Generated key: {key}")
@@ -333,6 +408,68 @@ class Database:
             if conn:
                 conn.close()
 
+    def mint_keys(self, count: int, created_by: int | str, max_rounds: int = 10) -> List[str]:
+        """
+        Mint `count` unique license keys in a single transaction.
+        
+        Candidates are checked against existing keys in bulk and inserted with
+        one executemany; only colliding keys are regenerated.
+        
+        Returns:
+            List[str]: The newly minted keys (empty on failure)
+        """
+        if count <= 0:
+            return []
+        
+        creator = _snowflake(created_by)
+        now = _epoch_now()
+        minted: List[str] = []
+        seen: set = set()
+        conn = None
+        
+        try:
+            conn = self.get_connection()
+            cur = conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            
+            for _ in range(max_rounds):
+                needed = count - len(minted)
+                if needed <= 0:
+                    break
+                
+                candidates = [k for k in dict.fromkeys(generate_license_keys(needed)) if k not in seen]
+                seen.update(candidates)
+                
+                taken = set()
+                for i in range(0, len(candidates), _SQL_CHUNK_SIZE):
+                    chunk = candidates[i:i + _SQL_CHUNK_SIZE]
+                    placeholders = ",".join("?" * len(chunk))
+                    cur.execute(f"SELECT key FROM keys WHERE key IN ({placeholders})", chunk)
+                    taken.update(row[0] for row in cur.fetchall())
+                
+                fresh = [k for k in candidates if k not in taken]
+                cur.executemany(
+                    "INSERT INTO keys (key, created_by, created_at) VALUES (?, ?, ?)",
+                    [(k, creator, now) for k in fresh]
+                )
+                minted.extend(fresh)
+            
+            if len(minted) < count:
+                log.warning(f"Key minting stopped short: {len(minted)}/{count} after {max_rounds} rounds")
+            
+            conn.commit()
+            log.info(f"✅ Minted {len(minted)} keys for {creator}")
+            return minted
+            
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            log.error(f"Error minting keys: {e}")
+            return []
+        finally:
+            if conn:
+                conn.close()
+
     def check_key_available(self, key: str) -> bool:
         """Check if a key exists and is not used."""
         conn = None
@@ -356,7 +493,7 @@ class Database:
 
     def mark_key_redeemed(self, key: str, discord_id: int | str) -> bool:
         """Mark a key as redeemed."""
-        discord_id_str = str(discord_id)
+        snowflake = _snowflake(discord_id)
         conn = None
         
         try:
@@ -364,10 +501,10 @@ class Database:
             cur = conn.cursor()
             cur.execute(
                 "UPDATE keys SET used = 1, used_by = ?, used_at = ? WHERE key = ?",
-                (discord_id_str, datetime.now(UTC).isoformat(), key)
+                (snowflake, _epoch_now(), key)
             )
             conn.commit()
-            log.info(f"✅ Marked key as redeemed: {key} by {discord_id_str}")
+            log.info(f"✅ Marked key as redeemed: {key} by {snowflake}")
             return True
             
         except Exception as e:
@@ -400,9 +537,16 @@ class Database:
         try:
             conn = self.get_connection()
             cur = conn.cursor()
-            cur.execute("SELECT * FROM trials WHERE key = ?", (key,))
+            cur.execute(
+                f"SELECT {_TRIAL_COLUMNS}, expires_at > ? AS active FROM trials WHERE key = ?",
+                (_epoch_now(), key)
+            )
             row = cur.fetchone()
-            return dict(row) if row else None
+            if not row:
+                return None
+            trial = _row_to_dict(row)
+            trial['active'] = bool(trial['active'])
+            return trial
         except Exception as e:
             log.error(f"Error getting trial by key: {e}")
             return None
@@ -411,25 +555,17 @@ class Database:
                 conn.close()
 
     def get_active_trial_by_user(self, discord_id: int | str) -> Optional[Dict[str, Any]]:
-        discord_id_str = str(discord_id)
+        snowflake = _snowflake(discord_id)
         conn = None
         try:
             conn = self.get_connection()
             cur = conn.cursor()
             cur.execute(
-                "SELECT * FROM trials WHERE discord_id = ? ORDER BY created_at DESC LIMIT 1",
-                (discord_id_str,)
+                f"SELECT {_TRIAL_COLUMNS} FROM trials WHERE discord_id = ? AND expires_at > ? ORDER BY created_at DESC LIMIT 1",
+                (snowflake, _epoch_now())
             )
             row = cur.fetchone()
-            if not row:
-                return None
-            trial = dict(row)
-            expires_at = trial.get("expires_at")
-            if not expires_at:
-                return None
-            if datetime.fromisoformat(expires_at) <= datetime.now(UTC):
-                return None
-            return trial
+            return _row_to_dict(row) if row else None
         except Exception as e:
             log.error(f"Error getting trial for user: {e}")
             return None
@@ -438,8 +574,8 @@ class Database:
                 conn.close()
 
     def create_trial(self, discord_id: int | str, ip_address: Optional[str] = None, hours: int = 24) -> Optional[Dict[str, Any]]:
-        discord_id_str = str(discord_id)
-        now = datetime.now(UTC)
+        snowflake = _snowflake(discord_id)
+        now = datetime.now(UTC).replace(microsecond=0)
         expires = now + timedelta(hours=hours)
         conn = None
         try:
@@ -448,25 +584,22 @@ class Database:
 
             # Reuse active trial if exists
             cur.execute(
-                "SELECT * FROM trials WHERE discord_id = ? ORDER BY created_at DESC LIMIT 1",
-                (discord_id_str,)
+                f"SELECT {_TRIAL_COLUMNS} FROM trials WHERE discord_id = ? AND expires_at > ? ORDER BY created_at DESC LIMIT 1",
+                (snowflake, _epoch(now))
             )
             row = cur.fetchone()
             if row:
-                trial = dict(row)
-                expires_at = trial.get("expires_at")
-                if expires_at and datetime.fromisoformat(expires_at) > now:
-                    return trial
+                return _row_to_dict(row)
 
             key = self._generate_trial_key()
             cur.execute(
                 "INSERT INTO trials (key, discord_id, created_at, expires_at, ip_address) VALUES (?, ?, ?, ?, ?)",
-                (key, discord_id_str, now.isoformat(), expires.isoformat(), ip_address)
+                (key, snowflake, _epoch(now), _epoch(expires), ip_address)
             )
             conn.commit()
             return {
                 "key": key,
-                "discord_id": discord_id_str,
+                "discord_id": str(discord_id),
                 "created_at": now.isoformat(),
                 "expires_at": expires.isoformat(),
                 "ip_address": ip_address
@@ -483,8 +616,8 @@ class Database:
     # =======================================================================
 
     def create_trial_session(self, discord_id: int | str, ip_address: Optional[str] = None, hours: int = 2) -> Optional[Dict[str, Any]]:
-        discord_id_str = str(discord_id)
-        now = datetime.now(UTC)
+        snowflake = _snowflake(discord_id)
+        now = datetime.now(UTC).replace(microsecond=0)
         expires = now + timedelta(hours=hours)
         token = str(uuid.uuid4())
         conn = None
@@ -496,12 +629,12 @@ class Database:
                 INSERT INTO trial_sessions (token, discord_id, created_at, expires_at, step1_done, step2_done, ip_address)
                 VALUES (?, ?, ?, ?, 0, 0, ?)
                 """,
-                (token, discord_id_str, now.isoformat(), expires.isoformat(), ip_address)
+                (token, snowflake, _epoch(now), _epoch(expires), ip_address)
             )
             conn.commit()
             return {
                 "token": token,
-                "discord_id": discord_id_str,
+                "discord_id": str(discord_id),
                 "created_at": now.isoformat(),
                 "expires_at": expires.isoformat(),
                 "step1_done": 0,
@@ -520,15 +653,12 @@ class Database:
         try:
             conn = self.get_connection()
             cur = conn.cursor()
-            cur.execute("SELECT * FROM trial_sessions WHERE token = ?", (token,))
+            cur.execute(
+                f"SELECT {_TRIAL_SESSION_COLUMNS} FROM trial_sessions WHERE token = ? AND expires_at > ?",
+                (token, _epoch_now())
+            )
             row = cur.fetchone()
-            if not row:
-                return None
-            session = dict(row)
-            expires_at = session.get("expires_at")
-            if expires_at and datetime.fromisoformat(expires_at) <= datetime.now(UTC):
-                return None
-            return session
+            return _row_to_dict(row) if row else None
         except Exception as e:
             log.error(f"Error getting trial session: {e}")
             return None
@@ -600,13 +730,13 @@ class Database:
 
     def is_blacklisted(self, discord_id: int | str) -> bool:
         """Check if user is blacklisted."""
-        discord_id_str = str(discord_id)
+        snowflake = _snowflake(discord_id)
         conn = None
         
         try:
             conn = self.get_connection()
             cur = conn.cursor()
-            cur.execute("SELECT 1 FROM blacklist WHERE discord_id = ?", (discord_id_str,))
+            cur.execute("SELECT 1 FROM blacklist WHERE discord_id = ?", (snowflake,))
             result = cur.fetchone()
             return result is not None
             
@@ -619,10 +749,10 @@ class Database:
 
     def toggle_blacklist(self, discord_id: int | str, reason: str = "No reason") -> bool:
         """Toggle blacklist status for a user."""
-        discord_id_str = str(discord_id)
+        snowflake = _snowflake(discord_id)
         
         # Check if already blacklisted
-        is_banned = self.is_blacklisted(discord_id_str)
+        is_banned = self.is_blacklisted(snowflake)
         conn = None
         
         try:
@@ -631,18 +761,18 @@ class Database:
             
             if is_banned:
                 # Remove from blacklist
-                cur.execute("DELETE FROM blacklist WHERE discord_id = ?", (discord_id_str,))
+                cur.execute("DELETE FROM blacklist WHERE discord_id = ?", (snowflake,))
                 conn.commit()
-                log.info(f"✅ Removed from blacklist: {discord_id_str}")
+                log.info(f"✅ Removed from blacklist: {snowflake}")
                 return False
             else:
                 # Add to blacklist
                 cur.execute(
                     "INSERT INTO blacklist (discord_id, reason, banned_at) VALUES (?, ?, ?)",
-                    (discord_id_str, reason, datetime.now(UTC).isoformat())
+                    (snowflake, reason, _epoch_now())
                 )
                 conn.commit()
-                log.info(f"✅ Added to blacklist: {discord_id_str} - Reason: {reason}")
+                log.info(f"✅ Added to blacklist: {snowflake} - Reason: {reason}")
                 return True
                 
         except Exception as e:
@@ -654,18 +784,18 @@ class Database:
 
     def unblacklist(self, discord_id: int | str) -> int:
         """Explicitly remove a user from blacklist."""
-        discord_id_str = str(discord_id)
+        snowflake = _snowflake(discord_id)
         conn = None
         
         try:
             conn = self.get_connection()
             cur = conn.cursor()
-            cur.execute("DELETE FROM blacklist WHERE discord_id = ?", (discord_id_str,))
+            cur.execute("DELETE FROM blacklist WHERE discord_id = ?", (snowflake,))
             rows_affected = cur.rowcount
             conn.commit()
             
             if rows_affected > 0:
-                log.info(f"✅ Unblacklisted user: {discord_id_str}")
+                log.info(f"✅ Unblacklisted user: {snowflake}")
             
             return rows_affected
             
@@ -698,7 +828,7 @@ class Database:
                 INSERT INTO analytics (event_type, discord_id, ip_address, details, timestamp)
                 VALUES (?, ?, ?, ?, ?)
                 """,
-                (event_type, discord_id, ip_address, details, datetime.now(UTC).isoformat())
+                (event_type, _snowflake(discord_id), ip_address, details, _epoch_now())
             )
             conn.commit()
             return True
@@ -790,9 +920,9 @@ class Database:
         try:
             conn = self.get_connection()
             cur = conn.cursor()
-            cur.execute("SELECT * FROM users ORDER BY joined_at DESC")
+            cur.execute(f"SELECT {_USER_COLUMNS} FROM users ORDER BY joined_at DESC")
             rows = cur.fetchall()
-            return [dict(row) for row in rows]
+            return [_row_to_dict(row) for row in rows]
             
         except Exception as e:
             log.error(f"Error getting all users: {e}")
@@ -801,6 +931,141 @@ class Database:
             if conn:
                 conn.close()
 
+    def get_users_page(self, limit: int = 10, cursor: Optional[str] = None, offset: int = 0) -> Dict[str, Any]:
+        """
+        Keyset-paginated users, newest first.
+
+        `cursor` is the opaque `next_cursor` from the previous page. Rows are
+        ordered by (joined_at DESC, discord_id DESC) so idx_users_joined (which
+        carries the rowid) serves every page without an OFFSET scan. Users
+        with no joined_at are listed after everyone else.
+
+        `offset` (ignored with a cursor) starts at that position instead, for
+        jumping straight to a deep page: one index-only OFFSET lookup finds
+        the row before it, then the page is read like any other.
+
+        Raises ValueError for a malformed cursor.
+        """
+        limit = max(1, min(int(limit), 100))
+        offset = max(0, int(offset))
+        after_joined, after_id = _parse_users_cursor(cursor)
+        conn = None
+        
+        try:
+            conn = self.get_connection()
+            cur = conn.cursor()
+            rows: List[sqlite3.Row] = []
+            
+            if cursor is None and offset:
+                cursor = self._users_cursor_at(cur, offset - 1)
+                if cursor is None:
+                    return {'users': [], 'next_cursor': None}
+                after_joined, after_id = _parse_users_cursor(cursor)
+            
+            if after_joined is not None or cursor is None:
+                if cursor is None:
+                    cur.execute(f"""
+                        SELECT {_USER_COLUMNS} FROM users WHERE joined_at IS NOT NULL
+                        ORDER BY joined_at DESC, discord_id DESC LIMIT ?
+                    """, (limit + 1,))
+                else:
+                    cur.execute(f"""
+                        SELECT {_USER_COLUMNS} FROM users WHERE (joined_at, discord_id) < (?, ?)
+                        ORDER BY joined_at DESC, discord_id DESC LIMIT ?
+                    """, (after_joined, after_id, limit + 1))
+                rows = cur.fetchall()
+            
+            if len(rows) <= limit:
+                # Dated users exhausted; continue into the undated tail
+                if after_joined is None and cursor is not None:
+                    cur.execute(f"""
+                        SELECT {_USER_COLUMNS} FROM users WHERE joined_at IS NULL AND discord_id < ?
+                        ORDER BY discord_id DESC LIMIT ?
+                    """, (after_id, limit + 1))
+                else:
+                    cur.execute(f"""
+                        SELECT {_USER_COLUMNS} FROM users WHERE joined_at IS NULL
+                        ORDER BY discord_id DESC LIMIT ?
+                    """, (limit + 1 - len(rows),))
+                rows.extend(cur.fetchall())
+            
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            next_cursor = _users_cursor(rows[-1]) if has_more and rows else None
+            return {'users': [_row_to_dict(row) for row in rows], 'next_cursor': next_cursor}
+            
+        except Exception as e:
+            log.error(f"Error getting users page: {e}")
+            return {'users': [], 'next_cursor': None}
+        finally:
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def _users_cursor_at(cur: sqlite3.Cursor, position: int) -> Optional[str]:
+        """Cursor of the user at `position` in get_users_page order, or None past the end."""
+        row = cur.execute("""
+            SELECT joined_at, discord_id FROM users WHERE joined_at IS NOT NULL
+            ORDER BY joined_at DESC, discord_id DESC LIMIT 1 OFFSET ?
+        """, (position,)).fetchone()
+        if row is None:
+            dated = cur.execute("SELECT COUNT(*) FROM users WHERE joined_at IS NOT NULL").fetchone()[0]
+            row = cur.execute("""
+                SELECT NULL AS joined_at, discord_id FROM users WHERE joined_at IS NULL
+                ORDER BY discord_id DESC LIMIT 1 OFFSET ?
+            """, (position - dated,)).fetchone()
+        return _users_cursor(row) if row else None
+
+    def count_users(self) -> int:
+        """Total number of users."""
+        conn = None
+        
+        try:
+            conn = self.get_connection()
+            return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        except Exception as e:
+            log.error(f"Error counting users: {e}")
+            return 0
+        finally:
+            if conn:
+                conn.close()
+
+    def get_licensed_ids(self, discord_ids: Optional[List[int | str]] = None) -> Optional[Set[int]]:
+        """
+        Discord IDs that should hold the Premium role: users with a key who
+        aren't blacklisted. Pass `discord_ids` to check just those users.
+
+        Returns None when the lookup fails, never an empty set: callers
+        diff against this, and "nobody is licensed" strips every role.
+        """
+        sql = """
+            SELECT u.discord_id FROM users u
+            WHERE u.key IS NOT NULL AND u.key != '' AND typeof(u.discord_id) = 'integer'
+              AND NOT EXISTS (SELECT 1 FROM blacklist b WHERE b.discord_id = u.discord_id)
+        """
+        conn = None
+        
+        try:
+            conn = self.get_connection()
+            if discord_ids is None:
+                return {row[0] for row in conn.execute(sql)}
+            
+            snowflakes = [_snowflake(d) for d in discord_ids]
+            licensed: Set[int] = set()
+            for i in range(0, len(snowflakes), _SQL_CHUNK_SIZE):
+                chunk = snowflakes[i:i + _SQL_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                licensed.update(
+                    row[0] for row in conn.execute(f"{sql} AND u.discord_id IN ({placeholders})", chunk)
+                )
+            return licensed
+        except Exception as e:
+            log.error(f"Error getting licensed users: {e}")
+            return None
+        finally:
+            if conn:
+                conn.close()
+
     def get_all_keys(self, unused_only: bool = False) -> List[Dict]:
         """Get all keys from database."""
         conn = None
@@ -810,12 +1075,12 @@ class Database:
             cur = conn.cursor()
             
             if unused_only:
-                cur.execute("SELECT * FROM keys WHERE used = 0 ORDER BY created_at DESC")
+                cur.execute(f"SELECT {_KEY_COLUMNS} FROM keys WHERE used = 0 ORDER BY created_at DESC")
             else:
-                cur.execute("SELECT * FROM keys ORDER BY created_at DESC")
+                cur.execute(f"SELECT {_KEY_COLUMNS} FROM keys ORDER BY created_at DESC")
             
             rows = cur.fetchall()
-            return [dict(row) for row in rows]
+            return [_row_to_dict(row) for row in rows]
             
         except Exception as e:
             log.error(f"Error getting keys: {e}")
@@ -831,9 +1096,9 @@ class Database:
         try:
             conn = self.get_connection()
             cur = conn.cursor()
-            cur.execute("SELECT * FROM blacklist ORDER BY banned_at DESC")
+            cur.execute(f"SELECT {_BLACKLIST_COLUMNS} FROM blacklist ORDER BY banned_at DESC")
             rows = cur.fetchall()
-            return [dict(row) for row in rows]
+            return [_row_to_dict(row) for row in rows]
             
         except Exception as e:
             log.error(f"Error getting blacklisted users: {e}")
@@ -844,7 +1109,7 @@ class Database:
 
     def get_user_analytics(self, discord_id: int | str) -> Dict[str, int]:
         """Get analytics for a specific user."""
-        discord_id_str = str(discord_id)
+        snowflake = _snowflake(discord_id)
         conn = None
         
         try:
@@ -854,14 +1119,14 @@ class Database:
             # Login count
             cur.execute(
                 "SELECT COUNT(*) FROM analytics WHERE discord_id = ? AND event_type = 'login'",
-                (discord_id_str,)
+                (snowflake,)
             )
             login_count = cur.fetchone()[0]
             
             # HWID reset count
             cur.execute(
                 "SELECT COUNT(*) FROM analytics WHERE discord_id = ? AND event_type = 'hwid_reset'",
-                (discord_id_str,)
+                (snowflake,)
             )
             reset_count = cur.fetchone()[0]
             
@@ -880,6 +1145,91 @@ class Database:
             if conn:
                 conn.close()
 
+    def search_analytics(
+        self,
+        query: str,
+        event_types: Optional[List[str]] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        limit: int = 25,
+        order: str = "rank"
+    ) -> List[Dict[str, Any]]:
+        """
+        Full-text search over analytics.details via the analytics_fts index.
+
+        `since`/`until` are epoch seconds (until exclusive). `order` is
+        `rank` (bm25, best first) or `recent`. Each hit carries a `snippet`
+        with matches in **bold** and its bm25 `score` (lower is better).
+
+        bm25 reads a per-row document size, so `rank` only scores the newest
+        Config.SEARCH_RANK_WINDOW matches; a word in every login event then
+        costs the same as one in three bug reports.
+
+        Raises ValueError for a query with nothing searchable in it.
+        """
+        match = _fts_query(query)
+        limit = max(1, min(int(limit), 100))
+        filters = ""
+        filter_params: List[Any] = []
+        if event_types:
+            filters += f" AND a.event_type IN ({','.join('?' * len(event_types))})"
+            filter_params.extend(event_types)
+        if since is not None:
+            filters += " AND a.timestamp >= ?"
+            filter_params.append(int(since))
+        if until is not None:
+            filters += " AND a.timestamp < ?"
+            filter_params.append(int(until))
+        
+        columns = """
+            a.id, a.event_type, a.discord_id, a.details, a.timestamp,
+            analytics_fts.rank AS score,
+            snippet(analytics_fts, 0, '**', '**', '…', 24) AS snippet
+        """
+        if order == "recent":
+            # Rowids follow insertion order, which FTS5 walks without sorting
+            sql = f"""
+                SELECT {columns}
+                FROM analytics_fts JOIN analytics a ON a.id = analytics_fts.rowid
+                WHERE analytics_fts MATCH ?{filters}
+                ORDER BY analytics_fts.rowid DESC
+                LIMIT ?
+            """
+            params = [match, *filter_params, limit]
+        else:
+            sql = f"""
+                WITH window AS (
+                    SELECT analytics_fts.rowid AS id
+                    FROM analytics_fts JOIN analytics a ON a.id = analytics_fts.rowid
+                    WHERE analytics_fts MATCH ?{filters}
+                    ORDER BY analytics_fts.rowid DESC
+                    LIMIT ?
+                )
+                SELECT {columns}
+                FROM analytics_fts JOIN analytics a ON a.id = analytics_fts.rowid
+                WHERE analytics_fts MATCH ?
+                  AND analytics_fts.rowid >= (SELECT MIN(id) FROM window){filters}
+                ORDER BY analytics_fts.rank
+                LIMIT ?
+            """
+            params = [match, *filter_params, Config.SEARCH_RANK_WINDOW, match, *filter_params, limit]
+        conn = None
+        
+        try:
+            conn = self.get_connection()
+            results = []
+            for row in conn.execute(sql, params).fetchall():
+                hit = _row_to_dict(row)
+                hit['score'] = round(hit['score'], 4)
+                results.append(hit)
+            return results
+            
+        except Exception as e:
+            log.error(f"Error searching analytics: {e}")
+            return []
+        finally:
+            if conn:
+                conn.close()
 
     # ==========================================================================
     # 🔐 ACCOUNT OPERATIONS (Username/Password Auth)
@@ -916,7 +1266,7 @@ class Database:
         try:
             conn = self.get_connection()
             cur = conn.cursor()
-            cur.execute("SELECT 1 FROM accounts WHERE LOWER(username) = LOWER(?)", (username,))
+            cur.execute("SELECT 1 FROM accounts WHERE username = ? COLLATE NOCASE", (username,))
             return cur.fetchone() is None
         except Exception as e:
             log.error(f"Error checking username: {e}")
@@ -927,7 +1277,7 @@ class Database:
 
     def create_account(self, discord_id: int | str, email: str, username: str, password: str) -> bool:
         """Create a new account with username/password."""
-        discord_id_str = str(discord_id)
+        snowflake = _snowflake(discord_id)
         password_hash = self.hash_password(password)
         conn = None
         
@@ -939,10 +1289,10 @@ class Database:
                 INSERT INTO accounts (discord_id, email, email_verified, username, password_hash, created_at)
                 VALUES (?, ?, 1, ?, ?, ?)
                 """,
-                (discord_id_str, email, username, password_hash, datetime.now(UTC).isoformat())
+                (snowflake, email, username, password_hash, _epoch_now())
             )
             conn.commit()
-            log.info(f"✅ Created account for user: {discord_id_str} with username: {username}")
+            log.info(f"✅ Created account for user: {snowflake} with username: {username}")
             return True
         except sqlite3.IntegrityError as e:
             log.warning(f"Account creation failed (duplicate): {e}")
@@ -960,9 +1310,9 @@ class Database:
         try:
             conn = self.get_connection()
             cur = conn.cursor()
-            cur.execute("SELECT * FROM accounts WHERE LOWER(username) = LOWER(?)", (username,))
+            cur.execute(f"SELECT {_ACCOUNT_COLUMNS} FROM accounts WHERE username = ? COLLATE NOCASE", (username,))
             row = cur.fetchone()
-            return dict(row) if row else None
+            return _row_to_dict(row) if row else None
         except Exception as e:
             log.error(f"Error getting account by username: {e}")
             return None
@@ -972,14 +1322,14 @@ class Database:
 
     def get_account_by_discord(self, discord_id: int | str) -> Optional[Dict[str, Any]]:
         """Get account by Discord ID."""
-        discord_id_str = str(discord_id)
+        snowflake = _snowflake(discord_id)
         conn = None
         try:
             conn = self.get_connection()
             cur = conn.cursor()
-            cur.execute("SELECT * FROM accounts WHERE discord_id = ?", (discord_id_str,))
+            cur.execute(f"SELECT {_ACCOUNT_COLUMNS} FROM accounts WHERE discord_id = ?", (snowflake,))
             row = cur.fetchone()
-            return dict(row) if row else None
+            return _row_to_dict(row) if row else None
         except Exception as e:
             log.error(f"Error getting account by discord: {e}")
             return None
@@ -993,8 +1343,8 @@ class Database:
 
     def store_email_code(self, discord_id: int | str, email: str, code: str, expires_minutes: int = 10) -> bool:
         """Store an email verification code."""
-        discord_id_str = str(discord_id)
-        now = datetime.now(UTC)
+        snowflake = _snowflake(discord_id)
+        now = datetime.now(UTC).replace(microsecond=0)
         expires_at = now + timedelta(minutes=expires_minutes)
         conn = None
         
@@ -1002,17 +1352,17 @@ class Database:
             conn = self.get_connection()
             cur = conn.cursor()
             # Delete any existing codes for this user
-            cur.execute("DELETE FROM email_codes WHERE discord_id = ?", (discord_id_str,))
+            cur.execute("DELETE FROM email_codes WHERE discord_id = ?", (snowflake,))
             # Insert new code
             cur.execute(
                 """
                 INSERT INTO email_codes (discord_id, email, code, created_at, expires_at)
                 VALUES (?, ?, ?, ?, ?)
                 """,
-                (discord_id_str, email, code, now.isoformat(), expires_at.isoformat())
+                (snowflake, email, code, _epoch(now), _epoch(expires_at))
             )
             conn.commit()
-            log.info(f"✅ Stored email code for: {discord_id_str}")
+            log.info(f"✅ Stored email code for: {snowflake}")
             return True
         except Exception as e:
             log.error(f"Error storing email code: {e}")
@@ -1023,30 +1373,29 @@ class Database:
 
     def verify_email_code(self, discord_id: int | str, code: str) -> Optional[str]:
         """Verify email code and return email if valid."""
-        discord_id_str = str(discord_id)
+        snowflake = _snowflake(discord_id)
         conn = None
         try:
             conn = self.get_connection()
             cur = conn.cursor()
             cur.execute(
-                "SELECT email, expires_at FROM email_codes WHERE discord_id = ? AND code = ?",
-                (discord_id_str, code)
+                "SELECT email, expires_at > ? AS active FROM email_codes WHERE discord_id = ? AND code = ?",
+                (_epoch_now(), snowflake, code)
             )
             row = cur.fetchone()
             
             if not row:
                 return None
             
-            expires_at = datetime.fromisoformat(row['expires_at'])
-            if expires_at <= datetime.now(UTC):
+            if not row['active']:
                 # Code expired
-                cur.execute("DELETE FROM email_codes WHERE discord_id = ?", (discord_id_str,))
+                cur.execute("DELETE FROM email_codes WHERE discord_id = ?", (snowflake,))
                 conn.commit()
                 return None
             
             # Valid code - delete it and return email
             email = row['email']
-            cur.execute("DELETE FROM email_codes WHERE discord_id = ?", (discord_id_str,))
+            cur.execute("DELETE FROM email_codes WHERE discord_id = ?", (snowflake,))
             conn.commit()
             return email
         except Exception as e:
@@ -1058,12 +1407,12 @@ class Database:
 
     def get_pending_email(self, discord_id: int | str) -> Optional[str]:
         """Get pending email for a user's verification."""
-        discord_id_str = str(discord_id)
+        snowflake = _snowflake(discord_id)
         conn = None
         try:
             conn = self.get_connection()
             cur = conn.cursor()
-            cur.execute("SELECT email FROM email_codes WHERE discord_id = ?", (discord_id_str,))
+            cur.execute("SELECT email FROM email_codes WHERE discord_id = ?", (snowflake,))
             row = cur.fetchone()
             return row['email'] if row else None
         except Exception as e:
@@ -1083,37 +1432,36 @@ class Database:
         
         Returns the token if created, None if user already has recent trial.
         """
-        discord_id_str = str(discord_id)
+        snowflake = _snowflake(discord_id)
         conn = None
         try:
             conn = self.get_connection()
             cur = conn.cursor()
             
+            now = _epoch_now()
+            
             # Check for existing trial in last 24 hours
             cur.execute(
-                "SELECT created_at FROM trial_sessions WHERE discord_id = ? ORDER BY created_at DESC LIMIT 1",
-                (discord_id_str,)
+                "SELECT 1 FROM trial_sessions WHERE discord_id = ? AND created_at > ? LIMIT 1",
+                (snowflake, now - 24 * 3600)
             )
-            row = cur.fetchone()
-            if row:
-                last_trial = datetime.fromisoformat(row['created_at'])
-                if datetime.now(UTC) - last_trial < timedelta(hours=24):
-                    log.warning(f"Trial session rate limited for {discord_id_str}")
-                    return None
+            if cur.fetchone():
+                log.warning(f"Trial session rate limited for {snowflake}")
+                return None
             
             # Generate cryptographic token
             token = secrets.token_hex(32)  # 64 characters
-            created_at = datetime.now(UTC).isoformat()
-            expires_at = (datetime.now(UTC) + timedelta(minutes=30)).isoformat()
+            created_at = now
+            expires_at = now + 30 * 60
             
             cur.execute(
                 """INSERT INTO trial_sessions 
                    (token, discord_id, created_at, expires_at, step1_done, step2_done, step3_done, ip_address)
                    VALUES (?, ?, ?, ?, 0, 0, 0, ?)""",
-                (token, discord_id_str, created_at, expires_at, ip_address)
+                (token, snowflake, created_at, expires_at, ip_address)
             )
             conn.commit()
-            log.info(f"Created trial session for {discord_id_str}: {token[:16]}...")
+            log.info(f"Created trial session for {snowflake}: {token[:16]}...")
             return token
         except Exception as e:
             log.error(f"Error creating trial session: {e}")
@@ -1122,17 +1470,47 @@ class Database:
             if conn:
                 conn.close()
 
+    def get_recent_trial_starts(self, since: int) -> List[Tuple[Optional[str], int, int]]:
+        """
+        (ip_address, discord_id, created_at) of trials issued and trial flows
+        started since `since`, oldest first. abuse_guard.py replays these
+        after a restart.
+        """
+        conn = None
+        
+        try:
+            conn = self.get_connection()
+            rows = conn.execute(
+                """
+                SELECT ip_address, discord_id, created_at FROM trials
+                WHERE ip_address IS NOT NULL AND created_at >= ?
+                UNION ALL
+                SELECT ip_address, discord_id, created_at FROM trial_sessions
+                WHERE expires_at >= ? AND created_at >= ?
+                """,
+                # Sessions expire after they're created, so the expiry index bounds the range
+                (since, since, since)
+            ).fetchall()
+            # Sorted here rather than in SQL: the two halves come off different indexes
+            return sorted((tuple(row) for row in rows), key=lambda row: row[2])
+        except Exception as e:
+            log.error(f"Error getting recent trial starts: {e}")
+            return []
+        finally:
+            if conn:
+                conn.close()
+
     def get_trial_session(self, token: str) -> Optional[Dict[str, Any]]:
         """Get a trial session by token."""
         conn = None
         try:
             conn = self.get_connection()
             cur = conn.cursor()
-            cur.execute("SELECT * FROM trial_sessions WHERE token = ?", (token,))
+            cur.execute(f"SELECT {_TRIAL_SESSION_COLUMNS} FROM trial_sessions WHERE token = ?", (token,))
             row = cur.fetchone()
             if not row:
                 return None
-            return dict(row)
+            return _row_to_dict(row)
         except Exception as e:
             log.error(f"Error getting trial session: {e}")
             return None
@@ -1154,7 +1532,11 @@ class Database:
             cur = conn.cursor()
             
             # Get session
-            cur.execute("SELECT * FROM trial_sessions WHERE token = ?", (token,))
+            cur.execute(
+                "SELECT step1_done, step2_done, step3_done, ip_address, expires_at >= ? AS active "
+                "FROM trial_sessions WHERE token = ?",
+                (_epoch_now(), token)
+            )
             row = cur.fetchone()
             
             if not row:
@@ -1163,8 +1545,7 @@ class Database:
             session = dict(row)
             
             # Check expiration
-            expires_at = datetime.fromisoformat(session['expires_at'])
-            if datetime.now(UTC) > expires_at:
+            if not session['active']:
                 return False, "Session expired. Please start a new trial."
             
             # Check IP consistency
@@ -1202,8 +1583,14 @@ class Database:
             conn = self.get_connection()
             cur = conn.cursor()
             
+            now = _epoch_now()
+            
             # Verify session
-            cur.execute("SELECT * FROM trial_sessions WHERE token = ?", (token,))
+            cur.execute(
+                "SELECT discord_id, step1_done, step2_done, step3_done, ip_address, expires_at >= ? AS active "
+                "FROM trial_sessions WHERE token = ?",
+                (now, token)
+            )
             row = cur.fetchone()
             
             if not row:
@@ -1216,8 +1603,7 @@ class Database:
                 return None
             
             # Check expiration
-            expires_at = datetime.fromisoformat(session['expires_at'])
-            if datetime.now(UTC) > expires_at:
+            if not session['active']:
                 return None
             
             # Generate trial key
@@ -1226,8 +1612,8 @@ class Database:
             ip_address = session['ip_address']
             
             # Store trial
-            created_at = datetime.now(UTC).isoformat()
-            trial_expires = (datetime.now(UTC) + timedelta(hours=24)).isoformat()
+            created_at = now
+            trial_expires = now + 24 * 3600
             
             cur.execute(
                 """INSERT OR REPLACE INTO trials (key, discord_id, created_at, expires_at, ip_address)
@@ -1258,7 +1644,7 @@ class Database:
             cur = conn.cursor()
             
             # 1. Check Key
-            cur.execute("SELECT id, type, used FROM keys WHERE key = ?", (key,))
+            cur.execute("SELECT used FROM keys WHERE key = ?", (key,))
             key_row = cur.fetchone()
             if not key_row:
                 return False, "Invalid key"
@@ -1266,13 +1652,14 @@ class Database:
                 return False, "Key already used"
 
             # 2. Check Username
-            cur.execute("SELECT 1 FROM accounts WHERE LOWER(username) = LOWER(?)", (username,))
+            cur.execute("SELECT 1 FROM accounts WHERE username = ? COLLATE NOCASE", (username,))
             if cur.fetchone():
                 return False, "Username taken"
 
             # 3. Mark Key Used
-            now_iso = datetime.now(UTC).isoformat()
-            cur.execute("UPDATE keys SET used=1, used_by=?, used_at=? WHERE key=? AND used=0", (discord_id, now_iso, key))
+            now = _epoch_now()
+            snowflake = _snowflake(discord_id)
+            cur.execute("UPDATE keys SET used=1, used_by=?, used_at=? WHERE key=? AND used=0", (snowflake, now, key))
             if cur.rowcount == 0:
                 conn.rollback()
                 return False, "Key concurrency error"
@@ -1281,14 +1668,14 @@ class Database:
             cur.execute("""
                 INSERT INTO users (discord_id, key, joined_at) VALUES (?, ?, ?)
                 ON CONFLICT(discord_id) DO UPDATE SET key=excluded.key
-            """, (discord_id, key, now_iso))
+            """, (snowflake, key, now))
 
             # 5. Create Account
             password_hash = self.hash_password(password)
             cur.execute("""
                 INSERT INTO accounts (discord_id, email, email_verified, username, password_hash, created_at)
                 VALUES (?, ?, 1, ?, ?, ?)
-            """, (discord_id, email, username, password_hash, now_iso))
+            """, (snowflake, email, username, password_hash, now))
 
             conn.commit()
             return True, "Success"
@@ -1313,7 +1700,7 @@ class Database:
             cur = conn.cursor()
             
             # Check License Keys
-            cur.execute("SELECT * FROM keys WHERE key = ?", (key,))
+            cur.execute("SELECT key, used, used_by FROM keys WHERE key = ?", (key,))
             row = cur.fetchone()
             if row:
                 return {
@@ -1321,25 +1708,25 @@ class Database:
                     'type': 'license',
                     'key': row['key'],
                     'used': bool(row['used']),
-                    'owner': row['used_by'],
+                    'owner': str(row['used_by']) if row['used_by'] is not None else None,
                     'hwid': None # Add HWID check if 'users' table has it
                 }
             
             # Check Trial Keys
-            cur.execute("SELECT * FROM trials WHERE key = ?", (key,))
+            cur.execute(
+                "SELECT key, expires_at, expires_at - ? AS remaining FROM trials WHERE key = ?",
+                (_epoch_now(), key)
+            )
             row = cur.fetchone()
             if row:
-                expires = datetime.fromisoformat(row['expires_at'])
-                now = datetime.now(UTC)
-                remaining = expires - now
-                is_valid = remaining.total_seconds() > 0
+                is_valid = (row['remaining'] or 0) > 0
                 
                 return {
                     'valid': is_valid,
                     'type': 'trial',
                     'key': row['key'],
-                    'expires': row['expires_at'],
-                    'remaining': str(remaining).split('.')[0] if is_valid else "Expired"
+                    'expires': _iso(row['expires_at']),
+                    'remaining': str(timedelta(seconds=row['remaining'])) if is_valid else "Expired"
                 }
 
             return {'valid': False}
@@ -1354,6 +1741,57 @@ class Database:
 # 🌍 GLOBAL DATABASE INSTANCE
 # ==============================================================================
 
+# Statement attribution for the SQL tracer, then per-method latency histograms
+tracer.instrument(Database)
+instrument_methods(Database, metrics, DB_LATENCY)
+
+# Per-request spans; password hashing is reported separately from SQLite time
+request_trace.instrument(Database, "db", overrides={'hash_password': 'hash', 'verify_password': 'hash'})
+
+# Request-scoped identity map (outermost, so hits skip the DB and its metrics).
+# Reads: method -> entity kind. Writes: method -> kinds they invalidate.
+identity_map.install(
+    Database,
+    reads={
+        'get_user': 'user',
+        'is_blacklisted': 'blacklist',
+        'get_user_analytics': 'analytics',
+        'get_trial_by_key': 'trial',
+        'get_active_trial_by_user': 'trial',
+        'get_trial_session': 'trial_session',
+        'check_key_available': 'key',
+        'check_username_available': 'account',
+        'get_account_by_username': 'account',
+        'get_account_by_discord': 'account',
+        'get_pending_email': 'email_code',
+    },
+    writes={
+        'register_user': ('user',),
+        'update_last_login': ('user', 'analytics'),
+        'reset_hwid': ('user',),
+        'unwhitelist': ('user',),
+        'generate_key_entry': ('key',),
+        'mint_keys': ('key',),
+        'mark_key_redeemed': ('key',),
+        'redeem_key': ('user', 'key'),
+        'create_trial': ('trial',),
+        'generate_trial_key': ('trial', 'trial_session'),
+        'create_trial_session': ('trial_session',),
+        'update_trial_step': ('trial_session',),
+        'mark_trial_step1': ('trial_session',),
+        'mark_trial_step2': ('trial_session',),
+        'mark_trial_step3': ('trial_session',),
+        'delete_trial_session': ('trial_session',),
+        'toggle_blacklist': ('blacklist',),
+        'unblacklist': ('blacklist',),
+        'log_event': ('analytics',),
+        'create_account': ('account',),
+        'store_email_code': ('email_code',),
+        'verify_email_code': ('email_code',),
+        'redeem_web_license': ('key', 'user', 'account'),
+    },
+)
+
 # Initialize global database instance
 db = Database(filepath=Config.DB_FILE)
 
@@ -0,0 +1,377 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - DATABASE MICRO-BENCHMARKS
+# Times each public Database method in isolation at several dataset sizes,
+# with allocation and connection counts, in a diffable JSON report
+#
+#   python db_bench.py --sizes 1000,10000,100000 --output bench.json
+#   python db_bench.py --compare bench.json --fail-on-regression
+# ==============================================================================
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from synthetic_data import SYNTHETIC_PASSWORD, generate, open_database
+
+# ==============================================================================
+# 🔧 LOGGING
+# ==============================================================================
+
+log = logging.getLogger("db_bench")
+
+# ==============================================================================
+# 🧪 BENCH CASES
+# ==============================================================================
+
+class Case:
+    """
+    One method under test.
+
+    `setup(ctx, n)` returns n argument tuples, prepared outside the timed
+    region. Read-only cases also get a warm pass that repeats the same
+    arguments once the rows have already been touched.
+    """
+
+    def __init__(self, method: str, setup: Callable[["BenchContext", int], List[tuple]],
+                 read_only: bool = True, max_ops: Optional[int] = None):
+        self.method = method
+        self.setup = setup
+        self.read_only = read_only
+        self.max_ops = max_ops
+
+
+class BenchContext:
+    """Row samples from the dataset plus a counter for unique write inputs."""
+
+    def __init__(self, db: Any, seed: int):
+        self.db = db
+        self.rng = random.Random(seed)
+        self._seq = 0
+        conn = db.get_connection()
+        try:
+            self.users = [(r[0], r[1]) for r in conn.execute(
+                "SELECT discord_id, key FROM users WHERE key IS NOT NULL ORDER BY discord_id").fetchall()]
+            self.banned = [r[0] for r in conn.execute("SELECT discord_id FROM blacklist").fetchall()]
+            self.unused_keys = [r[0] for r in conn.execute(
+                "SELECT key FROM keys WHERE used = 0 ORDER BY key").fetchall()]
+            self.trial_keys = [r[0] for r in conn.execute("SELECT key FROM trials ORDER BY key").fetchall()]
+            self.usernames = [r[0] for r in conn.execute(
+                "SELECT username FROM accounts ORDER BY username").fetchall()]
+        finally:
+            conn.close()
+
+    def next_id(self) -> int:
+        self._seq += 1
+        return 900_000_000_000_000_000 + self._seq
+
+    def sample(self, population: Sequence[Any], n: int) -> List[Any]:
+        if not population:
+            return []
+        if n <= len(population):
+            return self.rng.sample(list(population), n)
+        return [self.rng.choice(population) for _ in range(n)]
+
+
+def _trial_step_args(ctx: BenchContext, n: int) -> List[tuple]:
+    # Sessions are created during setup; only the step update is timed
+    args = []
+    for _ in range(n):
+        discord_id = ctx.next_id()
+        token = ctx.db.create_trial_session(discord_id, "10.0.0.1")
+        if token:
+            args.append((token, 1, "10.0.0.1"))
+    return args
+
+
+def _redeem_args(ctx: BenchContext, n: int) -> List[tuple]:
+    keys = ctx.db.mint_keys(n, 'bench')
+    args = []
+    for key in keys:
+        discord_id = ctx.next_id()
+        args.append((key, str(discord_id), f"bench{discord_id}", SYNTHETIC_PASSWORD, f"bench{discord_id}@example.com"))
+    return args
+
+
+CASES: List[Case] = [
+    Case("get_user", lambda c, n: [(u,) for u, _ in c.sample(c.users, n)]),
+    Case("is_blacklisted", lambda c, n: [(u,) for u in c.sample(c.banned or [u for u, _ in c.users], n)]),
+    Case("check_key_available", lambda c, n: [(k,) for k in c.sample(c.unused_keys, n)]),
+    Case("check_key_status", lambda c, n: [(k,) for _, k in c.sample(c.users, n // 2)] +
+                                          [(k,) for k in c.sample(c.trial_keys, n - n // 2)]),
+    Case("get_trial_by_key", lambda c, n: [(k,) for k in c.sample(c.trial_keys, n)]),
+    Case("get_active_trial_by_user", lambda c, n: [(u,) for u, _ in c.sample(c.users, n)]),
+    Case("get_account_by_username", lambda c, n: [(u,) for u in c.sample(c.usernames, n)]),
+    Case("get_user_analytics", lambda c, n: [(u,) for u, _ in c.sample(c.users, n)]),
+    Case("get_stats", lambda c, n: [()] * n, max_ops=50),
+    Case("get_all_users", lambda c, n: [()] * n, max_ops=10),
+    Case("get_all_keys", lambda c, n: [(True,)] * n, max_ops=10),
+    Case("get_blacklisted_users", lambda c, n: [()] * n, max_ops=50),
+    Case("log_event", lambda c, n: [("bench", str(u), "10.0.0.1", "bench event") for u, _ in c.sample(c.users, n)],
+         read_only=False),
+    Case("create_trial", lambda c, n: [(c.next_id(), "10.0.0.2") for _ in range(n)], read_only=False),
+    Case("update_trial_step", _trial_step_args, read_only=False),
+    Case("mint_keys", lambda c, n: [(100, 'bench')] * n, read_only=False, max_ops=20),
+    # Includes one bcrypt hash per call, which dominates the cost by design
+    Case("redeem_web_license", _redeem_args, read_only=False, max_ops=10),
+]
+
+# ==============================================================================
+# ⏱️ MEASUREMENT
+# ==============================================================================
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))]
+
+
+def _time_calls(func: Callable, args: List[tuple]) -> Dict[str, Any]:
+    samples = []
+    for call_args in args:
+        started = time.perf_counter()
+        func(*call_args)
+        samples.append(time.perf_counter() - started)
+    ordered = sorted(samples)
+    total = sum(samples)
+    return {
+        'iterations': len(samples),
+        'ops_per_sec': round(len(samples) / total, 1) if total else 0.0,
+        'mean_us': round(statistics.fmean(samples) * 1e6, 1) if samples else 0.0,
+        'p50_us': round(_percentile(ordered, 0.50) * 1e6, 1),
+        'p95_us': round(_percentile(ordered, 0.95) * 1e6, 1),
+    }
+
+
+def _measure_allocations(func: Callable, args: List[tuple]) -> Dict[str, Any]:
+    """Per-op peak traced memory and net allocated blocks, via tracemalloc."""
+    if not args:
+        return {'peak_bytes_per_op': 0, 'net_blocks_per_op': 0.0}
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        peaks = []
+        for call_args in args:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            func(*call_args)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    net_blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    return {
+        'peak_bytes_per_op': int(statistics.median(peaks)),
+        'net_blocks_per_op': round(net_blocks / len(args), 2),
+    }
+
+
+class ConnectionCounter:
+    """Counts Database.get_connection calls on one instance."""
+
+    def __init__(self, db: Any):
+        self.db = db
+        self.count = 0
+        self._original = db.get_connection
+
+        def counting() -> sqlite3.Connection:
+            self.count += 1
+            return self._original()
+        db.get_connection = counting
+
+    def restore(self) -> None:
+        self.db.get_connection = self._original
+
+
+def bench_case(case: Case, ctx: BenchContext, iterations: int, alloc_iterations: int) -> Dict[str, Any]:
+    db = ctx.db
+    func = getattr(db, case.method)
+    n = min(iterations, case.max_ops or iterations)
+    result: Dict[str, Any] = {}
+
+    cold_args = case.setup(ctx, n)
+    counter = ConnectionCounter(db)
+    try:
+        result['cold'] = _time_calls(func, cold_args)
+        result['connections_per_op'] = round(counter.count / len(cold_args), 2) if cold_args else 0.0
+    finally:
+        counter.restore()
+
+    if case.read_only:
+        # Same arguments again: rows and pages have now been touched
+        result['warm'] = _time_calls(func, cold_args)
+        alloc_args = cold_args[:alloc_iterations]
+    else:
+        result['warm'] = None
+        alloc_args = case.setup(ctx, min(alloc_iterations, n))
+
+    result['alloc'] = _measure_allocations(func, alloc_args)
+    return result
+
+# ==============================================================================
+# 📊 COMPARISON
+# ==============================================================================
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Rows of ops/sec deltas; `regressed` when throughput drops beyond tolerance."""
+    rows = []
+    for size, methods in current['results'].items():
+        for method, result in methods.items():
+            before = baseline.get('results', {}).get(size, {}).get(method)
+            if not before:
+                continue
+            for state in ('cold', 'warm'):
+                now_state, then_state = result.get(state), before.get(state)
+                if not now_state or not then_state or not then_state['ops_per_sec']:
+                    continue
+                delta = (now_state['ops_per_sec'] - then_state['ops_per_sec']) / then_state['ops_per_sec']
+                rows.append({
+                    'size': size,
+                    'method': method,
+                    'state': state,
+                    'before': then_state['ops_per_sec'],
+                    'after': now_state['ops_per_sec'],
+                    'delta': round(delta, 4),
+                    'regressed': delta < -tolerance,
+                })
+    return rows
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except Exception:
+        return None
+
+# ==============================================================================
+# 🖥️ CLI
+# ==============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark every Database method")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated user counts")
+    parser.add_argument("--analytics-per-user", type=int, default=10, help="Analytics events generated per user")
+    parser.add_argument("--iterations", type=int, default=300, help="Calls per method per state")
+    parser.add_argument("--alloc-iterations", type=int, default=50, help="Calls traced with tracemalloc")
+    parser.add_argument("--methods", default="", help="Comma-separated subset of methods")
+    parser.add_argument("--seed", type=int, default=1337, help="Dataset and sampling seed")
+    parser.add_argument("--workdir", help="Keep generated databases here (reused across runs)")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="Baseline report to diff against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed ops/sec drop as a fraction")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when a method regresses")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    tmpdir = None
+    workdir = args.workdir
+    if not workdir:
+        tmpdir = tempfile.TemporaryDirectory(prefix="banana_bench_")
+        workdir = tmpdir.name
+    os.makedirs(workdir, exist_ok=True)
+
+    # database.py opens Config.DB_FILE on import; keep that off the real data/
+    os.environ["DB_FILE"] = os.path.join(workdir, "import.db")
+    os.environ.setdefault("SLOW_QUERY_MS", "1000000")
+    from database import Database
+    for name in ("database", "sql_trace", "synthetic_data"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    wanted = {m.strip() for m in args.methods.split(",") if m.strip()}
+    cases = [c for c in CASES if not wanted or c.method in wanted]
+
+    report: Dict[str, Any] = {
+        'meta': {
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'iterations': args.iterations,
+            'alloc_iterations': args.alloc_iterations,
+            'analytics_per_user': args.analytics_per_user,
+            'seed': args.seed,
+        },
+        'results': {},
+    }
+
+    try:
+        for size in sizes:
+            path = os.path.join(workdir, f"bench_{size}_{args.seed}.db")
+            if not os.path.exists(path):
+                started = time.perf_counter()
+                conn = open_database(path)
+                try:
+                    generate(conn, users=size, analytics=size * args.analytics_per_user, seed=args.seed)
+                finally:
+                    conn.close()
+                log.info(f"🌱 Generated {size:,}-user dataset in {time.perf_counter() - started:.1f}s")
+
+            # Benchmark a scratch copy so write cases never leak into the next run
+            scratch = path + ".scratch"
+            src = sqlite3.connect(path)
+            dst = sqlite3.connect(scratch)
+            try:
+                src.backup(dst)
+            finally:
+                src.close()
+                dst.close()
+
+            db = Database(scratch)
+            ctx = BenchContext(db, args.seed)
+            results: Dict[str, Any] = {}
+            for case in cases:
+                results[case.method] = bench_case(case, ctx, args.iterations, args.alloc_iterations)
+                cold = results[case.method]['cold']
+                log.info(f"⏱️ [{size:,}] {case.method}: {cold['ops_per_sec']:,} ops/s cold, p95 {cold['p95_us']}us")
+            report['results'][str(size)] = results
+
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(scratch + suffix):
+                    os.remove(scratch + suffix)
+    finally:
+        if tmpdir:
+            tmpdir.cleanup()
+
+    regressed = False
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            rows = compare(report, json.load(f), args.tolerance)
+        report['comparison'] = rows
+        for row in rows:
+            marker = "⚠️" if row['regressed'] else "  "
+            log.info(f"{marker} [{row['size']}] {row['method']} ({row['state']}): "
+                     f"{row['before']:,} -> {row['after']:,} ops/s ({row['delta']:+.1%})")
+            regressed = regressed or row['regressed']
+
+    # sort_keys + fixed rounding keep reports line-diffable across commits
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
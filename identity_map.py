@@ -0,0 +1,129 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - REQUEST-SCOPED IDENTITY MAP
+# Memoizes Database reads for the lifetime of one web request or one bot
+# interaction; writes invalidate the affected entries
+# ==============================================================================
+
+from __future__ import annotations
+
+import copy
+import functools
+from contextvars import ContextVar, Token
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from metrics import metrics, CACHE_REQUESTS
+
+# ==============================================================================
+# 🗺️ IDENTITY MAP
+# ==============================================================================
+
+_MISSING = object()
+
+
+class IdentityMap:
+    """Rows loaded during one unit of work, keyed by (kind, normalized args)."""
+
+    __slots__ = ("_entries", "hits", "misses")
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[Tuple[str, ...], Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind: str, key: Tuple[str, ...]) -> Any:
+        return self._entries.get(kind, {}).get(key, _MISSING)
+
+    def put(self, kind: str, key: Tuple[str, ...], value: Any) -> None:
+        self._entries.setdefault(kind, {})[key] = value
+
+    def invalidate(self, kinds: Iterable[str]) -> None:
+        for kind in kinds:
+            self._entries.pop(kind, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_current: ContextVar[Optional[IdentityMap]] = ContextVar("banana_identity_map", default=None)
+
+
+def current_map() -> Optional[IdentityMap]:
+    return _current.get()
+
+
+def begin_scope() -> Token:
+    """Start a fresh identity map for the current context; returns the reset token."""
+    return _current.set(IdentityMap())
+
+
+def end_scope(token: Token) -> None:
+    try:
+        _current.reset(token)
+    except ValueError:
+        # Token created in a different context (e.g. teardown after a copy)
+        _current.set(None)
+
+
+@contextmanager
+def scope() -> Iterator[IdentityMap]:
+    token = begin_scope()
+    try:
+        yield _current.get()
+    finally:
+        end_scope(token)
+
+# ==============================================================================
+# 🔌 DATABASE INTEGRATION
+# ==============================================================================
+
+def _normalize(args: tuple, kwargs: Dict[str, Any]) -> Tuple[str, ...]:
+    # get_user(123) and get_user("123") must share an entry
+    return tuple(str(a) for a in args) + tuple(f"{k}={v}" for k, v in sorted(kwargs.items()))
+
+
+def _memoized(method: Callable, kind: str) -> Callable:
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        identity = _current.get()
+        if identity is None:
+            return method(self, *args, **kwargs)
+        key = (method.__name__,) + _normalize(args, kwargs)
+        value = identity.get(kind, key)
+        if value is not _MISSING:
+            identity.hits += 1
+            metrics.inc(CACHE_REQUESTS, cache="identity_map", result="hit")
+            # Callers may mutate returned dicts; hand out copies of the cached row
+            return copy.copy(value)
+        identity.misses += 1
+        metrics.inc(CACHE_REQUESTS, cache="identity_map", result="miss")
+        value = method(self, *args, **kwargs)
+        identity.put(kind, key, value)
+        return copy.copy(value)
+    return wrapper
+
+
+def _invalidating(method: Callable, kinds: Tuple[str, ...]) -> Callable:
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            identity = _current.get()
+            if identity is not None:
+                identity.invalidate(kinds)
+    return wrapper
+
+
+def install(cls: type, reads: Dict[str, str], writes: Dict[str, Iterable[str]]) -> type:
+    """
+    Route `cls` reads through the current identity map.
+
+    `reads` maps method -> entity kind; `writes` maps method -> kinds it
+    invalidates. Outside a scope every call goes straight to the database.
+    """
+    for name, kind in reads.items():
+        setattr(cls, name, _memoized(getattr(cls, name), kind))
+    for name, kinds in writes.items():
+        setattr(cls, name, _invalidating(getattr(cls, name), tuple(kinds)))
+    return cls
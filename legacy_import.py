@@ -0,0 +1,504 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - LEGACY JSON IMPORTER
+# Streams the JSON stores written by main.py (platinum_db.json,
+# enterprise_db.json) into the users, keys and blacklist tables in chunked
+# executemany transactions; resumable, idempotent and truncation-tolerant
+#
+#   python legacy_import.py data/platinum_db.json data/enterprise_db.json
+#   python legacy_import.py big.json --on-conflict update --batch-size 20000
+# ==============================================================================
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from config import Config
+from migrations import _legacy_epoch, _legacy_snowflake, run_migrations
+
+# ==============================================================================
+# 🔧 LOGGING
+# ==============================================================================
+
+log = logging.getLogger("legacy_import")
+
+# ==============================================================================
+# 🌊 STREAMING JSON
+# The stores are one top-level object of sections; dict and list sections are
+# yielded entry by entry so memory stays flat however large the file is.
+# ==============================================================================
+
+class TruncatedJSON(ValueError):
+    """The file ended mid-document; every complete entry before it was yielded."""
+
+
+class _JsonReader:
+    """Incremental tokenizer over a text stream using JSONDecoder.raw_decode."""
+
+    _WHITESPACE = re.compile(r"[ \t\r\n]*")
+    _NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+    def __init__(self, stream: TextIO, chunk_size: int = 1 << 20):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.stream.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)."""
+        while True:
+            self.pos = self._WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            if not found:
+                raise TruncatedJSON(f"expected {char!r} at end of input")
+            raise ValueError(f"expected {char!r}, found {found!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise TruncatedJSON("input ends inside a value")
+                continue
+            # A number cut at the chunk edge decodes as its prefix ("1" of "1.5e10"),
+            # so read on until something other than a number character follows it
+            if (
+                isinstance(obj, (int, float)) and not isinstance(obj, bool)
+                and (end == len(self.buf) or self.buf[end] in self._NUMBER_CHARS)
+                and self._fill()
+            ):
+                continue
+            self.pos = end
+            return obj
+
+    def members(self) -> Iterator[Tuple[str, None]]:
+        """Iterate an object's keys; the caller consumes each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key, None
+            sep = self.peek()
+            self.pos += 1 if sep else 0
+            if sep == "}":
+                return
+            if sep != ",":
+                raise TruncatedJSON("object not closed") if not sep else ValueError(f"unexpected {sep!r}")
+
+    def elements(self) -> Iterator[None]:
+        """Iterate an array; the caller consumes each element."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield None
+            sep = self.peek()
+            self.pos += 1 if sep else 0
+            if sep == "]":
+                return
+            if sep != ",":
+                raise TruncatedJSON("array not closed") if not sep else ValueError(f"unexpected {sep!r}")
+
+
+def stream_sections(
+    stream: TextIO, streamed: Tuple[str, ...], chunk_size: int = 1 << 20
+) -> Iterator[Tuple[str, Optional[str], Any]]:
+    """
+    Yield (section, key, value) from a `{section: ...}` document.
+
+    Sections named in `streamed` are yielded one entry at a time (key is the
+    member name for objects, None for arrays); others as a single value.
+    Raises TruncatedJSON after the last complete entry of a cut-off file.
+    """
+    reader = _JsonReader(stream, chunk_size)
+    for section, _ in reader.members():
+        if section not in streamed:
+            yield section, None, reader.value()
+            continue
+        kind = reader.peek()
+        if kind == "{":
+            for key, _ in reader.members():
+                yield section, key, reader.value()
+        elif kind == "[":
+            for _ in reader.elements():
+                yield section, None, reader.value()
+        else:
+            yield section, None, reader.value()
+
+# ==============================================================================
+# 🗺️ ROW MAPPING
+# ==============================================================================
+
+def _user_row(key: str, entry: Dict[str, Any]) -> Optional[tuple]:
+    discord_id = _legacy_snowflake(key)
+    if not isinstance(discord_id, int) or not isinstance(entry, dict):
+        return None
+    return (
+        discord_id,
+        entry.get('key'),
+        entry.get('hwid'),
+        # platinum_db stores the join time as `date`
+        _legacy_epoch(entry.get('joined_at') or entry.get('date')),
+        _legacy_epoch(entry.get('last_login')),
+    )
+
+
+def _key_row(key: str, entry: Dict[str, Any]) -> Optional[tuple]:
+    if not key or not isinstance(entry, dict):
+        return None
+    return (
+        key,
+        _legacy_snowflake(entry.get('created_by') or entry.get('by')),
+        _legacy_epoch(entry.get('created_at')),
+        1 if entry.get('used') else 0,
+        _legacy_snowflake(entry.get('used_by')),
+        _legacy_epoch(entry.get('used_at')),
+    )
+
+
+def _blacklist_row(_key: Optional[str], entry: Any) -> Optional[tuple]:
+    discord_id = _legacy_snowflake(entry.get('discord_id') if isinstance(entry, dict) else str(entry))
+    if not isinstance(discord_id, int):
+        return None
+    reason = entry.get('reason') if isinstance(entry, dict) else None
+    return (discord_id, reason or "Imported from legacy JSON store", int(time.time()))
+
+
+class TableSpec:
+    """Where one JSON section lands."""
+
+    def __init__(self, section: str, table: str, columns: Tuple[str, ...], mapper: Callable[..., Optional[tuple]]):
+        self.section = section
+        self.table = table
+        self.columns = columns
+        self.mapper = mapper
+
+    def insert_sql(self, policy: str) -> str:
+        cols = ", ".join(self.columns)
+        marks = ", ".join("?" * len(self.columns))
+        if policy == "replace":
+            return f"INSERT OR REPLACE INTO {self.table} ({cols}) VALUES ({marks})"
+        if policy == "update":
+            # Imported values win, but a missing (NULL) field never erases existing data
+            updates = ", ".join(f"{c} = COALESCE(excluded.{c}, {c})" for c in self.columns[1:])
+            return f"INSERT INTO {self.table} ({cols}) VALUES ({marks}) ON CONFLICT({self.columns[0]}) DO UPDATE SET {updates}"
+        return f"INSERT INTO {self.table} ({cols}) VALUES ({marks}) ON CONFLICT({self.columns[0]}) DO NOTHING"
+
+
+TABLES: Dict[str, TableSpec] = {
+    'users': TableSpec('users', 'users', ('discord_id', 'key', 'hwid', 'joined_at', 'last_login'), _user_row),
+    'keys': TableSpec('keys', 'keys', ('key', 'created_by', 'created_at', 'used', 'used_by', 'used_at'), _key_row),
+    'blacklist': TableSpec('blacklist', 'blacklist', ('discord_id', 'reason', 'banned_at'), _blacklist_row),
+}
+
+CONFLICT_POLICIES = ("skip", "update", "replace")
+
+# ==============================================================================
+# 📥 IMPORTER
+# ==============================================================================
+
+class PendingJournal(RuntimeError):
+    """The store has a `<file>.journal` of ops not yet folded into the snapshot."""
+
+
+class LegacyImporter:
+    """
+    Imports JSON stores into an already-migrated connection.
+
+    Each batch is one transaction that also advances `import_progress`, so a
+    crash loses nothing and a re-run skips straight past committed entries.
+    With the default `skip` policy re-importing is a no-op anyway.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, batch_size: int = 5000, policy: str = "skip", dry_run: bool = False):
+        if policy not in CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy: {policy}")
+        self.conn = conn
+        self.conn.isolation_level = None
+        self.batch_size = max(1, batch_size)
+        self.policy = policy
+        self.dry_run = dry_run
+
+    # ========== PROGRESS ==========
+
+    @staticmethod
+    def _fingerprint(path: str) -> Tuple[int, int]:
+        st = os.stat(path)
+        return st.st_size, int(st.st_mtime)
+
+    def _positions(self, source: str, path: str) -> Dict[str, int]:
+        size, mtime = self._fingerprint(path)
+        rows = self.conn.execute(
+            "SELECT section, position, source_size, source_mtime FROM import_progress WHERE source = ?", (source,)
+        ).fetchall()
+        # A changed file invalidates positions; the conflict policy keeps a full re-run safe
+        return {section: pos for section, pos, s, m in rows if s == size and m == mtime}
+
+    def reset(self, source: str) -> None:
+        self.conn.execute("DELETE FROM import_progress WHERE source = ?", (source,))
+
+    def _commit_batch(self, spec: TableSpec, rows: List[tuple], source: str, path: str, position: int) -> None:
+        if self.dry_run:
+            return
+        size, mtime = self._fingerprint(path)
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.executemany(spec.insert_sql(self.policy), rows)
+            self.conn.execute(
+                """
+                INSERT INTO import_progress (source, section, position, source_size, source_mtime, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(source, section) DO UPDATE SET position = excluded.position,
+                    source_size = excluded.source_size, source_mtime = excluded.source_mtime,
+                    updated_at = excluded.updated_at
+                """,
+                (source, spec.section, position, size, mtime, int(time.time()))
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    # ========== IMPORT ==========
+
+    @staticmethod
+    def _check_journal(path: str) -> None:
+        """Refuse a snapshot whose journal (main.py's DatabaseManager) still holds ops."""
+        journal = path + ".journal"
+        try:
+            with open(journal, "rb") as f:
+                ops = sum(1 for line in f if line.strip())
+        except FileNotFoundError:
+            return
+        if ops:
+            raise PendingJournal(
+                f"{journal} holds {ops:,} changes that are not in {path} yet; compact it first "
+                f"(stop main.py, which folds the journal into the snapshot on exit) and re-run"
+            )
+
+    def import_file(self, path: str) -> Dict[str, Any]:
+        self._check_journal(path)
+        source = os.path.abspath(path)
+        positions = self._positions(source, path)
+        started = time.perf_counter()
+        sections: Dict[str, Dict[str, Any]] = {}
+        other: Dict[str, Any] = {}
+        truncated = False
+
+        batch: List[tuple] = []
+        current: Optional[TableSpec] = None
+        seen = 0
+
+        def flush() -> None:
+            nonlocal batch
+            if current is not None and batch:
+                self._commit_batch(current, batch, source, path, seen)
+                sections[current.section]['written'] += len(batch)
+                batch = []
+            if current is not None:
+                stats = sections[current.section]
+                stats['seconds'] = time.perf_counter() - stats['started']
+
+        with open(path, "r", encoding="utf-8") as stream:
+            try:
+                for section, key, value in stream_sections(stream, tuple(TABLES)):
+                    spec = TABLES.get(section)
+                    if spec is None:
+                        other[section] = value
+                        continue
+                    if spec is not current:
+                        flush()
+                        current, seen = spec, 0
+                        sections[section] = {'entries': 0, 'written': 0, 'skipped_resume': 0, 'invalid': 0,
+                                             'started': time.perf_counter()}
+                    stats = sections[section]
+                    seen += 1
+                    stats['entries'] += 1
+                    if seen <= positions.get(section, 0):
+                        stats['skipped_resume'] += 1
+                        continue
+                    row = spec.mapper(key, value)
+                    if row is None:
+                        stats['invalid'] += 1
+                        continue
+                    batch.append(row)
+                    if len(batch) >= self.batch_size:
+                        flush()
+                        log.info(f"   {section}: {stats['written']:,} rows "
+                                 f"({stats['written'] / (time.perf_counter() - stats['started']):,.0f}/s)")
+            except TruncatedJSON as e:
+                truncated = True
+                log.warning(f"⚠️ {path} is truncated ({e}); imported every complete entry before the cut")
+            flush()
+
+        elapsed = time.perf_counter() - started
+        for section, stats in sections.items():
+            del stats['started']
+            stats['rows_per_sec'] = round(stats['written'] / stats['seconds']) if stats['seconds'] > 0 else 0
+            stats['seconds'] = round(stats['seconds'], 3)
+            log.info(
+                f"✅ {path} [{section}] {stats['written']:,} written, {stats['skipped_resume']:,} already imported, "
+                f"{stats['invalid']:,} invalid ({stats['rows_per_sec']:,}/s)"
+            )
+        if other.get('stats'):
+            log.info(f"ℹ️ {path} legacy counters (not imported): {other['stats']}")
+
+        return {
+            'source': source,
+            'policy': self.policy,
+            'dry_run': self.dry_run,
+            'truncated': truncated,
+            'seconds': round(elapsed, 3),
+            'sections': sections,
+            'ignored_sections': sorted(other),
+        }
+
+# ==============================================================================
+# 🧪 SELF-CHECK
+# Streams tricky documents at tiny chunk sizes, where every token straddles a
+# chunk boundary, and compares the entries with json.loads
+# ==============================================================================
+
+SELF_CHECK_DOCUMENTS = (
+    '{"keys":[1.5e10]}',
+    '{"users": {"1": {"key": "A", "n": -0.25e-3}, "2": {"hwid": null, "ok": true}}, "stats": {"total": 12345678901234567890}}',
+    '{"blacklist": ["123", 456, 7.0], "keys": {"K\\"1": {"used": false, "by": "\\u00e9"}}, "users": {}}',
+    ' { "keys" : [ 1 , 22 , 333.5 , -4E+2 ] , "stats" : [ ] } ',
+)
+
+
+def _expected_entries(document: str) -> List[Tuple[str, Optional[str], Any]]:
+    entries = []
+    for section, value in json.loads(document).items():
+        if section in TABLES and isinstance(value, dict):
+            entries.extend((section, key, item) for key, item in value.items())
+        elif section in TABLES and isinstance(value, list):
+            entries.extend((section, None, item) for item in value)
+        else:
+            entries.append((section, None, value))
+    return entries
+
+
+def self_check(chunk_sizes: Tuple[int, ...] = (1, 2, 3, 7, 1 << 20)) -> List[str]:
+    """Return a description of every mismatch (empty when the reader is sound)."""
+    failures = []
+    for document in SELF_CHECK_DOCUMENTS:
+        expected = _expected_entries(document)
+        for size in chunk_sizes:
+            try:
+                got = list(stream_sections(io.StringIO(document), tuple(TABLES), chunk_size=size))
+            except ValueError as e:
+                failures.append(f"chunk_size={size} {document!r}: {e}")
+                continue
+            if got != expected:
+                failures.append(f"chunk_size={size} {document!r}: got {got!r}, expected {expected!r}")
+        # A cut-off copy must yield a prefix of the entries, then report the truncation
+        cut = document[:len(document) // 2]
+        got = []
+        try:
+            for entry in stream_sections(io.StringIO(cut), tuple(TABLES), chunk_size=1):
+                got.append(entry)
+            failures.append(f"truncated {cut!r}: no TruncatedJSON")
+        except TruncatedJSON:
+            pass
+        except ValueError as e:
+            failures.append(f"truncated {cut!r}: {e}")
+        if got != expected[:len(got)]:
+            failures.append(f"truncated {cut!r}: got {got!r}, not a prefix of {expected!r}")
+    return failures
+
+# ==============================================================================
+# 🖥️ CLI
+# ==============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import legacy JSON stores into the SQLite database")
+    parser.add_argument("files", nargs="*", help="platinum_db.json / enterprise_db.json style files")
+    parser.add_argument("--db", default=Config.DB_FILE, help="Target SQLite database")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per transaction")
+    parser.add_argument("--on-conflict", choices=CONFLICT_POLICIES, default="skip",
+                        help="skip: keep existing rows; update: overwrite non-null fields; replace: overwrite rows")
+    parser.add_argument("--restart", action="store_true", help="Ignore saved progress and stream each file from the top")
+    parser.add_argument("--dry-run", action="store_true", help="Parse and map only; write nothing")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--self-check", action="store_true", help="Check the streaming reader on edge cases and exit")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.self_check:
+        failures = self_check()
+        for failure in failures:
+            log.error(f"❌ {failure}")
+        if not failures:
+            log.info(f"✅ Streaming reader matches json.loads on {len(SELF_CHECK_DOCUMENTS)} documents")
+        return 1 if failures else 0
+    if not args.files:
+        parser.error("at least one file is required")
+
+    directory = os.path.dirname(args.db)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(args.db, timeout=30.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    run_migrations(conn)
+
+    importer = LegacyImporter(conn, batch_size=args.batch_size, policy=args.on_conflict, dry_run=args.dry_run)
+    reports = []
+    try:
+        for path in args.files:
+            if args.restart and not args.dry_run:
+                importer.reset(os.path.abspath(path))
+            reports.append(importer.import_file(path))
+    except PendingJournal as e:
+        log.error(f"❌ {e}")
+        return 1
+    finally:
+        conn.close()
+
+    output = json.dumps(reports, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
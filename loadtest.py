@@ -0,0 +1,401 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - HTTP LOAD TEST HARNESS
+# Boots website_server.app on a throwaway database and drives the hot paths
+# at fixed concurrency, reporting throughput and latency percentiles as JSON
+#
+#   python loadtest.py --concurrency 16 --duration 10 --output run.json
+#   python loadtest.py --baseline baseline.json         # compare against a saved run
+#   python loadtest.py --save-baseline baseline.json    # record a new baseline
+# ==============================================================================
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from synthetic_data import SYNTHETIC_PASSWORD, generate, open_database
+
+# ==============================================================================
+# 🔧 LOGGING
+# ==============================================================================
+
+log = logging.getLogger("loadtest")
+
+# ==============================================================================
+# 🌱 FIXTURE
+# ==============================================================================
+
+def load_fixture(db: Any, limit: int = 5000) -> Dict[str, Any]:
+    """Credentials the scenarios draw from: non-banned users and their web accounts."""
+    conn = db.get_connection()
+    try:
+        users = conn.execute(
+            """
+            SELECT u.discord_id, u.key FROM users u
+            WHERE u.key IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM blacklist b WHERE b.discord_id = u.discord_id)
+            LIMIT ?
+            """,
+            (limit,)
+        ).fetchall()
+        accounts = conn.execute(
+            """
+            SELECT a.username FROM accounts a
+            WHERE NOT EXISTS (SELECT 1 FROM blacklist b WHERE b.discord_id = a.discord_id)
+            LIMIT ?
+            """,
+            (limit,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return {
+        'users': [(str(row['discord_id']), row['key']) for row in users],
+        'usernames': [row['username'] for row in accounts],
+    }
+
+# ==============================================================================
+# 🎯 SCENARIOS
+# Each scenario builds one request: (method, path, body, headers, ok statuses)
+# ==============================================================================
+
+RequestSpec = Tuple[str, str, Optional[bytes], Dict[str, str], Tuple[int, ...]]
+
+
+def _json_body(payload: Dict[str, Any]) -> Tuple[bytes, Dict[str, str]]:
+    return json.dumps(payload).encode(), {'Content-Type': 'application/json'}
+
+
+def build_scenarios(fixture: Dict[str, Any], admin_key: str) -> Dict[str, Callable[[random.Random], RequestSpec]]:
+    users = fixture['users']
+    admin = {'X-Admin-Key': admin_key}
+
+    def verify(rng: random.Random) -> RequestSpec:
+        user_id, key = rng.choice(users)
+        return 'GET', '/api/verify?' + urlencode({'user_id': user_id, 'key': key}), None, {}, (200,)
+
+    def auth(rng: random.Random) -> RequestSpec:
+        user_id, key = rng.choice(users)
+        body, headers = _json_body({'user_id': user_id, 'key': key})
+        return 'POST', '/api/auth', body, headers, (200,)
+
+    def login(rng: random.Random) -> RequestSpec:
+        username = rng.choice(fixture['usernames'])
+        body, headers = _json_body({'username': username, 'password': SYNTHETIC_PASSWORD})
+        return 'POST', '/login', body, headers, (200,)
+
+    def script(rng: random.Random) -> RequestSpec:
+        return 'GET', '/script.lua', None, {}, (200,)
+
+    def stats(rng: random.Random) -> RequestSpec:
+        return 'GET', '/api/stats', None, admin, (200,)
+
+    def admin_users(rng: random.Random) -> RequestSpec:
+        return 'GET', '/api/admin/users', None, admin, (200,)
+
+    return {
+        'verify': verify,
+        'auth': auth,
+        'login': login,
+        'script': script,
+        'stats': stats,
+        'admin_users': admin_users,
+    }
+
+# ==============================================================================
+# 🚀 SERVER & WORKERS
+# ==============================================================================
+
+def start_server(app: Any) -> Tuple[Any, int]:
+    """Serve the Flask app on an ephemeral port in a background thread."""
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True, name="LoadTestServer")
+    thread.start()
+    return server, server.server_port
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))]
+
+
+def run_scenario(
+    name: str,
+    build: Callable[[random.Random], RequestSpec],
+    port: int,
+    concurrency: int,
+    duration: float,
+    max_requests: Optional[int],
+    seed: int,
+) -> Dict[str, Any]:
+    """Hammer one scenario from `concurrency` threads and summarize the results."""
+    latencies: List[List[float]] = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    statuses: List[Dict[int, int]] = [{} for _ in range(concurrency)]
+    deadline = time.perf_counter() + duration
+    budget = [max_requests] if max_requests else None
+    budget_lock = threading.Lock()
+
+    def take() -> bool:
+        if budget is None:
+            return time.perf_counter() < deadline
+        with budget_lock:
+            if budget[0] <= 0:
+                return False
+            budget[0] -= 1
+            return True
+
+    def worker(slot: int) -> None:
+        rng = random.Random(f"{seed}:{name}:{slot}")
+        while take():
+            method, path, body, headers, ok = build(rng)
+            started = time.perf_counter()
+            status = 0
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+                conn.close()
+            except Exception:
+                status = 0
+            latencies[slot].append(time.perf_counter() - started)
+            statuses[slot][status] = statuses[slot].get(status, 0) + 1
+            if status not in ok:
+                errors[slot] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(x for slot in latencies for x in slot)
+    total = len(ordered)
+    status_counts: Dict[str, int] = {}
+    for slot in statuses:
+        for code, count in slot.items():
+            status_counts[str(code)] = status_counts.get(str(code), 0) + count
+
+    return {
+        'requests': total,
+        'errors': sum(errors),
+        'error_rate': round(sum(errors) / total, 4) if total else 0.0,
+        'throughput_rps': round(total / elapsed, 2) if elapsed else 0.0,
+        'latency_ms': {
+            'mean': round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+            'p50': round(_percentile(ordered, 0.50) * 1000, 3),
+            'p95': round(_percentile(ordered, 0.95) * 1000, 3),
+            'p99': round(_percentile(ordered, 0.99) * 1000, 3),
+            'max': round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        },
+        'statuses': status_counts,
+        'elapsed_s': round(elapsed, 3),
+    }
+
+# ==============================================================================
+# 📊 BASELINE COMPARISON
+# ==============================================================================
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> Dict[str, Any]:
+    """
+    Per-scenario deltas against a baseline run.
+
+    A scenario regresses when throughput drops, or p95 latency or the error
+    rate rises, by more than `tolerance` (a fraction, e.g. 0.10 for 10%).
+    """
+    result: Dict[str, Any] = {}
+    for name, current in report['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+
+        def delta(now: float, then: float) -> Optional[float]:
+            return round((now - then) / then, 4) if then else None
+
+        rps = delta(current['throughput_rps'], before['throughput_rps'])
+        p95 = delta(current['latency_ms']['p95'], before['latency_ms']['p95'])
+        regressions = []
+        if rps is not None and rps < -tolerance:
+            regressions.append('throughput')
+        if p95 is not None and p95 > tolerance:
+            regressions.append('p95')
+        if current['error_rate'] > before['error_rate'] + tolerance / 10:
+            regressions.append('error_rate')
+
+        result[name] = {
+            'throughput_rps': {'before': before['throughput_rps'], 'after': current['throughput_rps'], 'delta': rps},
+            'p95_ms': {'before': before['latency_ms']['p95'], 'after': current['latency_ms']['p95'], 'delta': p95},
+            'error_rate': {'before': before['error_rate'], 'after': current['error_rate']},
+            'regressions': regressions,
+        }
+    return result
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except Exception:
+        return None
+
+# ==============================================================================
+# 🖥️ CLI
+# ==============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the Banana Hub web server")
+    parser.add_argument("--db", help="SQLite file to use (default: fresh temporary database)")
+    parser.add_argument("--users", type=int, default=2000, help="Users to generate into a fresh database")
+    parser.add_argument("--analytics", type=int, default=None, help="Analytics events to generate (default: 5 per user)")
+    parser.add_argument("--seed", type=int, default=1337, help="RNG seed for data and request mix")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client threads")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per scenario")
+    parser.add_argument("--requests", type=int, default=None, help="Fixed request count per scenario (overrides --duration)")
+    parser.add_argument("--scenarios", default="verify,auth,login,script,stats,admin_users",
+                        help="Comma-separated scenarios to run")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="Compare against this saved report")
+    parser.add_argument("--save-baseline", help="Also write the report to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Regression tolerance as a fraction")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when a regression is detected")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    tmpdir = None
+    db_path = args.db
+    if not db_path:
+        tmpdir = tempfile.TemporaryDirectory(prefix="banana_loadtest_")
+        db_path = os.path.join(tmpdir.name, "loadtest.db")
+    db_path = os.path.abspath(db_path)
+    fresh = not os.path.exists(db_path)
+
+    # The app resolves script.lua and data/ relative to the working directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    # Config reads DB_FILE at import time, so this must precede generating the
+    # dataset (which imports database) and importing the app
+    os.environ["DB_FILE"] = db_path
+    os.environ.setdefault("SLOW_QUERY_MS", "1000000")
+
+    if fresh:
+        started = time.perf_counter()
+        conn = open_database(db_path)
+        try:
+            generate(
+                conn,
+                users=args.users,
+                analytics=args.analytics if args.analytics is not None else args.users * 5,
+                seed=args.seed,
+            )
+        finally:
+            conn.close()
+        log.info(f"🌱 Generated synthetic dataset in {time.perf_counter() - started:.2f}s")
+
+    from config import Config
+    from database import db
+
+    fixture = load_fixture(db)
+    if not fixture['users']:
+        log.error("❌ Database has no non-banned users with keys")
+        return 2
+
+    import website_server
+
+    # Per-request log lines would dominate the measurement
+    for name in ("werkzeug", "website_server", "database", "sql_trace"):
+        logging.getLogger(name).setLevel(logging.ERROR)
+
+    server, port = start_server(website_server.app)
+    scenarios = build_scenarios(fixture, Config.ADMIN_API_KEY)
+    selected = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in selected if s not in scenarios]
+    if unknown:
+        log.error(f"❌ Unknown scenarios: {', '.join(unknown)} (available: {', '.join(scenarios)})")
+        return 2
+    if 'login' in selected and not fixture['usernames']:
+        log.error("❌ The login scenario needs web accounts in the database")
+        return 2
+
+    report: Dict[str, Any] = {
+        'meta': {
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'concurrency': args.concurrency,
+            'duration_s': None if args.requests else args.duration,
+            'requests_per_scenario': args.requests,
+            'fixture_users': len(fixture['users']),
+            'generated_users': args.users if fresh else None,
+            'seed': args.seed,
+        },
+        'scenarios': {},
+    }
+
+    try:
+        for name in selected:
+            # Warm up caches and connections before measuring
+            run_scenario(name, scenarios[name], port, 1, 0.0, min(20, args.requests or 20), args.seed)
+            result = run_scenario(
+                name, scenarios[name], port, args.concurrency, args.duration, args.requests, args.seed
+            )
+            report['scenarios'][name] = result
+            log.info(
+                f"📈 {name}: {result['throughput_rps']} rps, p50 {result['latency_ms']['p50']}ms, "
+                f"p95 {result['latency_ms']['p95']}ms, p99 {result['latency_ms']['p99']}ms, "
+                f"errors {result['error_rate']:.2%}"
+            )
+    finally:
+        server.shutdown()
+
+    regressed = False
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            comparison = compare(report, json.load(f), args.tolerance)
+        report['comparison'] = comparison
+        for name, diff in comparison.items():
+            if diff['regressions']:
+                regressed = True
+                log.warning(f"⚠️ {name} regressed: {', '.join(diff['regressions'])}")
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+    if tmpdir:
+        tmpdir.cleanup()
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,7 @@ import os
 import datetime
 import threading
 import asyncio
+import atexit
 import logging
 from flask import Flask, request, jsonify, render_template_string, send_file
 from flask_cors import CORS
@@ -48,86 +49,168 @@ log = logging.getLogger('werkzeug'); log.setLevel(logging.ERROR)
 if not os.path.exists(CONFIG["DATA_DIR"]): os.makedirs(CONFIG["DATA_DIR"])
 
 class DatabaseManager:
+    """
+    JSON store kept in memory. Mutations are appended to `<file>.journal` as
+    one JSON op per line and folded into the snapshot every COMPACT_EVERY ops
+    (write-temp + rename). Reads only stat the files and reload/replay when
+    another process changed them.
+    """
+    COMPACT_EVERY = int(os.getenv("JSON_DB_COMPACT_EVERY", 500))
+
     _instance = None
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DatabaseManager, cls).__new__(cls)
             cls._instance.path = os.path.join(CONFIG["DATA_DIR"], CONFIG["DB_FILE"])
-            cls._instance.lock = threading.Lock()
+            cls._instance.journal_path = cls._instance.path + ".journal"
+            cls._instance.lock = threading.RLock()
             cls._instance.load()
+            atexit.register(cls._instance.save)
         return cls._instance
 
     def get_schema(self): return {"users": {}, "keys": {}, "blacklist": [], "warnings": {}}
 
+    # ---------- snapshot + journal ----------
+
+    def _mtime(self, path):
+        try: return os.stat(path).st_mtime_ns
+        except FileNotFoundError: return None
+
+    def _journal_size(self):
+        try: return os.path.getsize(self.journal_path)
+        except FileNotFoundError: return 0
+
     def load(self):
+        """Full reload: snapshot, then replay the journal on top."""
         with self.lock:
-            if not os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.data = json.load(f)
+                fresh = False
+            except Exception:
                 self.data = self.get_schema()
-                self.save_unsafe()
-            else:
-                try:
-                    with open(self.path, 'r') as f:
-                        self.data = json.load(f)
-                except:
-                    self.data = self.get_schema()
-                    self.save_unsafe()
+                fresh = True
+            for k, v in self.get_schema().items(): self.data.setdefault(k, v)
+            self._blacklist = set(self.data["blacklist"])
+            self._snapshot_mtime = self._mtime(self.path)
+            self._journal_offset = 0
+            self._pending_ops = 0
+            self._replay()
+            if fresh: self.save_unsafe()
+
+    def _replay(self):
+        """Apply journal lines past our offset (written by us or another process)."""
+        try:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(self._journal_offset)
+                for line in f:
+                    if not line.endswith(b"\n"): break  # torn write; stop before it
+                    self._journal_offset += len(line)
+                    try: self._apply(json.loads(line))
+                    except (ValueError, KeyError, TypeError): continue
+                    self._pending_ops += 1
+        except FileNotFoundError:
+            self._journal_offset = 0
+
+    def refresh(self):
+        if self._mtime(self.path) != self._snapshot_mtime:
+            self.load()  # compacted or replaced by someone else
+        elif self._journal_size() != self._journal_offset:
+            if self._journal_size() < self._journal_offset: self.load()
+            else: self._replay()
+
+    def _apply(self, op):
+        kind, path, value = op["op"], op.get("path", []), op.get("value")
+        if kind == "bl_add":
+            if value not in self._blacklist:
+                self._blacklist.add(value); self.data["blacklist"].append(value)
+            return
+        if kind == "bl_remove":
+            if value in self._blacklist:
+                self._blacklist.discard(value); self.data["blacklist"].remove(value)
+            return
+        node = self.data
+        for part in path[:-1]: node = node.setdefault(part, {})
+        if kind == "set": node[path[-1]] = value
+        elif kind == "merge": node.setdefault(path[-1], {}).update(value)
+        elif kind == "del": node.pop(path[-1], None)
+
+    def _write(self, *ops):
+        """Append ops to the journal, then replay it (caller holds the lock)."""
+        self.refresh()
+        payload = "".join(json.dumps(op, separators=(",", ":")) + "\n" for op in ops).encode()
+        if self._journal_size() > self._journal_offset: payload = b"\n" + payload  # seal a torn tail
+        with open(self.journal_path, 'ab') as f:
+            f.write(payload)
+            f.flush()
+        # Replaying also picks up lines another process appended in between
+        self._replay()
+        if self._pending_ops >= self.COMPACT_EVERY: self.save_unsafe()
 
     def save(self):
         with self.lock:
             self.save_unsafe()
 
     def save_unsafe(self):
-        with open(self.path, 'w') as f:
+        """Compact: atomically replace the snapshot, then drop the folded journal."""
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w') as f:
             json.dump(self.data, f, indent=4)
-    
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        # Ops are idempotent, so a crash before this truncate just replays them again
+        with open(self.journal_path, 'wb'): pass
+        self._snapshot_mtime = self._mtime(self.path)
+        self._journal_offset = 0
+        self._pending_ops = 0
+
+    # ---------- API ----------
+
     def get_user(self, uid):
-        self.load()
-        return self.data["users"].get(str(uid))
+        with self.lock:
+            self.refresh()
+            return self.data["users"].get(str(uid))
 
     def register_user(self, uid, key):
-        self.load()
-        self.data["users"][str(uid)] = {"key": key, "hwid": None, "date": str(datetime.datetime.now())}
-        self.save()
+        with self.lock:
+            self._write({"op": "set", "path": ["users", str(uid)], "value": {"key": key, "hwid": None, "date": str(datetime.datetime.now())}})
 
     def reset_hwid(self, uid): 
-        self.load()
         uid = str(uid)
-        if uid in self.data["users"]:
-            self.data["users"][uid]["hwid"] = None
-            self.save()
-            return True
-        return False
+        with self.lock:
+            self.refresh()
+            if uid in self.data["users"]:
+                self._write({"op": "set", "path": ["users", uid, "hwid"], "value": None})
+                return True
+            return False
 
     def add_key(self, key, creator):
-        self.load()
-        self.data["keys"][key] = {"by": str(creator), "used": False}
-        self.save()
+        with self.lock:
+            self._write({"op": "set", "path": ["keys", key], "value": {"by": str(creator), "used": False}})
 
     def check_key(self, key):
-        self.load()
-        return key in self.data["keys"] and not self.data["keys"][key]["used"]
+        with self.lock:
+            self.refresh()
+            entry = self.data["keys"].get(key)
+            return entry is not None and not entry["used"]
 
     def use_key(self, key, uid):
-        self.load()
-        self.data["keys"][key]["used"] = True
-        self.data["keys"][key]["used_by"] = str(uid)
-        self.save()
+        with self.lock:
+            self._write({"op": "merge", "path": ["keys", key], "value": {"used": True, "used_by": str(uid)}})
 
     def is_blacklisted(self, uid):
-        self.load()
-        return str(uid) in self.data["blacklist"]
+        with self.lock:
+            self.refresh()
+            return str(uid) in self._blacklist
 
     def toggle_blacklist(self, uid):
-        self.load()
         uid = str(uid)
-        if uid in self.data["blacklist"]:
-            self.data["blacklist"].remove(uid)
-            r = False
-        else:
-            self.data["blacklist"].append(uid)
-            r = True
-        self.save()
-        return r
+        with self.lock:
+            self.refresh()
+            r = uid not in self._blacklist
+            self._write({"op": "bl_add" if r else "bl_remove", "value": uid})
+            return r
 
 # Initialize DB immediately after class definition
 db = DatabaseManager()
@@ -16,7 +16,7 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from contextlib import asynccontextmanager
 from datetime import datetime, UTC
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 import discord
 from discord.ext import commands
@@ -27,6 +27,11 @@ from database import db
 from website_server import run_server
 from bot_api_client import BananaAPI
 from components_v2 import patch_components_v2, ComponentsV2Config
+from command_sync import command_tree_hash, sync_scope, sync_state
+from broadcast import BroadcastEngine, BroadcastJob, BroadcastStore, dm_sender
+from role_sync import RoleReconciler
+from metrics import metrics, BOT_COMMANDS, BOT_LATENCY
+from identity_map import begin_scope
 
 # Enable Components v2 for modern UI
 patch_components_v2()
@@ -58,6 +63,7 @@ bot_api = BananaAPI(Config.WEBSITE_URL, Config.ADMIN_API_KEY)
 # Active redemption sessions: {discord_id: {step, key, email, verified_email, username}}
 # Steps: 1=waiting_key, 2=waiting_email, 3=waiting_code, 4=waiting_username, 5=waiting_password
 redemption_sessions: Dict[int, Dict[str, Any]] = {}
+metrics.gauge("redemption_sessions", "Active DM redemption sessions", lambda: len(redemption_sessions))
 
 
 def generate_verification_code() -> str:
@@ -268,34 +274,78 @@ def format_uptime(seconds: int) -> str:
     return " ".join(parts)
 
 
-class UserPanelView(discord.ui.View):
-    def __init__(self, user_id: int, has_key: bool):
-        super().__init__(timeout=300)
-        self.user_id = user_id
-        
-        if not IS_LOCALHOST or "ngrok" in Config.WEBSITE_URL:
-            web_btn = discord.ui.Button(
-                label="Web Panel",
-                style=discord.ButtonStyle.link,
-                url=f"{Config.WEBSITE_URL}/login",
-                emoji="🌐"
-            )
-            self.add_item(web_btn)
-        
-        script_btn = discord.ui.Button(
-            label="Script URL",
-            style=discord.ButtonStyle.link,
-            url=f"{Config.BASE_URL}/script.lua",
-            emoji="📜"
-        )
-        self.add_item(script_btn)
-    
-    @discord.ui.button(label="Get Loader", style=discord.ButtonStyle.primary, emoji="📋", row=1)
-    async def get_loader(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.user_id:
+# ==============================================================================
+# 🗺️ INTERACTION-SCOPED IDENTITY MAP
+# Each interaction runs in its own task (and so its own contextvars copy);
+# starting a scope here memoizes Database reads for that interaction only.
+# ==============================================================================
+
+class BananaCommandTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        begin_scope()
+        return True
+
+
+class ScopedView(discord.ui.View):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        begin_scope()
+        return True
+
+
+# ==============================================================================
+# 🎛️ PERSISTENT PANELS
+# Panel buttons are DynamicItems: the action (and, for user panels, the owner)
+# lives in the custom_id, so one handler class registered in setup_hook serves
+# every panel message ever sent, including ones from before a restart. Views
+# made only of DynamicItems also never get a per-message entry in the view store.
+# ==============================================================================
+
+USER_PANEL_BUTTONS: Dict[str, Tuple[str, discord.ButtonStyle, str, int]] = {
+    "loader": ("Get Loader", discord.ButtonStyle.primary, "📋", 1),
+    "reset_hwid": ("Reset HWID", discord.ButtonStyle.danger, "🔄", 1),
+    "info": ("My Info", discord.ButtonStyle.secondary, "ℹ️", 2),
+    "refresh": ("Refresh", discord.ButtonStyle.secondary, "🔄", 2),
+}
+
+ADMIN_PANEL_BUTTONS: Dict[str, Tuple[str, discord.ButtonStyle, str, int]] = {
+    "gen_key": ("Generate Key", discord.ButtonStyle.success, "🔑", 0),
+    "stats": ("View Stats", discord.ButtonStyle.primary, "📊", 0),
+    "backup": ("Backup DB", discord.ButtonStyle.secondary, "💾", 1),
+    "refresh": ("Refresh", discord.ButtonStyle.secondary, "🔄", 1),
+}
+
+
+def _panel_button(spec: Tuple[str, discord.ButtonStyle, str, int], custom_id: str) -> discord.ui.Button:
+    label, style, emoji, row = spec
+    return discord.ui.Button(label=label, style=style, emoji=emoji, row=row, custom_id=custom_id)
+
+
+class UserPanelButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"banana:panel:(?P<action>loader|reset_hwid|info|refresh):(?P<owner>[0-9]+)",
+):
+    """Per-user /panel action; only the owner encoded in the custom_id may use it."""
+
+    def __init__(self, action: str, owner_id: int) -> None:
+        super().__init__(_panel_button(USER_PANEL_BUTTONS[action], f"banana:panel:{action}:{owner_id}"))
+        self.action = action
+        self.owner_id = owner_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match[str]):
+        return cls(match["action"], int(match["owner"]))
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        begin_scope()
+        if interaction.user.id != self.owner_id:
             await interaction.response.send_message("❌ This button is not for you!", ephemeral=True)
-            return
-        
+            return False
+        return True
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        await getattr(self, f"_{self.action}")(interaction)
+
+    async def _loader(self, interaction: discord.Interaction) -> None:
         user_data = db.get_user(interaction.user.id)
         if not user_data or not user_data.get("key"):
             embed = create_embed("❌ No License", "You don't have an active license.", discord.Color.red())
@@ -335,13 +385,8 @@ class UserPanelView(discord.ui.View):
             await interaction.response.send_message("✅ Loader sent to your DMs!", ephemeral=True)
         except discord.Forbidden:
             await interaction.response.send_message(f"``````\n⚠️ Enable DMs for future requests.", ephemeral=True)
-    
-    @discord.ui.button(label="Reset HWID", style=discord.ButtonStyle.danger, emoji="🔄", row=1)
-    async def reset_hwid_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.user_id:
-            await interaction.response.send_message("❌ This button is not for you!", ephemeral=True)
-            return
-        
+
+    async def _reset_hwid(self, interaction: discord.Interaction) -> None:
         success = db.reset_hwid(interaction.user.id)
         if success:
             db.log_event("hwid_reset", str(interaction.user.id), None, "Button reset")
@@ -350,13 +395,8 @@ class UserPanelView(discord.ui.View):
             embed = create_embed("❌ Failed", "Could not reset HWID.", discord.Color.red())
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
-    
-    @discord.ui.button(label="My Info", style=discord.ButtonStyle.secondary, emoji="ℹ️", row=2)
-    async def my_info_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.user_id:
-            await interaction.response.send_message("❌ This button is not for you!", ephemeral=True)
-            return
-        
+
+    async def _info(self, interaction: discord.Interaction) -> None:
         user = db.get_user(interaction.user.id)
         is_banned = db.is_blacklisted(interaction.user.id)
         
@@ -373,47 +413,51 @@ class UserPanelView(discord.ui.View):
         embed.add_field(name="Status", value=status, inline=False)
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
-    
-    @discord.ui.button(label="Refresh", style=discord.ButtonStyle.secondary, emoji="🔄", row=2)
-    async def refresh_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.user_id:
-            await interaction.response.send_message("❌ This button is not for you!", ephemeral=True)
-            return
-        
+
+    async def _refresh(self, interaction: discord.Interaction) -> None:
         await interaction.response.send_message("🔄 Refreshing panel...", ephemeral=True)
 
 
-class AdminPanelView(discord.ui.View):
-    def __init__(self, bot: commands.Bot):
-        super().__init__(timeout=300)
-        self.bot = bot
-    
-    @discord.ui.button(label="Generate Key", style=discord.ButtonStyle.success, emoji="🔑", row=0)
-    async def gen_key_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if not await is_admin(interaction, self.bot):
+class AdminPanelButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"banana:admin:(?P<action>gen_key|stats|backup|refresh)",
+):
+    """Admin panel action; access is re-checked on every click."""
+
+    def __init__(self, action: str) -> None:
+        super().__init__(_panel_button(ADMIN_PANEL_BUTTONS[action], f"banana:admin:{action}"))
+        self.action = action
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match[str]):
+        return cls(match["action"])
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        begin_scope()
+        if not await is_admin(interaction, interaction.client):
             await interaction.response.send_message("❌ Admin only!", ephemeral=True)
-            return
-        
+            return False
+        return True
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        await getattr(self, f"_{self.action}")(interaction)
+
+    async def _gen_key(self, interaction: discord.Interaction) -> None:
         key = generate_key()
         if db.generate_key_entry(key, interaction.user.id):
             embed = create_embed("✅ Key Generated", f"``````", discord.Color.green())
             await interaction.response.send_message(embed=embed, ephemeral=True)
         else:
             await interaction.response.send_message("❌ Failed to generate key!", ephemeral=True)
-    
-    @discord.ui.button(label="View Stats", style=discord.ButtonStyle.primary, emoji="📊", row=0)
-    async def view_stats_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if not await is_admin(interaction, self.bot):
-            await interaction.response.send_message("❌ Admin only!", ephemeral=True)
-            return
-        
+
+    async def _stats(self, interaction: discord.Interaction) -> None:
         await interaction.response.defer(ephemeral=True)
         
         try:
             result = await bot_api.get_stats()
             if result.get('success'):
                 stats = result['stats']
-                uptime = format_uptime(int(time.time() - self.bot.start_time))
+                uptime = format_uptime(int(time.time() - interaction.client.start_time))
                 
                 embed = create_embed("System Statistics")
                 embed.add_field(name="⏱️ Uptime", value=f"`{uptime}`", inline=False)
@@ -427,13 +471,8 @@ class AdminPanelView(discord.ui.View):
         except Exception as e:
             log.error(f"Stats error: {e}", exc_info=True)
             await interaction.followup.send(f"❌ Error loading stats: {str(e)[:100]}", ephemeral=True)
-    
-    @discord.ui.button(label="Backup DB", style=discord.ButtonStyle.secondary, emoji="💾", row=1)
-    async def backup_db_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if not await is_admin(interaction, self.bot):
-            await interaction.response.send_message("❌ Admin only!", ephemeral=True)
-            return
-        
+
+    async def _backup(self, interaction: discord.Interaction) -> None:
         await interaction.response.defer(ephemeral=True)
         
         try:
@@ -442,14 +481,240 @@ class AdminPanelView(discord.ui.View):
             await interaction.followup.send(embed=embed, ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"❌ Backup failed: {e}", ephemeral=True)
-    
-    @discord.ui.button(label="Refresh", style=discord.ButtonStyle.secondary, emoji="🔄", row=1)
-    async def refresh_admin_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if not await is_admin(interaction, self.bot):
-            await interaction.response.send_message("❌ Admin only!", ephemeral=True)
+
+    async def _refresh(self, interaction: discord.Interaction) -> None:
+        await interaction.response.send_message("🔄 Admin panel refreshed!", ephemeral=True)
+
+
+class UserPanelView(ScopedView):
+    def __init__(self, user_id: int, has_key: bool):
+        super().__init__(timeout=None)
+        self.user_id = user_id
+        
+        if not IS_LOCALHOST or "ngrok" in Config.WEBSITE_URL:
+            web_btn = discord.ui.Button(
+                label="Web Panel",
+                style=discord.ButtonStyle.link,
+                url=f"{Config.WEBSITE_URL}/login",
+                emoji="🌐"
+            )
+            self.add_item(web_btn)
+        
+        script_btn = discord.ui.Button(
+            label="Script URL",
+            style=discord.ButtonStyle.link,
+            url=f"{Config.BASE_URL}/script.lua",
+            emoji="📜"
+        )
+        self.add_item(script_btn)
+        
+        for action in USER_PANEL_BUTTONS:
+            self.add_item(UserPanelButton(action, user_id))
+
+
+class AdminPanelView(ScopedView):
+    def __init__(self, bot: commands.Bot):
+        super().__init__(timeout=None)
+        self.bot = bot
+        
+        for action in ADMIN_PANEL_BUTTONS:
+            self.add_item(AdminPanelButton(action))
+
+
+# ==============================================================================
+# 📜 USER LIST PAGINATOR
+# ==============================================================================
+
+USERLIST_PAGE_SIZE = 10
+USERLIST_WINDOW = 2  # cached pages kept on each side of the current one
+USERLIST_TIMEOUT = 300  # seconds of inactivity before a session expires
+
+
+class UserListPaginator(ScopedView):
+    """
+    /userlist browser over the cursor-paginated users API.
+
+    cursors[i] fetches page i; a page with no known cursor (a direct jump
+    to page N) is fetched by offset, one request however deep, and the
+    cursor it returns takes over from there. Pages within USERLIST_WINDOW of
+    the current one stay cached and the next page is prefetched in the
+    background, so Prev/Next usually answer without an HTTP round trip.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(timeout=USERLIST_TIMEOUT)
+        self.index = 0
+        self.total: Optional[int] = None
+        self.last_index: Optional[int] = None
+        self.cursors: Dict[int, Optional[str]] = {0: None}
+        self.pages: Dict[int, List[Dict[str, Any]]] = {}
+        self.inflight: Dict[int, asyncio.Task] = {}
+        self.expires_at = time.monotonic() + USERLIST_TIMEOUT
+
+    # ========== FETCHING ==========
+
+    async def _fetch(self, index: int) -> List[Dict[str, Any]]:
+        result = await bot_api.get_users_page(
+            limit=USERLIST_PAGE_SIZE,
+            cursor=self.cursors.get(index),
+            include_total=self.total is None,
+            offset=0 if index in self.cursors else index * USERLIST_PAGE_SIZE,
+        )
+        if not result.get('success'):
+            raise RuntimeError(result.get('error') or 'Unknown error')
+        
+        if 'total' in result:
+            self.total = result['total']
+        users = result.get('users', [])
+        next_cursor = result.get('next_cursor')
+        if next_cursor:
+            self.cursors.setdefault(index + 1, next_cursor)
+        elif users or index == 0:
+            self.last_index = index
+        
+        self.pages[index] = users
+        return users
+
+    def _start_fetch(self, index: int) -> asyncio.Task:
+        task = self.inflight.get(index)
+        if task is None:
+            task = self.inflight[index] = asyncio.create_task(self._fetch(index))
+            task.add_done_callback(lambda t, i=index: self._fetch_done(i, t))
+        return task
+
+    def _fetch_done(self, index: int, task: asyncio.Task) -> None:
+        self.inflight.pop(index, None)
+        if not task.cancelled() and task.exception() is not None:
+            log.warning(f"User list page {index + 1} fetch failed: {task.exception()}")
+
+    async def page(self, index: int) -> List[Dict[str, Any]]:
+        if index in self.pages:
+            return self.pages[index]
+        return await self._start_fetch(index)
+
+    def _prefetch_next(self) -> None:
+        nxt = self.index + 1
+        if nxt in self.cursors and nxt not in self.pages:
+            self._start_fetch(nxt)
+
+    def _evict(self) -> None:
+        for index in [i for i in self.pages if abs(i - self.index) > USERLIST_WINDOW]:
+            del self.pages[index]
+
+    async def goto(self, index: int) -> None:
+        """Move to page `index`, or the last page if `index` is past the end."""
+        index = max(0, index)
+        if self.last_index is not None:
+            index = min(index, self.last_index)
+        if not await self.page(index) and index > 0:
+            # Past the end: the first fetch brought the total, so the last page is known
+            self.pages.pop(index, None)
+            index = max(0, ((self.total or 0) - 1) // USERLIST_PAGE_SIZE)
+            await self.page(index)
+        self.index = index
+        self._evict()
+        self._prefetch_next()
+
+    def expire(self) -> None:
+        for task in self.inflight.values():
+            task.cancel()
+        self.inflight.clear()
+        self.pages.clear()
+        self.stop()
+
+    # ========== RENDERING ==========
+
+    def render(self) -> discord.Embed:
+        users = self.pages.get(self.index, [])
+        total = self.total or 0
+        total_pages = max(1, (total + USERLIST_PAGE_SIZE - 1) // USERLIST_PAGE_SIZE)
+        start = self.index * USERLIST_PAGE_SIZE
+        
+        embed = create_embed(f"👥 User List (Page {self.index + 1}/{total_pages})", f"Total: **{total}** users")
+        for i, user in enumerate(users, start=start + 1):
+            discord_id = user.get('discord_id', 'Unknown')
+            key = (user.get('key') or 'N/A')[:8] + '...'
+            status = "🟢" if user.get('hwid') else "🟡"
+            embed.add_field(name=f"{i}. {status} ID: {discord_id}", value=f"Key: `{key}`", inline=True)
+        
+        self.prev_btn.disabled = self.index == 0
+        self.next_btn.disabled = self.last_index is not None and self.index >= self.last_index
+        return embed
+
+    # ========== BUTTONS ==========
+
+    async def _navigate(self, interaction: discord.Interaction, index: int) -> None:
+        now = time.monotonic()
+        if now > self.expires_at:
+            self.expire()
+            await interaction.response.send_message("⌛ This user list expired. Run `/userlist` again.", ephemeral=True)
             return
+        self.expires_at = now + USERLIST_TIMEOUT
         
-        await interaction.response.send_message("🔄 Admin panel refreshed!", ephemeral=True)
+        try:
+            if index in self.pages:
+                await self.goto(index)
+                await interaction.response.edit_message(embed=self.render(), view=self)
+            else:
+                await interaction.response.defer()
+                await self.goto(index)
+                await interaction.edit_original_response(embed=self.render(), view=self)
+        except Exception as e:
+            log.error(f"User list navigation error: {e}", exc_info=True)
+            await interaction.followup.send(f"❌ Error: {str(e)[:100]}", ephemeral=True)
+
+    @discord.ui.button(label="⬅️ Previous", style=discord.ButtonStyle.secondary)
+    async def prev_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._navigate(interaction, self.index - 1)
+
+    @discord.ui.button(label="➡️ Next", style=discord.ButtonStyle.secondary)
+    async def next_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._navigate(interaction, self.index + 1)
+
+    async def on_timeout(self) -> None:
+        self.expire()
+
+
+# ==============================================================================
+# 📢 BROADCAST DELIVERY
+# ==============================================================================
+
+# Interaction tokens expire after 15 minutes; stop live edits a little before
+BROADCAST_EDIT_WINDOW = 14 * 60
+
+_BROADCAST_STATUS = {
+    'running': ("📢 Broadcast In Progress", discord.Color.blue()),
+    'done': ("📢 Broadcast Delivered", discord.Color.green()),
+    'failed': ("📢 Broadcast Failed", discord.Color.red()),
+}
+
+
+def broadcast_announcement(message: str) -> discord.Embed:
+    return create_embed("📢 Banana Hub Announcement", message)
+
+
+def broadcast_status_embed(job: BroadcastJob) -> discord.Embed:
+    title, color = _BROADCAST_STATUS.get(job.status, _BROADCAST_STATUS['running'])
+    total = max(job.total, 1)
+    filled = min(10, job.done * 10 // total)
+    embed = create_embed(
+        f"{title} (#{job.id})",
+        f"`{'█' * filled}{'░' * (10 - filled)}` **{job.done}/{job.total}**",
+        color,
+    )
+    embed.add_field(name="✅ Sent", value=f"`{job.sent}`", inline=True)
+    embed.add_field(name="❌ Failed", value=f"`{job.failed}`", inline=True)
+    embed.add_field(name="⚡ Rate", value=f"`{job.rate():.1f}/s`", inline=True)
+    if job.reasons:
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(job.reasons.items()))
+        embed.add_field(name="⚠️ Failures", value=f"`{reasons}`", inline=False)
+    eta = job.eta()
+    if job.status == 'running' and eta is not None:
+        embed.add_field(name="⏳ ETA", value=f"`{int(eta // 60)}m {int(eta % 60)}s`", inline=True)
+    if job.resumed:
+        embed.set_footer(text="Resumed after a restart")
+    embed.add_field(name="📝 Message", value=f"```{job.message[:500]}```", inline=False)
+    return embed
 
 
 class BananaBot(commands.Bot):
@@ -462,6 +727,7 @@ class BananaBot(commands.Bot):
             command_prefix=getattr(Config, "PREFIX", "!"),
             intents=intents,
             help_command=None,
+            tree_cls=BananaCommandTree,
         )
         
         self.start_time = START_TIME
@@ -469,12 +735,28 @@ class BananaBot(commands.Bot):
         self.version = "2.1.0"
         self.admin_role_name = "Banana Hub Admin"
         self.hwid_reset_cooldown = 300
+        
+        # guild id -> admin role id, so reconnects skip guilds already set up
+        self.admin_roles: Dict[int, int] = {}
+        self._bootstrap_task: Optional[asyncio.Task] = None
+        self._presence_task: Optional[asyncio.Task] = None
+        self._presence_name: Optional[str] = None
+        
+        self.broadcasts = BroadcastEngine(
+            BroadcastStore(db.get_connection),
+            dm_sender(self, render=broadcast_announcement),
+        )
+        self._broadcasts_resumed = False
+        self.role_sync = RoleReconciler(self, db)
 
     async def setup_hook(self) -> None:
         log.info("⚙️ Running setup hook...")
         
         self.tree.error(self.on_app_command_error)
         
+        # Panel buttons keep working for messages sent before this process started
+        self.add_dynamic_items(UserPanelButton, AdminPanelButton)
+        
         try:
             await self.add_cog(UserCog(self))
             log.info("✅ Loaded UserCog")
@@ -491,25 +773,44 @@ class BananaBot(commands.Bot):
         
         await self.sync_commands()
 
-    async def sync_commands(self) -> None:
-        if self.synced:
-            return
+    async def sync_commands(self, force: bool = False) -> Optional[int]:
+        """
+        Upload the command tree unless its hash matches the last successful sync.
+
+        Returns the number of commands synced, or None when the sync was
+        skipped (or failed).
+        """
+        if self.synced and not force:
+            return None
+        
+        guild = None
+        if hasattr(Config, "GUILD_ID") and Config.GUILD_ID:
+            guild = discord.Object(id=int(Config.GUILD_ID))
+            self.tree.copy_global_to(guild=guild)
+        target = f"guild {Config.GUILD_ID}" if guild else "globally"
+        
+        scope = sync_scope(self.application_id, guild)
+        digest = command_tree_hash(self.tree, guild)
+        force = force or Config.FORCE_COMMAND_SYNC
+        if not force and sync_state.is_current(scope, digest):
+            log.info(f"⏭️ Command tree unchanged ({digest[:12]}), skipping sync {target}")
+            self.synced = True
+            return None
         
         try:
-            if hasattr(Config, "GUILD_ID") and Config.GUILD_ID:
-                guild = discord.Object(id=int(Config.GUILD_ID))
-                self.tree.copy_global_to(guild=guild)
-                synced = await self.tree.sync(guild=guild)
-                log.info(f"✅ Synced {len(synced)} commands to guild {Config.GUILD_ID}")
-            else:
-                synced = await self.tree.sync()
-                log.info(f"✅ Synced {len(synced)} commands globally")
-            
+            started = time.perf_counter()
+            synced = await self.tree.sync(guild=guild)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            log.info(f"✅ Synced {len(synced)} commands {target} in {elapsed_ms:.0f}ms ({digest[:12]})")
             log.info(f"Commands: {', '.join([cmd.name for cmd in synced])}")
+            
+            sync_state.record(scope, digest, len(synced))
             self.synced = True
+            return len(synced)
             
         except Exception as e:
             log.error(f"❌ Command sync failed: {e}", exc_info=True)
+            return None
 
     async def on_ready(self) -> None:
         assert self.user is not None
@@ -521,35 +822,62 @@ class BananaBot(commands.Bot):
         log.info(f"Version: {self.version}")
         log.info("=" * 60)
         
-        await self.change_presence(
-            activity=discord.Activity(
-                type=discord.ActivityType.watching,
-                name=f"{len(self.guilds)} servers | /panel"
-            ),
-            status=discord.Status.online
-        )
+        # A fresh session starts without our activity, so always re-send it
+        self._presence_name = None
+        self.schedule_presence_update(immediate=True)
+        
+        # on_ready fires again after every re-identify; one pass at a time
+        if self._bootstrap_task is None or self._bootstrap_task.done():
+            self._bootstrap_task = asyncio.create_task(self.bootstrap_guilds(list(self.guilds)))
         
-        for guild in self.guilds:
-            await self.setup_admin_role(guild)
+        self.role_sync.start()
+        
+        if not self._broadcasts_resumed:
+            self._broadcasts_resumed = True
+            try:
+                await self.broadcasts.resume_pending(lambda job: self.report_broadcast_by_dm)
+            except Exception as e:
+                log.error(f"❌ Could not resume broadcasts: {e}", exc_info=True)
+
+    async def report_broadcast_by_dm(self, job: BroadcastJob) -> None:
+        """Final report for broadcasts whose original interaction is gone (resumed ones)."""
+        if job.status == 'running':
+            return
+        author = self.get_user(job.author_id) or await self.fetch_user(job.author_id)
+        await author.send(embed=broadcast_status_embed(job))
+
+    async def close(self) -> None:
+        # Leave unfinished broadcasts `running` in the table; the next boot resumes them
+        await self.broadcasts.shutdown()
+        await self.role_sync.stop()
+        await super().close()
 
     async def on_guild_join(self, guild: discord.Guild) -> None:
         log.info(f"📥 Joined guild: {guild.name} (ID: {guild.id})")
         await self.setup_admin_role(guild)
-        await self.change_presence(
-            activity=discord.Activity(
-                type=discord.ActivityType.watching,
-                name=f"{len(self.guilds)} servers | /panel"
-            )
-        )
+        self.schedule_presence_update()
 
     async def on_guild_remove(self, guild: discord.Guild) -> None:
         log.info(f"📤 Left guild: {guild.name}")
-        await self.change_presence(
-            activity=discord.Activity(
-                type=discord.ActivityType.watching,
-                name=f"{len(self.guilds)} servers | /panel"
-            )
-        )
+        self.admin_roles.pop(guild.id, None)
+        self.schedule_presence_update()
+
+    async def on_member_join(self, member: discord.Member) -> None:
+        # Rejoining members get their Premium role back
+        await self.role_sync.check_member(member)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member) -> None:
+        premium = self.role_sync.role_for(after.guild)
+        if premium and (before.get_role(premium.id) is None) != (after.get_role(premium.id) is None):
+            await self.role_sync.check_member(after)
+
+    async def on_guild_role_delete(self, role: discord.Role) -> None:
+        if self.admin_roles.get(role.guild.id) == role.id:
+            del self.admin_roles[role.guild.id]
+
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role) -> None:
+        if before.name != after.name and self.admin_roles.get(after.guild.id) == after.id:
+            del self.admin_roles[after.guild.id]
 
     async def on_message(self, message: discord.Message) -> None:
         """Handle DM messages for redemption flow."""
@@ -769,6 +1097,7 @@ class BananaBot(commands.Bot):
                 if not existing_user or not existing_user.get('key'):
                     db.register_user(user_id, key)
                     db.mark_key_redeemed(key, user_id)
+                    await self.role_sync.check_users([user_id])
                 
                 # Create account
                 success = db.create_account(user_id, email, username, password)
@@ -814,10 +1143,64 @@ class BananaBot(commands.Bot):
                 del redemption_sessions[user_id]
             await message.channel.send(embed=embed)
 
+    # ========== GUILD BOOTSTRAP ==========
+
+    async def bootstrap_guilds(self, guilds: List[discord.Guild]) -> None:
+        """Set up every guild concurrently, bounded so role creation stays under rate limits."""
+        started = time.perf_counter()
+        pending = [g for g in guilds if not self._cached_admin_role(g)]
+        semaphore = asyncio.Semaphore(max(1, Config.GUILD_BOOTSTRAP_CONCURRENCY))
+        
+        async def bootstrap(guild: discord.Guild) -> Optional[discord.Role]:
+            async with semaphore:
+                return await self.setup_admin_role(guild)
+        
+        results = await asyncio.gather(*(bootstrap(g) for g in pending), return_exceptions=True)
+        failed = sum(1 for r in results if r is None or isinstance(r, BaseException))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        log.info(
+            f"🏁 Bootstrapped {len(pending) - failed}/{len(pending)} guilds in {elapsed_ms:.0f}ms "
+            f"({len(guilds) - len(pending)} cached)"
+        )
+
+    def _cached_admin_role(self, guild: discord.Guild) -> Optional[discord.Role]:
+        role_id = self.admin_roles.get(guild.id)
+        return guild.get_role(role_id) if role_id else None
+
+    def schedule_presence_update(self, immediate: bool = False) -> None:
+        """Coalesce guild join/leave bursts into one change_presence call."""
+        if self._presence_task is not None and not self._presence_task.done():
+            if not immediate:
+                return
+            self._presence_task.cancel()
+        self._presence_task = asyncio.create_task(
+            self._update_presence(0 if immediate else Config.PRESENCE_DEBOUNCE)
+        )
+
+    async def _update_presence(self, delay: float) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        name = f"{len(self.guilds)} servers | /panel"
+        if name == self._presence_name:
+            return
+        try:
+            await self.change_presence(
+                activity=discord.Activity(type=discord.ActivityType.watching, name=name),
+                status=discord.Status.online
+            )
+            self._presence_name = name
+        except Exception as e:
+            log.warning(f"Presence update failed: {e}")
+
     async def setup_admin_role(self, guild: discord.Guild) -> Optional[discord.Role]:
         try:
+            cached = self._cached_admin_role(guild)
+            if cached:
+                return cached
+            
             existing_role = discord.utils.get(guild.roles, name=self.admin_role_name)
             if existing_role:
+                self.admin_roles[guild.id] = existing_role.id
                 return existing_role
             
             admin_role = await guild.create_role(
@@ -830,6 +1213,7 @@ class BananaBot(commands.Bot):
             )
             
             log.info(f"✅ Created admin role in {guild.name}")
+            self.admin_roles[guild.id] = admin_role.id
             
             try:
                 owner = guild.get_member(Config.OWNER_ID)
@@ -855,11 +1239,26 @@ class BananaBot(commands.Bot):
             log.error(f"Error setting up admin role: {e}")
             return None
 
+    def _record_command(self, interaction: discord.Interaction, outcome: str) -> None:
+        command = interaction.command.qualified_name if interaction.command else "unknown"
+        elapsed = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        metrics.observe(BOT_LATENCY, elapsed, command=command)
+        metrics.inc(BOT_COMMANDS, command=command, outcome=outcome)
+
+    async def on_app_command_completion(
+        self,
+        interaction: discord.Interaction,
+        command: app_commands.Command | app_commands.ContextMenu
+    ) -> None:
+        self._record_command(interaction, "ok")
+
     async def on_app_command_error(
         self,
         interaction: discord.Interaction,
         error: app_commands.AppCommandError
     ) -> None:
+        self._record_command(interaction, type(error).__name__)
+        
         if isinstance(error, app_commands.CommandOnCooldown):
             embed = create_embed(
                 "⏱️ Cooldown",
@@ -1399,6 +1798,7 @@ class AdminCog(commands.Cog, name="Admin"):
             
             await interaction.followup.send(embed=embed, ephemeral=True)
             log.info(f"✅ Whitelisted {member.id} with key {key}")
+            await self.bot.role_sync.check_users([member.id])
         else:
             await interaction.followup.send(f"❌ {result.get('error')}", ephemeral=True)
 
@@ -1414,6 +1814,7 @@ class AdminCog(commands.Cog, name="Admin"):
         result = await bot_api.unwhitelist_user(str(member.id))
         
         if result.get('success'):
+            await self.bot.role_sync.check_users([member.id])
             embed = create_embed("✅ Removed", f"{member.mention} removed from whitelist.", discord.Color.green())
         else:
             embed = create_embed("❌ Not Found", f"{member.mention} not whitelisted.", discord.Color.red())
@@ -1606,6 +2007,8 @@ class AdminCog(commands.Cog, name="Admin"):
             embed = create_embed("❌ Error", result.get('error', 'Unknown error'), discord.Color.red())
         
         await interaction.followup.send(embed=embed, ephemeral=True)
+        if result.get('success'):
+            await self.bot.role_sync.check_users([member.id])
 
     @app_commands.command(name="unblacklist", description="🔧 [ADMIN] Remove user from blacklist")
     @app_commands.describe(member="User to unblacklist")
@@ -1628,6 +2031,8 @@ class AdminCog(commands.Cog, name="Admin"):
             embed = create_embed("❌ Error", result.get('error', 'Unknown error'), discord.Color.red())
         
         await interaction.followup.send(embed=embed, ephemeral=True)
+        if result.get('success'):
+            await self.bot.role_sync.check_users([member.id])
 
     @app_commands.command(name="forceresethwid", description="🔧 [ADMIN] Force reset user's HWID")
     @app_commands.describe(member="User to reset HWID for")
@@ -1679,7 +2084,7 @@ class AdminCog(commands.Cog, name="Admin"):
     @app_commands.command(name="broadcast", description="🔧 [ADMIN] Send a message to all whitelisted users")
     @app_commands.describe(message="The message to broadcast")
     async def broadcast(self, interaction: discord.Interaction, message: str):
-        """Broadcast a message to all users (logs it)."""
+        """DM a message to every whitelisted user, with live progress."""
         if not await is_admin(interaction, self.bot):
             await interaction.response.send_message("❌ Admin only!", ephemeral=True)
             return
@@ -1687,13 +2092,31 @@ class AdminCog(commands.Cog, name="Admin"):
         await interaction.response.defer(ephemeral=True)
         
         db.log_event("broadcast", str(interaction.user.id), None, message[:500])
+        log.info(f"📢 Broadcast by {interaction.user}: {message[:100]}")
         
-        embed = create_embed("📢 Broadcast Sent", f"Message logged for delivery.", discord.Color.green())
-        embed.add_field(name="📝 Message", value=f"```{message[:500]}```", inline=False)
-        embed.add_field(name="📊 Status", value="Broadcast recorded. Users will see this on next login.", inline=False)
+        opened = time.monotonic()
+        status_message: Optional[discord.WebhookMessage] = None
         
-        await interaction.followup.send(embed=embed, ephemeral=True)
-        log.info(f"📢 Broadcast by {interaction.user}: {message[:100]}")
+        async def report(job: BroadcastJob) -> None:
+            if status_message is None:
+                return  # The initial send below shows whatever state the job reached
+            if time.monotonic() - opened < BROADCAST_EDIT_WINDOW:
+                try:
+                    await status_message.edit(embed=broadcast_status_embed(job))
+                    return
+                except discord.HTTPException:
+                    pass
+            # Token expired (long broadcast): only the final summary goes out, by DM
+            await self.bot.report_broadcast_by_dm(job)
+        
+        try:
+            job = await self.bot.broadcasts.start(interaction.user.id, message[:2000], report)
+        except Exception as e:
+            await interaction.followup.send(f"❌ Error: {str(e)[:100]}", ephemeral=True)
+            return
+        status_message = await interaction.followup.send(embed=broadcast_status_embed(job), ephemeral=True, wait=True)
+        if job.status != 'running':
+            await status_message.edit(embed=broadcast_status_embed(job))
 
     @app_commands.command(name="userlist", description="🔧 [ADMIN] View paginated user list")
     @app_commands.describe(page="Page number (default: 1)")
@@ -1706,35 +2129,9 @@ class AdminCog(commands.Cog, name="Admin"):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            result = await bot_api.get_all_users()
-            
-            if result.get('success'):
-                users = result.get('users', [])
-                per_page = 10
-                total_pages = max(1, (len(users) + per_page - 1) // per_page)
-                page = max(1, min(page, total_pages))
-                
-                start = (page - 1) * per_page
-                end = start + per_page
-                page_users = users[start:end]
-                
-                embed = create_embed(f"👥 User List (Page {page}/{total_pages})", f"Total: **{len(users)}** users")
-                
-                for i, user in enumerate(page_users, start=start+1):
-                    discord_id = user.get('discord_id', 'Unknown')
-                    key = user.get('key', 'N/A')[:8] + '...'
-                    status = "🟢" if user.get('hwid') else "🟡"
-                    embed.add_field(name=f"{i}. {status} ID: {discord_id}", value=f"Key: `{key}`", inline=True)
-                
-                view = discord.ui.View()
-                if page > 1:
-                    view.add_item(discord.ui.Button(label="⬅️ Previous", style=discord.ButtonStyle.secondary, custom_id=f"userlist_prev_{page}"))
-                if page < total_pages:
-                    view.add_item(discord.ui.Button(label="➡️ Next", style=discord.ButtonStyle.secondary, custom_id=f"userlist_next_{page}"))
-                
-                await interaction.followup.send(embed=embed, view=view, ephemeral=True)
-            else:
-                await interaction.followup.send(f"❌ {result.get('error') or 'Unknown error'}", ephemeral=True)
+            paginator = UserListPaginator()
+            await paginator.goto(page - 1)
+            await interaction.followup.send(embed=paginator.render(), view=paginator, ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"❌ Error: {str(e)[:100]}", ephemeral=True)
 
@@ -1847,22 +2244,23 @@ class AdminCog(commands.Cog, name="Admin"):
             await interaction.response.send_message("❌ No permission to send to that channel!", ephemeral=True)
 
     @app_commands.command(name="masskey", description="🔧 [ADMIN] Generate multiple keys at once")
-    @app_commands.describe(count="Number of keys to generate (1-50)")
+    @app_commands.describe(count=f"Number of keys to generate (1-{Config.KEY_BATCH_LIMIT})")
     async def masskey(self, interaction: discord.Interaction, count: int = 5):
         """Generate multiple keys."""
         if not await is_admin(interaction, self.bot):
             await interaction.response.send_message("❌ Admin only!", ephemeral=True)
             return
         
-        count = max(1, min(count, 50))
+        count = max(1, min(count, Config.KEY_BATCH_LIMIT))
         
         await interaction.response.defer(ephemeral=True)
         
-        keys = []
-        for _ in range(count):
-            key = generate_key()
-            db.generate_key_entry(key, interaction.user.id)
-            keys.append(key)
+        # Mint in one transaction off the event loop
+        keys = await asyncio.to_thread(db.mint_keys, count, interaction.user.id)
+        if not keys:
+            await interaction.followup.send("❌ Failed to generate keys!", ephemeral=True)
+            return
+        count = len(keys)
         
         keys_text = "\n".join([f"`{k}`" for k in keys])
         
@@ -1879,6 +2277,115 @@ class AdminCog(commands.Cog, name="Admin"):
         
         db.log_event("mass_keygen", str(interaction.user.id), None, f"Generated {count} keys")
 
+    @app_commands.command(name="synccommands", description="🔧 [ADMIN] Force a slash command sync")
+    async def synccommands(self, interaction: discord.Interaction):
+        """Re-upload the command tree even if its hash is unchanged."""
+        if not await is_admin(interaction, self.bot):
+            await interaction.response.send_message("❌ Admin only!", ephemeral=True)
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        started = time.perf_counter()
+        count = await self.bot.sync_commands(force=True)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        if count is None:
+            await interaction.followup.send("❌ Command sync failed! Check the logs.", ephemeral=True)
+            return
+        
+        embed = create_embed("🔄 Commands Synced", f"Synced **{count}** commands in `{elapsed_ms:.0f}ms`.")
+        await interaction.followup.send(embed=embed, ephemeral=True)
+        db.log_event("command_sync", str(interaction.user.id), None, f"Force-synced {count} commands")
+
+    @app_commands.command(name="rolesync", description="🔧 [ADMIN] Reconcile Premium roles with licenses now")
+    async def rolesync(self, interaction: discord.Interaction):
+        """Run a full Premium role sweep and show what it queued."""
+        if not await is_admin(interaction, self.bot):
+            await interaction.response.send_message("❌ Admin only!", ephemeral=True)
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            sweep = await self.bot.role_sync.sweep()
+        except Exception as e:
+            await interaction.followup.send(f"❌ Error: {str(e)[:100]}", ephemeral=True)
+            return
+        totals = self.bot.role_sync.stats()['totals']
+        
+        embed = create_embed("🔄 Role Sync", f"Compared **{sweep['licensed']}** licensed users across **{len(sweep['guilds'])}** guilds.")
+        embed.add_field(name="➕ To Add", value=f"`{sweep['queued_add']}`", inline=True)
+        embed.add_field(name="➖ To Remove", value=f"`{sweep['queued_remove']}`", inline=True)
+        embed.add_field(name="⏱️ Diff Time", value=f"`{sweep['ms']}ms`", inline=True)
+        embed.add_field(
+            name="📊 Applied So Far",
+            value=f"Added `{totals['added']}` • Removed `{totals['removed']}` • Skipped `{totals['skipped']}` • Failed `{totals['failed']}`",
+            inline=False
+        )
+        if not sweep['guilds']:
+            embed.add_field(name="⚠️ No Role", value=f"No guild has a `{Config.PREMIUM_ROLE_NAME}` role.", inline=False)
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+
+    @app_commands.command(name="searchlogs", description="🔧 [ADMIN] Search bug reports, feedback and activity logs")
+    @app_commands.describe(
+        query='Words, "exact phrases", prefix* or -excluded',
+        event_type="Only this kind of entry",
+        days="Only the last N days (default: all)",
+        limit="Maximum results (default: 10)"
+    )
+    @app_commands.choices(event_type=[
+        app_commands.Choice(name="Bug reports", value="bug_report"),
+        app_commands.Choice(name="Feedback", value="feedback"),
+        app_commands.Choice(name="Broadcasts", value="broadcast"),
+        app_commands.Choice(name="Announcements", value="announcement"),
+        app_commands.Choice(name="HWID resets", value="hwid_reset"),
+    ])
+    async def searchlogs(
+        self,
+        interaction: discord.Interaction,
+        query: str,
+        event_type: Optional[app_commands.Choice[str]] = None,
+        days: Optional[app_commands.Range[int, 1, 365]] = None,
+        limit: app_commands.Range[int, 1, 10] = 10
+    ):
+        """Full-text search over analytics details, best matches first."""
+        if not await is_admin(interaction, self.bot):
+            await interaction.response.send_message("❌ Admin only!", ephemeral=True)
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            result = await bot_api.search_logs(
+                query,
+                event_types=[event_type.value] if event_type else None,
+                since=int(time.time()) - days * 86400 if days else None,
+                limit=limit
+            )
+        except Exception as e:
+            await interaction.followup.send(f"❌ Error: {str(e)[:100]}", ephemeral=True)
+            return
+        if not result.get('success'):
+            await interaction.followup.send(f"❌ {result.get('error') or 'Unknown error'}", ephemeral=True)
+            return
+        
+        hits = result['results']
+        scope = f" in `{event_type.name}`" if event_type else ""
+        embed = create_embed("🔎 Log Search", f"**{len(hits)}** matches for `{query[:100]}`{scope} in `{result['took_ms']}ms`")
+        for hit in hits:
+            user = f"<@{hit['discord_id']}>" if hit.get('discord_id') else "system"
+            logged = int(datetime.fromisoformat(hit['timestamp']).timestamp())
+            embed.add_field(
+                name=f"{hit['event_type']} • #{hit['id']}",
+                value=f"{hit['snippet'][:400]}\n{user} • <t:{logged}:R>",
+                inline=False
+            )
+        if not hits:
+            embed.add_field(name="ℹ️ Nothing Found", value="Try fewer words, a prefix like `crash*`, or a wider date range.", inline=False)
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
 
 class UtilityCog(commands.Cog, name="Utility"):
     def __init__(self, bot: BananaBot) -> None:
@@ -1958,7 +2465,10 @@ class UtilityCog(commands.Cog, name="Utility"):
                     "`/broadcast` - Send broadcast\n"
                     "`/announce` - Channel announcement\n"
                     "`/exportdata` - Export data as JSON\n"
-                    "`/purgekeys` - Delete unused keys"
+                    "`/purgekeys` - Delete unused keys\n"
+                    "`/synccommands` - Force command sync\n"
+                    "`/rolesync` - Reconcile Premium roles\n"
+                    "`/searchlogs` - Search reports & logs"
                 ),
                 inline=False
             )
@@ -0,0 +1,303 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - METRICS
+# Lock-light counters and latency histograms rendered in Prometheus text format
+# Writes go to one of a fixed set of striped shards picked by thread id;
+# shards are only merged at scrape time
+# ==============================================================================
+
+from __future__ import annotations
+
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# ==============================================================================
+# 🔧 TYPES & DEFAULTS
+# ==============================================================================
+
+LabelKey = Tuple[Tuple[str, str], ...]
+SeriesKey = Tuple[str, LabelKey]
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+# ==============================================================================
+# 🧩 STRIPED SHARD
+# ==============================================================================
+
+class _Shard:
+    """Counters and histograms for the threads hashed to this stripe."""
+
+    __slots__ = ("lock", "counters", "histograms")
+
+    def __init__(self):
+        # Only contended when two threads on the same stripe write at once
+        self.lock = threading.Lock()
+        self.counters: Dict[SeriesKey, float] = {}
+        # series -> [bucket counts..., +Inf count, sum]
+        self.histograms: Dict[SeriesKey, List[float]] = {}
+
+    def merge_into(self, counters: Dict[SeriesKey, float], histograms: Dict[SeriesKey, List[float]]) -> None:
+        with self.lock:
+            own_counters = list(self.counters.items())
+            own_histograms = [(key, list(values)) for key, values in self.histograms.items()]
+        for key, value in own_counters:
+            counters[key] = counters.get(key, 0.0) + value
+        for key, snapshot in own_histograms:
+            merged = histograms.get(key)
+            if merged is None:
+                histograms[key] = snapshot
+            else:
+                for i, v in enumerate(snapshot):
+                    merged[i] += v
+
+# ==============================================================================
+# 📈 METRICS REGISTRY
+# ==============================================================================
+
+class Metrics:
+    """
+    Process-wide metrics registry.
+
+    Writes go to one of `stripes` shards chosen by hashing the thread id,
+    each behind its own lock, so concurrent writers rarely meet and there is
+    no registry-wide lock on the hot path. The shard set is fixed: short
+    lived threads (werkzeug spawns one per request) cost no memory.
+    """
+
+    def __init__(self, namespace: str = "banana", stripes: int = 16):
+        self.namespace = namespace
+        self._shards: List[_Shard] = [_Shard() for _ in range(max(1, stripes))]
+        self._meta: Dict[str, Tuple[str, str]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._gauges: Dict[str, Tuple[str, Callable[[], Any]]] = {}
+
+    # ==========================================================================
+    # 🏷️ REGISTRATION
+    # ==========================================================================
+
+    def _name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+    def counter(self, name: str, help_text: str) -> str:
+        full = self._name(name)
+        self._meta[full] = ("counter", help_text)
+        return name
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> str:
+        full = self._name(name)
+        self._meta[full] = ("histogram", help_text)
+        self._buckets[full] = tuple(sorted(buckets))
+        return name
+
+    def gauge(self, name: str, help_text: str, callback: Callable[[], Any]) -> str:
+        """
+        Register a gauge evaluated at scrape time.
+
+        The callback returns a number, or a dict of {label_dict_tuple: value}
+        built with `labelled()` for multi-series gauges.
+        """
+        full = self._name(name)
+        self._meta[full] = ("gauge", help_text)
+        self._gauges[full] = (help_text, callback)
+        return name
+
+    # ==========================================================================
+    # ✍️ RECORDING (HOT PATH)
+    # ==========================================================================
+
+    def _shard(self) -> _Shard:
+        # Thread ids are aligned addresses; the multiply spreads their high bits
+        return self._shards[((threading.get_ident() * 0x9E3779B1) >> 16) % len(self._shards)]
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        shard = self._shard()
+        key = (self._name(name), _label_key(labels))
+        with shard.lock:
+            shard.counters[key] = shard.counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        full = self._name(name)
+        buckets = self._buckets.get(full, DEFAULT_BUCKETS)
+        slot = bisect.bisect_left(buckets, value)
+        shard = self._shard()
+        key = (full, _label_key(labels))
+        with shard.lock:
+            series = shard.histograms.get(key)
+            if series is None:
+                series = [0.0] * (len(buckets) + 2)
+                shard.histograms[key] = series
+            series[slot] += 1
+            series[-1] += value
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name: str, **labels: Any) -> Callable:
+        """Decorator form of `timer`."""
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - started, **labels)
+            return wrapper
+        return decorator
+
+    # ==========================================================================
+    # 📤 SCRAPING
+    # ==========================================================================
+
+    def collect(self) -> Tuple[Dict[SeriesKey, float], Dict[SeriesKey, List[float]]]:
+        """Merge every shard (each locked only while it is copied)."""
+        counters: Dict[SeriesKey, float] = {}
+        histograms: Dict[SeriesKey, List[float]] = {}
+        for shard in self._shards:
+            shard.merge_into(counters, histograms)
+        return counters, histograms
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Merged counters/histogram totals keyed by series, for JSON views."""
+        counters, histograms = self.collect()
+        return {
+            'counters': {
+                name + _format_labels(labels): value for (name, labels), value in counters.items()
+            },
+            'histograms': {
+                name + _format_labels(labels): {'count': sum(values[:-1]), 'sum': values[-1]}
+                for (name, labels), values in histograms.items()
+            },
+        }
+
+    def render(self) -> str:
+        """Render all series in Prometheus text exposition format (0.0.4)."""
+        counters, histograms = self.collect()
+        lines: List[str] = []
+        emitted = set()
+
+        def header(name: str) -> None:
+            if name in emitted:
+                return
+            emitted.add(name)
+            metric_type, help_text = self._meta.get(name, ("untyped", ""))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name)
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for (name, labels), values in sorted(histograms.items()):
+            header(name)
+            buckets = self._buckets.get(name, DEFAULT_BUCKETS)
+            cumulative = 0.0
+            for bound, count in zip(buckets, values):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {_format_value(cumulative)}")
+            cumulative += values[len(buckets)]
+            lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {_format_value(cumulative)}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(values[-1])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {_format_value(cumulative)}")
+
+        for name, (_, callback) in sorted(self._gauges.items()):
+            try:
+                value = callback()
+            except Exception:
+                continue
+            header(name)
+            if isinstance(value, dict):
+                for labels, v in sorted(value.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(v)}")
+            else:
+                lines.append(f"{name} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def labelled(**labels: Any) -> LabelKey:
+    """Label key for multi-series gauge callbacks."""
+    return _label_key(labels)
+
+# ==============================================================================
+# 🔌 INSTRUMENTATION HELPERS
+# ==============================================================================
+
+def instrument_methods(cls: type, registry: "Metrics", histogram: str, label: str = "method") -> type:
+    """Wrap every public method of `cls` with a latency histogram observation."""
+    for attr, func in list(vars(cls).items()):
+        if attr.startswith("_") or not callable(func) or getattr(func, "__instrumented__", False):
+            continue
+
+        def make_wrapper(method: Callable, method_name: str) -> Callable:
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    registry.observe(histogram, time.perf_counter() - started, **{label: method_name})
+            wrapper.__instrumented__ = True
+            return wrapper
+
+        setattr(cls, attr, make_wrapper(func, attr))
+    return cls
+
+# ==============================================================================
+# 🌍 GLOBAL REGISTRY & METRIC DEFINITIONS
+# ==============================================================================
+
+metrics = Metrics()
+
+HTTP_REQUESTS = metrics.counter("http_requests_total", "HTTP requests by endpoint, method and status")
+HTTP_LATENCY = metrics.histogram("http_request_duration_seconds", "HTTP request latency by endpoint")
+DB_LATENCY = metrics.histogram("db_call_duration_seconds", "Database method call latency")
+CACHE_REQUESTS = metrics.counter("cache_requests_total", "Cache lookups by cache and result (hit/miss)")
+BOT_COMMANDS = metrics.counter("bot_commands_total", "Bot application commands by command and outcome")
+BOT_LATENCY = metrics.histogram(
+    "bot_command_duration_seconds",
+    "Bot command latency from interaction creation to completion",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+REAPER_DELETED = metrics.counter("reaper_deleted_rows_total", "Expired rows deleted by the reaper")
+BROADCAST_DMS = metrics.counter("broadcast_dms_total", "Broadcast DM attempts by outcome")
+ROLE_SYNC_CHANGES = metrics.counter("role_sync_changes_total", "Premium role reconciliation operations by action and outcome")
+TRIAL_GUARD_DECISIONS = metrics.counter("trial_guard_decisions_total", "Trial start decisions by outcome and the rule that refused them")
+
+_started_at = time.time()
+metrics.gauge("uptime_seconds", "Seconds since the process started", lambda: time.time() - _started_at)
+metrics.gauge("threads", "Live Python threads", threading.active_count)
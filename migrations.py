@@ -0,0 +1,643 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - SCHEMA MIGRATIONS
+# Versioned schema changes driven by SQLite's PRAGMA user_version
+# Each migration runs in its own transaction and is safe to re-run
+# ==============================================================================
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+# ==============================================================================
+# 🔧 LOGGING
+# ==============================================================================
+
+log = logging.getLogger("migrations")
+
+# ==============================================================================
+# 🧱 MIGRATION DEFINITIONS
+# ==============================================================================
+
+# A step is either a single SQL statement or a callable that receives the
+# connection (for data rewrites that can't be expressed as one statement).
+MigrationStep = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+class Migration:
+    """A single ordered schema change."""
+
+    def __init__(self, version: int, name: str, steps: Sequence[MigrationStep]):
+        self.version = version
+        self.name = name
+        self.steps = list(steps)
+
+    def describe_step(self, step: MigrationStep) -> str:
+        """Human readable one-liner for logs and dry runs."""
+        if callable(step):
+            return f"<python: {getattr(step, '__name__', 'step')}>"
+        return " ".join(step.split())
+
+    def __repr__(self) -> str:
+        return f"Migration(v{self.version}: {self.name})"
+
+
+def rename_nocase_duplicate_usernames(conn: sqlite3.Connection) -> int:
+    """
+    Make usernames unique under NOCASE so the case-insensitive unique index
+    can be built: the oldest account in each group keeps its name and the
+    others become `<username>_<id>`. Returns the number of renamed rows.
+    """
+    groups = conn.execute(
+        "SELECT username COLLATE NOCASE, MIN(id) FROM accounts "
+        "GROUP BY username COLLATE NOCASE HAVING COUNT(*) > 1"
+    ).fetchall()
+    renamed = []
+    for username, keep_id in groups:
+        rows = conn.execute(
+            "SELECT id, username FROM accounts WHERE username = ? COLLATE NOCASE AND id != ? ORDER BY id",
+            (username, keep_id),
+        ).fetchall()
+        for account_id, old_name in rows:
+            new_name = f"{old_name}_{account_id}"
+            while conn.execute("SELECT 1 FROM accounts WHERE username = ? COLLATE NOCASE", (new_name,)).fetchone():
+                new_name += "_"
+            conn.execute("UPDATE accounts SET username = ? WHERE id = ?", (new_name, account_id))
+            renamed.append(f"{old_name!r} -> {new_name!r} (id {account_id})")
+    if renamed:
+        log.warning(
+            f"⚠️ Renamed {len(renamed)} accounts whose username differed from an older one only by case: "
+            + ", ".join(renamed)
+        )
+    return len(renamed)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline schema", [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            discord_id TEXT PRIMARY KEY,
+            key TEXT,
+            hwid TEXT,
+            joined_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            last_login TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS keys (
+            key TEXT PRIMARY KEY,
+            created_by TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            used INTEGER DEFAULT 0,
+            used_by TEXT,
+            used_at TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS blacklist (
+            discord_id TEXT PRIMARY KEY,
+            reason TEXT,
+            banned_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS analytics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_type TEXT,
+            discord_id TEXT,
+            ip_address TEXT,
+            details TEXT,
+            timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS trials (
+            key TEXT PRIMARY KEY,
+            discord_id TEXT,
+            created_at TEXT,
+            expires_at TEXT,
+            ip_address TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS trial_sessions (
+            token TEXT PRIMARY KEY,
+            discord_id TEXT,
+            created_at TEXT,
+            expires_at TEXT,
+            step1_done INTEGER DEFAULT 0,
+            step2_done INTEGER DEFAULT 0,
+            step3_done INTEGER DEFAULT 0,
+            ip_address TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            discord_id TEXT UNIQUE NOT NULL,
+            email TEXT NOT NULL,
+            email_verified INTEGER DEFAULT 0,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (discord_id) REFERENCES users(discord_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS email_codes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            discord_id TEXT NOT NULL,
+            email TEXT NOT NULL,
+            code TEXT NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            expires_at TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_users_key ON users(key)",
+        "CREATE INDEX IF NOT EXISTS idx_keys_used ON keys(used)",
+        "CREATE INDEX IF NOT EXISTS idx_analytics_discord ON analytics(discord_id)",
+        "CREATE INDEX IF NOT EXISTS idx_analytics_event ON analytics(event_type)",
+        "CREATE INDEX IF NOT EXISTS idx_trials_discord ON trials(discord_id)",
+        "CREATE INDEX IF NOT EXISTS idx_trial_sessions_discord ON trial_sessions(discord_id)",
+        "CREATE INDEX IF NOT EXISTS idx_accounts_username ON accounts(username)",
+        "CREATE INDEX IF NOT EXISTS idx_accounts_discord ON accounts(discord_id)",
+        "CREATE INDEX IF NOT EXISTS idx_email_codes_discord ON email_codes(discord_id)",
+    ]),
+    Migration(2, "performance indexes", [
+        # Case-insensitive username lookups (username = ? COLLATE NOCASE)
+        rename_nocase_duplicate_usernames,
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_accounts_username_nocase ON accounts(username COLLATE NOCASE)",
+        "DROP INDEX IF EXISTS idx_accounts_username",
+        # Time-range predicates and ORDER BY clauses
+        "CREATE INDEX IF NOT EXISTS idx_trials_expires ON trials(expires_at)",
+        "CREATE INDEX IF NOT EXISTS idx_keys_created ON keys(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_users_joined ON users(joined_at)",
+        "CREATE INDEX IF NOT EXISTS idx_analytics_timestamp ON analytics(timestamp)",
+    ]),
+    # Defined below: needs the v3 table definitions
+]
+
+# ==============================================================================
+# 🗜️ v3: COMPACT TYPED SCHEMA
+# Discord snowflakes become INTEGER, timestamps become integer epoch seconds
+# and pure key-value tables drop their hidden rowid.
+# ==============================================================================
+
+_EPOCH_DEFAULT = "DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))"
+
+COMPACT_TABLES: Dict[str, str] = {
+    'users': f"""
+        CREATE TABLE users_v3 (
+            discord_id INTEGER PRIMARY KEY,
+            key TEXT,
+            hwid TEXT,
+            joined_at INTEGER {_EPOCH_DEFAULT},
+            last_login INTEGER
+        )
+    """,
+    'keys': f"""
+        CREATE TABLE keys_v3 (
+            key TEXT PRIMARY KEY,
+            created_by INTEGER,
+            created_at INTEGER {_EPOCH_DEFAULT},
+            used INTEGER NOT NULL DEFAULT 0,
+            used_by INTEGER,
+            used_at INTEGER
+        ) WITHOUT ROWID
+    """,
+    'blacklist': f"""
+        CREATE TABLE blacklist_v3 (
+            discord_id INTEGER PRIMARY KEY,
+            reason TEXT,
+            banned_at INTEGER {_EPOCH_DEFAULT}
+        ) WITHOUT ROWID
+    """,
+    'analytics': f"""
+        CREATE TABLE analytics_v3 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_type TEXT,
+            discord_id INTEGER,
+            ip_address TEXT,
+            details TEXT,
+            timestamp INTEGER {_EPOCH_DEFAULT}
+        )
+    """,
+    'trials': """
+        CREATE TABLE trials_v3 (
+            key TEXT PRIMARY KEY,
+            discord_id INTEGER,
+            created_at INTEGER,
+            expires_at INTEGER,
+            ip_address TEXT
+        ) WITHOUT ROWID
+    """,
+    'trial_sessions': """
+        CREATE TABLE trial_sessions_v3 (
+            token TEXT PRIMARY KEY,
+            discord_id INTEGER,
+            created_at INTEGER,
+            expires_at INTEGER,
+            step1_done INTEGER DEFAULT 0,
+            step2_done INTEGER DEFAULT 0,
+            step3_done INTEGER DEFAULT 0,
+            ip_address TEXT
+        ) WITHOUT ROWID
+    """,
+    'accounts': f"""
+        CREATE TABLE accounts_v3 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            discord_id INTEGER UNIQUE NOT NULL,
+            email TEXT NOT NULL,
+            email_verified INTEGER DEFAULT 0,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at INTEGER {_EPOCH_DEFAULT},
+            FOREIGN KEY (discord_id) REFERENCES users(discord_id)
+        )
+    """,
+    'email_codes': f"""
+        CREATE TABLE email_codes_v3 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            discord_id INTEGER NOT NULL,
+            email TEXT NOT NULL,
+            code TEXT NOT NULL,
+            created_at INTEGER {_EPOCH_DEFAULT},
+            expires_at INTEGER NOT NULL
+        )
+    """,
+}
+
+# Column -> SQL expression used when copying rows into the compact tables
+_SNOWFLAKE_COLUMNS = {'discord_id', 'created_by', 'used_by'}
+_EPOCH_COLUMNS = {'joined_at', 'last_login', 'created_at', 'used_at', 'banned_at', 'timestamp', 'expires_at'}
+
+COMPACT_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_users_key ON users(key)",
+    "CREATE INDEX IF NOT EXISTS idx_users_joined ON users(joined_at)",
+    "CREATE INDEX IF NOT EXISTS idx_keys_used ON keys(used)",
+    "CREATE INDEX IF NOT EXISTS idx_keys_created ON keys(created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_analytics_discord ON analytics(discord_id)",
+    "CREATE INDEX IF NOT EXISTS idx_analytics_event ON analytics(event_type)",
+    "CREATE INDEX IF NOT EXISTS idx_analytics_timestamp ON analytics(timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_trials_discord ON trials(discord_id)",
+    "CREATE INDEX IF NOT EXISTS idx_trials_expires ON trials(expires_at)",
+    "CREATE INDEX IF NOT EXISTS idx_trial_sessions_discord ON trial_sessions(discord_id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_accounts_username_nocase ON accounts(username COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS idx_accounts_discord ON accounts(discord_id)",
+    "CREATE INDEX IF NOT EXISTS idx_email_codes_discord ON email_codes(discord_id)",
+]
+
+
+def _legacy_snowflake(value):
+    """TEXT snowflake -> INTEGER; anything non-numeric is kept as-is."""
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return value
+
+
+def _legacy_epoch(value):
+    """ISO-8601 / CURRENT_TIMESTAMP text -> epoch seconds (naive = UTC); None if unparseable."""
+    if value is None or isinstance(value, int):
+        return value
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+# Tables whose snowflake column becomes a rowid alias, which only accepts integers
+_ROWID_SNOWFLAKES = {'users': 'discord_id'}
+
+
+def _quarantine_rows(conn: sqlite3.Connection, table: str, column: str) -> int:
+    """Move rows whose `column` can't become an integer into `<table>_quarantine`, untouched."""
+    bad = f"typeof(bh_snowflake({column})) != 'integer'"
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {table}_quarantine AS SELECT * FROM {table} WHERE 0")
+    conn.execute(f"INSERT INTO {table}_quarantine SELECT * FROM {table} WHERE {bad}")
+    moved = conn.execute(f"DELETE FROM {table} WHERE {bad}").rowcount
+    if moved:
+        ids = [row[0] for row in conn.execute(f"SELECT {column} FROM {table}_quarantine LIMIT 10")]
+        log.warning(
+            f"⚠️ Moved {moved} {table} rows with non-numeric {column} to {table}_quarantine "
+            f"(e.g. {ids}); review and re-add them by hand"
+        )
+    return moved
+
+
+def compact_typed_tables(conn: sqlite3.Connection) -> None:
+    """Rebuild every table with INTEGER ids/timestamps, converting rows in SQL."""
+    unparsed: Dict[str, int] = {}
+
+    def epoch(value, column):
+        converted = _legacy_epoch(value)
+        if converted is None and value is not None:
+            unparsed[column] = unparsed.get(column, 0) + 1
+        return converted
+
+    conn.create_function("bh_snowflake", 1, _legacy_snowflake, deterministic=True)
+    # Not deterministic: it counts unparsed values, so SQLite must call it per row
+    conn.create_function("bh_epoch", 2, epoch)
+
+    for table, create_sql in COMPACT_TABLES.items():
+        conn.execute(f"DROP TABLE IF EXISTS {table}_v3")
+        conn.execute(create_sql)
+        if table in _ROWID_SNOWFLAKES:
+            _quarantine_rows(conn, table, _ROWID_SNOWFLAKES[table])
+
+        columns = [c for c in _table_columns(conn, f"{table}_v3") if c in _table_columns(conn, table)]
+        select_exprs = []
+        for column in columns:
+            if column in _SNOWFLAKE_COLUMNS:
+                select_exprs.append(f"bh_snowflake({column})")
+            elif column in _EPOCH_COLUMNS:
+                select_exprs.append(f"bh_epoch({column}, '{table}.{column}')")
+            else:
+                select_exprs.append(column)
+
+        conn.execute(
+            f"INSERT INTO {table}_v3 ({', '.join(columns)}) "
+            f"SELECT {', '.join(select_exprs)} FROM {table}"
+        )
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {table}_v3 RENAME TO {table}")
+
+    rename_nocase_duplicate_usernames(conn)
+    for statement in COMPACT_INDEXES:
+        conn.execute(statement)
+
+    for column, count in sorted(unparsed.items()):
+        log.warning(f"⚠️ {count} unparseable timestamps in {column} were stored as NULL")
+
+
+MIGRATIONS.append(Migration(3, "compact typed schema", [compact_typed_tables]))
+MIGRATIONS.append(Migration(4, "expiry indexes", [
+    # Used by the background reaper's range deletes
+    "CREATE INDEX IF NOT EXISTS idx_trial_sessions_expires ON trial_sessions(expires_at)",
+    "CREATE INDEX IF NOT EXISTS idx_email_codes_expires ON email_codes(expires_at)",
+]))
+MIGRATIONS.append(Migration(5, "broadcast checkpoints", [
+    # One row per /broadcast; `cursor` is the highest discord_id fully processed
+    f"""
+    CREATE TABLE IF NOT EXISTS broadcasts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        author_id INTEGER NOT NULL,
+        message TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'running',
+        cursor INTEGER NOT NULL DEFAULT 0,
+        total INTEGER NOT NULL DEFAULT 0,
+        sent INTEGER NOT NULL DEFAULT 0,
+        failed INTEGER NOT NULL DEFAULT 0,
+        created_at INTEGER {_EPOCH_DEFAULT},
+        updated_at INTEGER,
+        finished_at INTEGER
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_broadcasts_status ON broadcasts(status)",
+]))
+MIGRATIONS.append(Migration(6, "legacy import progress", [
+    # legacy_import.py: entries of each JSON section already committed
+    """
+    CREATE TABLE IF NOT EXISTS import_progress (
+        source TEXT NOT NULL,
+        section TEXT NOT NULL,
+        position INTEGER NOT NULL DEFAULT 0,
+        source_size INTEGER,
+        source_mtime INTEGER,
+        updated_at INTEGER,
+        PRIMARY KEY (source, section)
+    ) WITHOUT ROWID
+    """,
+]))
+MIGRATIONS.append(Migration(7, "covering composite indexes", [
+    # One index per hot Database query, carrying every column it reads so the
+    # table b-tree is never touched; the single-column prefixes they replace
+    # only cost writes. query_plans.py checks the resulting plans.
+    # get_user_analytics: COUNT(*) WHERE discord_id = ? AND event_type = ?
+    "CREATE INDEX IF NOT EXISTS idx_analytics_user_event ON analytics(discord_id, event_type)",
+    "DROP INDEX IF EXISTS idx_analytics_discord",
+    # get_active_trial_by_user / create_trial: discord_id = ? AND expires_at > ?
+    # ORDER BY created_at DESC LIMIT 1 (the key rides along in WITHOUT ROWID indexes)
+    "CREATE INDEX IF NOT EXISTS idx_trials_user_created ON trials(discord_id, created_at, expires_at, ip_address)",
+    "DROP INDEX IF EXISTS idx_trials_discord",
+    # create_trial_session: 24h rate limit, discord_id = ? AND created_at > ?
+    "CREATE INDEX IF NOT EXISTS idx_trial_sessions_user_created ON trial_sessions(discord_id, created_at)",
+    "DROP INDEX IF EXISTS idx_trial_sessions_discord",
+    # get_all_keys(unused_only) and the available-keys count: used = 0 ORDER BY created_at DESC
+    "CREATE INDEX IF NOT EXISTS idx_keys_used_created ON keys(used, created_at)",
+    "DROP INDEX IF EXISTS idx_keys_used",
+    # get_blacklisted_users: ORDER BY banned_at DESC without a temp sort
+    "CREATE INDEX IF NOT EXISTS idx_blacklist_banned ON blacklist(banned_at)",
+    # verify_email_code / get_pending_email
+    "CREATE INDEX IF NOT EXISTS idx_email_codes_user_code ON email_codes(discord_id, code, expires_at, email)",
+    "DROP INDEX IF EXISTS idx_email_codes_discord",
+    # Duplicates the UNIQUE(discord_id) autoindex
+    "DROP INDEX IF EXISTS idx_accounts_discord",
+]))
+MIGRATIONS.append(Migration(8, "analytics full-text search", [
+    # External-content FTS5 index over analytics.details (bug reports, feedback,
+    # broadcast texts, admin notes); rows live only in analytics, the triggers
+    # keep the index in step and `rebuild` backfills existing events
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS analytics_fts USING fts5(
+        details,
+        content='analytics',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS analytics_fts_insert AFTER INSERT ON analytics BEGIN
+        INSERT INTO analytics_fts(rowid, details) VALUES (new.id, new.details);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS analytics_fts_delete AFTER DELETE ON analytics BEGIN
+        INSERT INTO analytics_fts(analytics_fts, rowid, details) VALUES ('delete', old.id, old.details);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS analytics_fts_update AFTER UPDATE OF details ON analytics BEGIN
+        INSERT INTO analytics_fts(analytics_fts, rowid, details) VALUES ('delete', old.id, old.details);
+        INSERT INTO analytics_fts(rowid, details) VALUES (new.id, new.details);
+    END
+    """,
+    "INSERT INTO analytics_fts(analytics_fts) VALUES ('rebuild')",
+    # Event-type filtered searches and "most recent" ordering
+    "CREATE INDEX IF NOT EXISTS idx_analytics_event_time ON analytics(event_type, timestamp)",
+]))
+MIGRATIONS.append(Migration(9, "trial abuse guard warm-up", [
+    # abuse_guard.py reloads recent trial starts per address after a restart;
+    # discord_id rides along so the warm-up never touches the table b-tree
+    "CREATE INDEX IF NOT EXISTS idx_trials_ip_created ON trials(ip_address, created_at, discord_id)",
+]))
+
+def add_broadcast_reasons(conn: sqlite3.Connection) -> None:
+    """ALTER TABLE has no IF NOT EXISTS for columns."""
+    if 'reasons' not in _table_columns(conn, 'broadcasts'):
+        conn.execute("ALTER TABLE broadcasts ADD COLUMN reasons TEXT")
+
+
+MIGRATIONS.append(Migration(10, "broadcast failure reasons", [
+    # JSON {reason: count} for the checkpointed part of a broadcast, so the
+    # final report after a resume still breaks failures down
+    add_broadcast_reasons,
+]))
+
+# ==============================================================================
+# 🚀 MIGRATION RUNNER
+# ==============================================================================
+
+def latest_version() -> int:
+    """Highest schema version known to this build."""
+    return max((m.version for m in MIGRATIONS), default=0)
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Read the schema version stored in the database header."""
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def pending_migrations(conn: sqlite3.Connection, target: Optional[int] = None) -> List[Migration]:
+    """Migrations newer than the database, in order, up to `target`."""
+    current = get_schema_version(conn)
+    target = latest_version() if target is None else target
+    return [
+        m for m in sorted(MIGRATIONS, key=lambda m: m.version)
+        if current < m.version <= target
+    ]
+
+
+def _apply_migration(conn: sqlite3.Connection, migration: Migration) -> List[Dict]:
+    """Apply one migration inside a single transaction. Returns per-step timings."""
+    timings: List[Dict] = []
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for step in migration.steps:
+            started = time.perf_counter()
+            if callable(step):
+                step(conn)
+            else:
+                conn.execute(step)
+            timings.append({
+                'step': migration.describe_step(step),
+                'ms': round((time.perf_counter() - started) * 1000, 2),
+            })
+        # user_version is part of the database header, so it commits atomically
+        conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return timings
+
+
+def run_migrations(
+    conn: sqlite3.Connection,
+    dry_run: bool = False,
+    target: Optional[int] = None
+) -> List[Dict]:
+    """
+    Bring the database schema up to date.
+
+    Args:
+        conn: Open SQLite connection
+        dry_run: Only report what would run, change nothing
+        target: Stop at this version instead of the latest
+
+    Returns:
+        One report dict per migration with its version, name, status and timings
+    """
+    current = get_schema_version(conn)
+    pending = pending_migrations(conn, target)
+    report: List[Dict] = []
+
+    if not pending:
+        log.info(f"✅ Schema up to date (v{current})")
+        return report
+
+    if dry_run:
+        for migration in pending:
+            log.info(f"📝 [DRY RUN] Would apply v{migration.version}: {migration.name}")
+            for step in migration.steps:
+                log.info(f"    {migration.describe_step(step)[:120]}")
+            report.append({
+                'version': migration.version,
+                'name': migration.name,
+                'status': 'pending',
+                'steps': [migration.describe_step(s) for s in migration.steps],
+            })
+        return report
+
+    # Explicit BEGIN/COMMIT: the sqlite3 module must not open transactions for us
+    previous_isolation = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        for migration in pending:
+            started = time.perf_counter()
+            try:
+                timings = _apply_migration(conn, migration)
+            except Exception as e:
+                log.error(f"❌ Migration v{migration.version} ({migration.name}) failed: {e}")
+                raise
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+            log.info(f"✅ Applied migration v{migration.version}: {migration.name} ({elapsed_ms}ms)")
+            report.append({
+                'version': migration.version,
+                'name': migration.name,
+                'status': 'applied',
+                'ms': elapsed_ms,
+                'steps': timings,
+            })
+    finally:
+        conn.isolation_level = previous_isolation
+
+    return report
+
+
+# ==============================================================================
+# 🖥️ COMMAND LINE
+# ==============================================================================
+
+def main() -> None:
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Apply Banana Hub schema migrations")
+    parser.add_argument("--db", default=Config.DB_FILE, help="Path to the SQLite database")
+    parser.add_argument("--dry-run", action="store_true", help="Show pending migrations without applying them")
+    parser.add_argument("--target", type=int, default=None, help="Migrate up to this version only")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    conn = sqlite3.connect(args.db, timeout=30.0)
+    try:
+        before = get_schema_version(conn)
+        report = run_migrations(conn, dry_run=args.dry_run, target=args.target)
+        after = get_schema_version(conn)
+    finally:
+        conn.close()
+
+    print(f"Schema version: v{before} -> v{after} (latest v{latest_version()})")
+    for entry in report:
+        timing = f" in {entry['ms']}ms" if 'ms' in entry else ""
+        print(f"  v{entry['version']} {entry['name']}: {entry['status']}{timing}")
+        for step in entry['steps']:
+            if isinstance(step, dict):
+                print(f"    {step['ms']:>9.2f}ms  {step['step'][:100]}")
+            else:
+                print(f"    {'':>11}  {step[:100]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - QUERY PLAN CHECKS
+# Calls every public Database method against a synthetic dataset, captures the
+# SQL it issues and runs EXPLAIN QUERY PLAN on each statement. Exits 1 when a
+# query falls back to a table scan (or a full index scan) that isn't
+# explicitly allowed, or when a Database method has no check
+#
+#   python query_plans.py
+#   python query_plans.py --users 20000 --output plans.json --verbose
+# ==============================================================================
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from db_bench import BenchContext
+from synthetic_data import SYNTHETIC_PASSWORD, generate, open_database
+
+# ==============================================================================
+# 🔧 LOGGING
+# ==============================================================================
+
+log = logging.getLogger("query_plans")
+
+# ==============================================================================
+# 📋 CHECKED CALLS
+# Run in order on one scratch database, so later calls can use what earlier
+# ones created (the trial session token, the fresh account, ...).
+# ==============================================================================
+
+class Call:
+    """One Database call; `label` distinguishes variants of the same method."""
+
+    def __init__(self, method: str, args: Callable[["PlanContext"], tuple],
+                 label: Optional[str] = None, keep: Optional[str] = None):
+        self.method = method
+        self.args = args
+        self.label = label or method
+        self.keep = keep
+
+
+class PlanContext(BenchContext):
+    """BenchContext samples plus values kept from earlier calls."""
+
+    def __init__(self, db: Any, seed: int):
+        super().__init__(db, seed)
+        self.kept: Dict[str, Any] = {}
+        self.ids = [self.next_id() for _ in range(8)]
+
+    def user(self, index: int = 0) -> int:
+        return self.users[index % len(self.users)][0]
+
+    def unused_key(self, index: int) -> str:
+        return self.unused_keys[index % len(self.unused_keys)]
+
+
+CALLS: List[Call] = [
+    Call("get_user", lambda c: (c.user(),)),
+    Call("register_user", lambda c: (c.ids[0], "BANANA-PLN-CHK-001")),
+    Call("update_last_login", lambda c: (c.user(), "10.0.0.1")),
+    Call("reset_hwid", lambda c: (c.user(),)),
+    Call("unwhitelist", lambda c: (c.ids[0],)),
+    Call("generate_key_entry", lambda c: ("BANANA-PLN-CHK-002", c.ids[0])),
+    Call("mint_keys", lambda c: (5, c.ids[0])),
+    Call("check_key_available", lambda c: (c.unused_key(0),)),
+    Call("mark_key_redeemed", lambda c: (c.unused_key(1), c.ids[1])),
+    Call("redeem_key", lambda c: (c.ids[2], c.unused_key(2))),
+    Call("get_trial_by_key", lambda c: (c.trial_keys[0],)),
+    Call("get_active_trial_by_user", lambda c: (c.user(),)),
+    Call("create_trial", lambda c: (c.ids[3], "10.0.0.3")),
+    Call("create_trial_session", lambda c: (c.ids[4], "10.0.0.4"), keep="token"),
+    Call("get_trial_session", lambda c: (c.kept['token'],)),
+    Call("update_trial_step", lambda c: (c.kept['token'], 1, "10.0.0.4")),
+    Call("mark_trial_step1", lambda c: (c.kept['token'],)),
+    Call("mark_trial_step2", lambda c: (c.kept['token'],)),
+    Call("mark_trial_step3", lambda c: (c.kept['token'],)),
+    Call("generate_trial_key", lambda c: (c.kept['token'],)),
+    Call("delete_trial_session", lambda c: (c.kept['token'],)),
+    Call("get_recent_trial_starts", lambda c: (int(time.time()) - 86400,)),
+    Call("is_blacklisted", lambda c: (c.banned[0] if c.banned else c.user(),)),
+    Call("toggle_blacklist", lambda c: (c.ids[5], "plan check"), label="toggle_blacklist[add]"),
+    Call("toggle_blacklist", lambda c: (c.ids[5],), label="toggle_blacklist[remove]"),
+    Call("unblacklist", lambda c: (c.banned[-1] if c.banned else c.ids[5],)),
+    Call("log_event", lambda c: ("login", str(c.user()), "10.0.0.1", "plan check")),
+    Call("get_stats", lambda c: ()),
+    Call("get_user_analytics", lambda c: (c.user(),)),
+    Call("search_analytics", lambda c: ("backup",), label="search_analytics[rank]"),
+    Call("search_analytics", lambda c: ("reset", ["hwid_reset"], 0, 2 ** 31, 10, "recent"),
+         label="search_analytics[filtered]"),
+    Call("get_all_users", lambda c: ()),
+    Call("get_users_page", lambda c: (10,), label="get_users_page[first]", keep="cursor"),
+    Call("get_users_page", lambda c: (10, c.kept['cursor']['next_cursor']), label="get_users_page[next]"),
+    Call("get_users_page", lambda c: (10, f"-:{c.user()}"), label="get_users_page[undated]"),
+    Call("get_users_page", lambda c: (10, None, 50), label="get_users_page[jump]"),
+    Call("get_users_page", lambda c: (10, None, 10 ** 7), label="get_users_page[jump-past-end]"),
+    Call("count_users", lambda c: ()),
+    Call("get_licensed_ids", lambda c: (), label="get_licensed_ids[sweep]"),
+    Call("get_licensed_ids", lambda c: ([u for u, _ in c.users[:50]],), label="get_licensed_ids[ids]"),
+    Call("get_all_keys", lambda c: ()),
+    Call("get_all_keys", lambda c: (True,), label="get_all_keys[unused]"),
+    Call("get_blacklisted_users", lambda c: ()),
+    Call("check_username_available", lambda c: (c.usernames[0],)),
+    Call("create_account", lambda c: (c.ids[6], "plan6@example.com", "planchk6", SYNTHETIC_PASSWORD)),
+    Call("get_account_by_username", lambda c: (c.usernames[0],)),
+    Call("get_account_by_discord", lambda c: (c.ids[6],)),
+    Call("store_email_code", lambda c: (c.ids[6], "plan6@example.com", "123456")),
+    Call("get_pending_email", lambda c: (c.ids[6],)),
+    Call("verify_email_code", lambda c: (c.ids[6], "123456")),
+    Call("redeem_web_license", lambda c: (c.unused_key(3), str(c.ids[7]), "planchk7", SYNTHETIC_PASSWORD,
+                                          "plan7@example.com")),
+    Call("check_key_status", lambda c: (c.unused_key(4),), label="check_key_status[license]"),
+    Call("check_key_status", lambda c: (c.trial_keys[1],), label="check_key_status[trial]"),
+]
+
+# Methods that issue no query worth planning
+NOT_PLANNED: Set[str] = {'get_connection', 'hash_password', 'verify_password', 'create_backup', 'vacuum'}
+
+# Calls that read a whole table or index by design (admin listings, totals)
+FULL_SCAN_ALLOWED: Set[str] = {
+    'get_all_users',
+    'get_all_keys',
+    'get_blacklisted_users',
+    'get_stats',
+    'count_users',
+    'get_licensed_ids[sweep]',
+}
+
+# ==============================================================================
+# 🔍 PLAN ANALYSIS
+# ==============================================================================
+
+# Trigger bodies are traced as "-- <statement>" comments
+_SKIPPED_STATEMENT = re.compile(r"^\s*(--|(PRAGMA|BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE|VACUUM|ANALYZE)\b)", re.I)
+# FTS5 reads and writes its own shadow tables; those plans aren't ours to tune
+_FTS_SHADOW = re.compile(r"_fts_(config|data|idx|docsize|content)\b")
+# SQLite < 3.36 prints "SCAN TABLE x"; subqueries and VALUES rows aren't tables
+_TABLE_SCAN = re.compile(r"^SCAN (?:TABLE )?(?!\(|CONSTANT ROW)(\S+)(?: AS \S+)?$")
+_INDEX_SCAN = re.compile(r"^SCAN (?:TABLE )?(\S+)(?: AS \S+)? USING (?:COVERING )?INDEX (\S+)")
+_TEMP_SORT = re.compile(r"^USE TEMP B-TREE FOR")
+
+
+def classify(detail: str) -> Optional[str]:
+    """`table_scan`, `index_scan`, `temp_sort` or None for one plan line."""
+    if _TABLE_SCAN.match(detail):
+        return 'table_scan'
+    if _INDEX_SCAN.match(detail):
+        return 'index_scan'
+    if _TEMP_SORT.match(detail):
+        return 'temp_sort'
+    return None
+
+
+def explain(conn: sqlite3.Connection, sql: str) -> List[str]:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+
+
+def check_statement(label: str, plan: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    (problems, warnings) for one plan. Scans are problems unless the call is
+    in FULL_SCAN_ALLOWED. Temp sorts are only warnings: after an equality
+    SEARCH the planner may prefer sorting the handful of matching rows.
+    """
+    problems: List[str] = []
+    warnings: List[str] = []
+    for detail in plan:
+        kind = classify(detail)
+        if kind == 'temp_sort':
+            warnings.append(f"{kind}: {detail}")
+        elif kind and label not in FULL_SCAN_ALLOWED:
+            problems.append(f"{kind}: {detail}")
+    return problems, warnings
+
+# ==============================================================================
+# 🎬 CAPTURE
+# ==============================================================================
+
+def capture(db: Any, ctx: PlanContext) -> List[Tuple[str, str]]:
+    """Run CALLS, returning (label, expanded SQL) for every statement issued."""
+    captured: List[Tuple[str, str]] = []
+    current = ['-']
+    original = db.get_connection
+
+    def traced_connection() -> sqlite3.Connection:
+        conn = original()
+        conn.set_trace_callback(lambda sql: captured.append((current[0], sql)))
+        return conn
+
+    db.get_connection = traced_connection
+    try:
+        for call in CALLS:
+            current[0] = call.label
+            result = getattr(db, call.method)(*call.args(ctx))
+            if call.keep:
+                ctx.kept[call.keep] = result
+    finally:
+        db.get_connection = original
+    return captured
+
+
+def unchecked_methods(database_cls: type) -> List[str]:
+    """Public Database methods neither in CALLS nor NOT_PLANNED."""
+    public = {name for name, value in vars(database_cls).items() if not name.startswith('_') and callable(value)}
+    return sorted(public - NOT_PLANNED - {call.method for call in CALLS})
+
+
+def check_plans(path: str, captured: List[Tuple[str, str]], with_stats: bool) -> List[Dict[str, Any]]:
+    """EXPLAIN each distinct statement, with or without the ANALYZE statistics."""
+    # Imported here: sql_trace loads config, which must see the scratch DB_FILE
+    from sql_trace import redact_sql
+    conn = sqlite3.connect(path)
+    try:
+        if not with_stats:
+            # Fresh databases are never analyzed; plans must hold up without sqlite_stat1
+            conn.execute("DROP TABLE IF EXISTS sqlite_stat1")
+            conn.execute("DROP TABLE IF EXISTS sqlite_stat4")
+            conn.commit()
+            conn.close()
+            conn = sqlite3.connect(path)
+
+        rows: List[Dict[str, Any]] = []
+        seen: Set[Tuple[str, str]] = set()
+        for label, sql in captured:
+            if _SKIPPED_STATEMENT.match(sql) or _FTS_SHADOW.search(sql):
+                continue
+            statement = redact_sql(sql)
+            if (label, statement) in seen:
+                continue
+            seen.add((label, statement))
+            plan = explain(conn, sql)
+            problems, warnings = check_statement(label, plan)
+            rows.append({
+                'call': label,
+                'sql': statement,
+                'plan': plan,
+                'problems': problems,
+                'warnings': warnings,
+                'ok': not problems,
+            })
+        return rows
+    finally:
+        conn.close()
+
+# ==============================================================================
+# 🖥️ CLI
+# ==============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN every Database query and fail on table scans")
+    parser.add_argument("--users", type=int, default=2000, help="Synthetic users to plan against")
+    parser.add_argument("--seed", type=int, default=1337, help="Dataset and sampling seed")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--verbose", action="store_true", help="Log every plan, not just failures")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    with tempfile.TemporaryDirectory(prefix="banana_plans_") as workdir:
+        # database.py opens Config.DB_FILE on import; keep that off the real data/
+        os.environ["DB_FILE"] = os.path.join(workdir, "import.db")
+        from database import Database
+        for name in ("database", "sql_trace", "synthetic_data", "migrations"):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+        path = os.path.join(workdir, "plans.db")
+        conn = open_database(path)
+        try:
+            generate(conn, users=args.users, analytics=args.users * 10, seed=args.seed)
+        finally:
+            conn.close()
+
+        db = Database(path)
+        captured = capture(db, PlanContext(db, args.seed))
+        missing = unchecked_methods(Database)
+
+        report: Dict[str, Any] = {
+            'sqlite': sqlite3.sqlite_version,
+            'users': args.users,
+            'unchecked_methods': missing,
+            'analyzed': check_plans(path, captured, with_stats=True),
+        }
+        report['unanalyzed'] = check_plans(path, captured, with_stats=False)
+
+    failures = 0
+    for mode in ('analyzed', 'unanalyzed'):
+        for row in report[mode]:
+            if not row['ok']:
+                failures += 1
+                log.error(f"❌ [{mode}] {row['call']}: {row['sql']}")
+                for problem in row['problems']:
+                    log.error(f"      {problem}")
+            elif row['warnings']:
+                log.warning(f"⚠️ [{mode}] {row['call']}: {' | '.join(row['plan'])}")
+            elif args.verbose:
+                log.info(f"✅ [{mode}] {row['call']}: {' | '.join(row['plan']) or '-'}")
+    for method in missing:
+        log.error(f"❌ Database.{method} has no entry in query_plans.CALLS")
+
+    checked = len(report['analyzed'])
+    log.info(f"📐 {checked} statements from {len({c.label for c in CALLS})} calls, "
+             f"{failures} plan regressions, {len(missing)} unchecked methods")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+    return 1 if failures or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
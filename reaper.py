@@ -0,0 +1,201 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - EXPIRY REAPER
+# Background job that deletes expired trials, trial sessions and email codes
+# in small batched transactions, off the request path
+# ==============================================================================
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from database import Database, db
+from metrics import metrics, REAPER_DELETED
+
+# ==============================================================================
+# 🔧 LOGGING
+# ==============================================================================
+
+log = logging.getLogger("reaper")
+
+# ==============================================================================
+# 🎯 REAP TARGETS
+# ==============================================================================
+
+class ReapTarget:
+    """A table whose rows expire on an indexed epoch column."""
+
+    def __init__(self, table: str, pk: str, grace_seconds: int = 0):
+        self.table = table
+        self.pk = pk
+        self.grace_seconds = grace_seconds
+
+    @property
+    def delete_sql(self) -> str:
+        # Batch through the expires_at index; pk IN (...) keeps it valid for
+        # WITHOUT ROWID tables where DELETE ... LIMIT isn't available.
+        return (
+            f"DELETE FROM {self.table} WHERE {self.pk} IN ("
+            f"SELECT {self.pk} FROM {self.table} WHERE expires_at <= ? LIMIT ?)"
+        )
+
+
+def default_targets() -> List[ReapTarget]:
+    return [
+        # create_trial_session's 24h per-user limit looks for sessions created in
+        # the last day; deleting them at their 30-minute expiry would reopen it
+        ReapTarget("trial_sessions", "token", grace_seconds=Config.TRIAL_SESSION_RETENTION_HOURS * 3600),
+        ReapTarget("email_codes", "id"),
+        # Expired trials linger briefly so /api/verify can still say "Trial expired"
+        ReapTarget("trials", "key", grace_seconds=Config.TRIAL_RETENTION_HOURS * 3600),
+    ]
+
+# ==============================================================================
+# 🧹 REAPER
+# ==============================================================================
+
+class ExpiryReaper:
+    """
+    Periodically deletes expired rows.
+
+    Each batch is its own short transaction so the writer lock is never held
+    for long, and a short pause between batches lets request writes through.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        interval: int = Config.REAPER_INTERVAL,
+        batch_size: int = Config.REAPER_BATCH_SIZE,
+        targets: Optional[List[ReapTarget]] = None,
+        batch_pause: float = 0.05,
+    ):
+        self.database = database
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self.targets = targets if targets is not None else default_targets()
+        self.batch_pause = batch_pause
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.totals: Dict[str, int] = {t.table: 0 for t in self.targets}
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    # ==========================================================================
+    # ⚙️ SWEEPING
+    # ==========================================================================
+
+    def _reap_target(self, target: ReapTarget, now: int) -> Dict[str, Any]:
+        cutoff = now - target.grace_seconds
+        deleted = 0
+        batches = 0
+        started = time.perf_counter()
+
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self.database.get_connection()
+                cur = conn.execute(target.delete_sql, (cutoff, self.batch_size))
+                conn.commit()
+                removed = cur.rowcount
+            finally:
+                if conn:
+                    conn.close()
+
+            deleted += removed
+            batches += 1
+            if removed < self.batch_size:
+                break
+            time.sleep(self.batch_pause)
+
+        return {
+            'deleted': deleted,
+            'batches': batches,
+            'ms': round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def run_once(self) -> Dict[str, Any]:
+        """Sweep every target once and return this run's metrics."""
+        now = int(time.time())
+        started = time.perf_counter()
+        tables: Dict[str, Any] = {}
+
+        for target in self.targets:
+            try:
+                tables[target.table] = self._reap_target(target, now)
+            except Exception as e:
+                log.error(f"Reaper failed on {target.table}: {e}")
+                tables[target.table] = {'deleted': 0, 'batches': 0, 'error': str(e)}
+
+        result = {
+            'started_at': now,
+            'ms': round((time.perf_counter() - started) * 1000, 2),
+            'deleted': sum(t['deleted'] for t in tables.values()),
+            'tables': tables,
+        }
+
+        with self._lock:
+            self.runs += 1
+            for table, table_metrics in tables.items():
+                self.totals[table] = self.totals.get(table, 0) + table_metrics['deleted']
+            self.last_run = result
+
+        for table, table_metrics in tables.items():
+            metrics.inc(REAPER_DELETED, table_metrics['deleted'], table=table)
+
+        if result['deleted']:
+            summary = ", ".join(f"{t}={m['deleted']}" for t, m in tables.items() if m['deleted'])
+            log.info(f"🧹 Reaped {result['deleted']} expired rows ({summary}) in {result['ms']}ms")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'running': self.is_running(),
+                'interval': self.interval,
+                'batch_size': self.batch_size,
+                'runs': self.runs,
+                'totals': dict(self.totals),
+                'last_run': self.last_run,
+            }
+
+    # ==========================================================================
+    # 🧵 THREAD LIFECYCLE
+    # ==========================================================================
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                log.error(f"Reaper run failed: {e}")
+            self._stop.wait(self.interval)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Start the background thread (no-op if disabled or already running)."""
+        if self.interval <= 0 or self.is_running():
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="ExpiryReaper")
+        self._thread.start()
+        log.info(f"✅ Expiry reaper started (every {self.interval}s, batch {self.batch_size})")
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+# ==============================================================================
+# 🌍 GLOBAL REAPER INSTANCE
+# ==============================================================================
+
+reaper = ExpiryReaper(db)
@@ -0,0 +1,204 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - REQUEST TRACING
+# Per-request timing spans (db, discord, hash, render) rendered as a
+# Server-Timing header, plus a ring buffer of slow requests
+# ==============================================================================
+
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar, Token
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from config import Config
+
+# ==============================================================================
+# ⏱️ SPANS
+# ==============================================================================
+
+class RequestTrace:
+    """
+    Spans recorded during one request.
+
+    Durations are *exclusive*: time spent in a nested span (e.g. bcrypt
+    inside create_account) is charged to the inner span only, so the
+    per-category totals never add up to more than the request itself.
+    """
+
+    __slots__ = ("method", "path", "started", "spans", "totals", "_stack", "max_spans")
+
+    def __init__(self, method: str, path: str, max_spans: int = 200):
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.spans: List[tuple] = []
+        self.totals: Dict[str, List[float]] = {}
+        self._stack: List[List[float]] = []
+        self.max_spans = max_spans
+
+    def _enter(self) -> List[float]:
+        frame = [time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        return frame
+
+    def _exit(self, frame: List[float], category: str, label: str) -> None:
+        elapsed = time.perf_counter() - frame[0]
+        self._stack.pop()
+        if self._stack:
+            self._stack[-1][1] += elapsed
+        exclusive = elapsed - frame[1]
+
+        total = self.totals.get(category)
+        if total is None:
+            total = self.totals[category] = [0.0, 0]
+        total[0] += exclusive
+        total[1] += 1
+        if len(self.spans) < self.max_spans:
+            self.spans.append((category, label, frame[0] - self.started, exclusive))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        """Format totals per category for the Server-Timing header."""
+        parts = [
+            f'{category};dur={seconds * 1000:.2f};desc="{count} call{"s" if count != 1 else ""}"'
+            for category, (seconds, count) in self.totals.items()
+        ]
+        parts.append(f"total;dur={(self.elapsed() if total is None else total) * 1000:.2f}")
+        return ", ".join(parts)
+
+    def to_dict(self, total: float, status: int) -> Dict[str, Any]:
+        return {
+            'at': int(time.time()),
+            'method': self.method,
+            'path': self.path,
+            'status': status,
+            'total_ms': round(total * 1000, 3),
+            'breakdown': {
+                category: {'ms': round(seconds * 1000, 3), 'count': count}
+                for category, (seconds, count) in self.totals.items()
+            },
+            'spans': [
+                {
+                    'category': category,
+                    'name': label,
+                    'start_ms': round(start * 1000, 3),
+                    'ms': round(seconds * 1000, 3),
+                }
+                for category, label, start, seconds in self.spans
+            ],
+        }
+
+
+_current: ContextVar[Optional[RequestTrace]] = ContextVar("banana_request_trace", default=None)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current.get()
+
+
+def begin_trace(method: str, path: str) -> Token:
+    return _current.set(RequestTrace(method, path))
+
+
+def end_trace(token: Token) -> None:
+    try:
+        _current.reset(token)
+    except ValueError:
+        _current.set(None)
+
+
+@contextmanager
+def span(category: str, label: str = "") -> Iterator[None]:
+    """Time a block against the current request; a no-op outside one."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    frame = trace._enter()
+    try:
+        yield
+    finally:
+        trace._exit(frame, category, label or category)
+
+
+def traced(category: str, label: Optional[str] = None) -> Callable:
+    """Decorator form of `span`; the label defaults to the function name."""
+    def decorator(func: Callable) -> Callable:
+        name = label or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            frame = trace._enter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                trace._exit(frame, category, name)
+        wrapper.__spanned__ = True
+        return wrapper
+    return decorator
+
+
+def instrument(cls: type, category: str, overrides: Optional[Dict[str, str]] = None) -> type:
+    """Wrap every public method of `cls` in a span; `overrides` maps method -> category."""
+    overrides = overrides or {}
+    for attr, func in list(vars(cls).items()):
+        if attr.startswith("_") or not callable(func) or getattr(func, "__spanned__", False):
+            continue
+        setattr(cls, attr, traced(overrides.get(attr, category), attr)(func))
+    return cls
+
+# ==============================================================================
+# 🐢 SLOW REQUEST LOG
+# ==============================================================================
+
+class SlowRequestLog:
+    """Ring buffer of the most recent requests slower than `threshold_ms`."""
+
+    def __init__(
+        self,
+        threshold_ms: float = Config.SLOW_REQUEST_MS,
+        capacity: int = Config.SLOW_REQUEST_BUFFER,
+    ):
+        self.threshold_ms = threshold_ms
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.sampled = 0
+
+    def offer(self, trace: RequestTrace, total: float, status: int) -> bool:
+        if total * 1000 < self.threshold_ms:
+            return False
+        entry = trace.to_dict(total, status)
+        with self._lock:
+            self._entries.append(entry)
+            self.sampled += 1
+        return True
+
+    def slowest(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = list(self._entries)
+        entries.sort(key=lambda e: e['total_ms'], reverse=True)
+        return entries[:limit]
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._entries)[-limit:][::-1]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.sampled = 0
+
+# ==============================================================================
+# 🌍 GLOBAL LOG
+# ==============================================================================
+
+slow_requests = SlowRequestLog()
@@ -0,0 +1,220 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - PREMIUM ROLE RECONCILER
+# Keeps the "Premium User" role in every guild equal to the set of licensed,
+# non-blacklisted users in SQLite: a periodic full diff plus incremental
+# checks from member events, applied through one rate-limited queue
+# ==============================================================================
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import discord
+
+from config import Config
+from database import Database
+from broadcast import TokenBucket
+from metrics import metrics, ROLE_SYNC_CHANGES
+
+# ==============================================================================
+# 🔧 LOGGING
+# ==============================================================================
+
+log = logging.getLogger("role_sync")
+
+# ==============================================================================
+# 🔄 RECONCILER
+# ==============================================================================
+
+class RoleReconciler:
+    """
+    Desired state comes from `Database.get_licensed_ids`; actual state from
+    the member cache (the bot runs with the members intent).
+
+    Changes go into `pending`, keyed by (guild, user), so repeated triggers
+    for the same member collapse into one entry whose latest decision wins.
+    The worker re-checks the member right before calling the API, so a
+    change that already happened (or got undone) costs nothing.
+    """
+
+    def __init__(
+        self,
+        bot: discord.Client,
+        database: Database,
+        role_name: str = Config.PREMIUM_ROLE_NAME,
+        interval: int = Config.ROLE_SYNC_INTERVAL,
+        rate: float = Config.ROLE_SYNC_RATE,
+    ):
+        self.bot = bot
+        self.database = database
+        self.role_name = role_name
+        self.interval = interval
+        self.bucket = TokenBucket(rate, burst=1)
+        self.pending: Dict[Tuple[int, int], bool] = {}
+        self._wake = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self.totals: Dict[str, int] = {'added': 0, 'removed': 0, 'skipped': 0, 'failed': 0}
+        self.sweeps = 0
+        self.last_sweep: Optional[Dict[str, Any]] = None
+
+    # ========== DIFFING ==========
+
+    def role_for(self, guild: discord.Guild) -> Optional[discord.Role]:
+        return discord.utils.get(guild.roles, name=self.role_name)
+
+    @staticmethod
+    def plan(guild: discord.Guild, role: discord.Role, licensed: Set[int]) -> Tuple[Set[int], Set[int]]:
+        """Minimal (to_add, to_remove) member IDs for one guild."""
+        holders = {m.id for m in role.members if not m.bot}
+        present = {m.id for m in guild.members if not m.bot}
+        return (licensed & present) - holders, holders - licensed
+
+    async def sweep(self) -> Dict[str, Any]:
+        """
+        Diff every guild against the database and queue the differences.
+        Raises RuntimeError (queueing nothing) if the database can't answer.
+        """
+        started = time.perf_counter()
+        licensed = await asyncio.to_thread(self.database.get_licensed_ids)
+        if licensed is None:
+            raise RuntimeError("licensed users unavailable, sweep skipped")
+        guilds: Dict[str, Dict[str, int]] = {}
+
+        for guild in list(self.bot.guilds):
+            role = self.role_for(guild)
+            if role is None:
+                continue
+            if not guild.chunked:
+                await guild.chunk()
+            to_add, to_remove = self.plan(guild, role, licensed)
+            for user_id in to_add:
+                self.enqueue(guild.id, user_id, True)
+            for user_id in to_remove:
+                self.enqueue(guild.id, user_id, False)
+            guilds[str(guild.id)] = {'add': len(to_add), 'remove': len(to_remove), 'holders': len(role.members)}
+
+        result = {
+            'at': int(time.time()),
+            'ms': round((time.perf_counter() - started) * 1000, 2),
+            'licensed': len(licensed),
+            'queued_add': sum(g['add'] for g in guilds.values()),
+            'queued_remove': sum(g['remove'] for g in guilds.values()),
+            'guilds': guilds,
+        }
+        self.sweeps += 1
+        self.last_sweep = result
+        log.info(
+            f"🔄 Role sweep: {result['licensed']} licensed, queued +{result['queued_add']} "
+            f"-{result['queued_remove']} across {len(guilds)} guilds in {result['ms']}ms"
+        )
+        return result
+
+    async def check_users(self, discord_ids: Iterable[int | str]) -> None:
+        """Re-evaluate specific users in every guild (after a license change)."""
+        ids = [int(d) for d in discord_ids]
+        licensed = await asyncio.to_thread(self.database.get_licensed_ids, ids)
+        if licensed is None:
+            log.warning(f"Skipped role check for {len(ids)} users: licensed users unavailable")
+            return
+        for guild in self.bot.guilds:
+            role = self.role_for(guild)
+            if role is None:
+                continue
+            for user_id in ids:
+                member = guild.get_member(user_id)
+                if member is not None:
+                    self._check(member, role, user_id in licensed)
+
+    async def check_member(self, member: discord.Member) -> None:
+        """Re-evaluate one member in one guild (join, role edits)."""
+        if member.bot:
+            return
+        role = self.role_for(member.guild)
+        if role is None:
+            return
+        licensed = await asyncio.to_thread(self.database.get_licensed_ids, [member.id])
+        if licensed is None:
+            log.warning(f"Skipped role check for {member.id}: licensed users unavailable")
+            return
+        self._check(member, role, member.id in licensed)
+
+    def _check(self, member: discord.Member, role: discord.Role, licensed: bool) -> None:
+        if (member.get_role(role.id) is not None) != licensed:
+            self.enqueue(member.guild.id, member.id, licensed)
+
+    # ========== APPLYING ==========
+
+    def enqueue(self, guild_id: int, user_id: int, grant: bool) -> None:
+        self.pending[(guild_id, user_id)] = grant
+        self._wake.set()
+
+    async def _apply(self, guild_id: int, user_id: int, grant: bool) -> str:
+        guild = self.bot.get_guild(guild_id)
+        role = self.role_for(guild) if guild else None
+        member = guild.get_member(user_id) if guild else None
+        if role is None or member is None or (member.get_role(role.id) is not None) == grant:
+            return 'skipped'
+
+        await self.bucket.acquire()
+        try:
+            if grant:
+                await member.add_roles(role, reason="Banana Hub license sync")
+            else:
+                await member.remove_roles(role, reason="Banana Hub license sync")
+            return 'added' if grant else 'removed'
+        except discord.HTTPException as e:
+            log.warning(f"Could not {'add' if grant else 'remove'} {role.name} for {user_id} in {guild.name}: {e}")
+            return 'failed'
+
+    async def _worker(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while self.pending:
+                key = next(iter(self.pending))
+                grant = self.pending.pop(key)
+                try:
+                    outcome = await self._apply(key[0], key[1], grant)
+                except Exception as e:
+                    log.error(f"Role sync failed for {key}: {e}", exc_info=True)
+                    outcome = 'failed'
+                self.totals[outcome] += 1
+                metrics.inc(ROLE_SYNC_CHANGES, action='add' if grant else 'remove', outcome=outcome)
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                log.error(f"Role sweep failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    # ========== LIFECYCLE ==========
+
+    def start(self) -> bool:
+        """Start the worker and the periodic sweep (no-op if already running)."""
+        if self._tasks:
+            return False
+        self._tasks.append(asyncio.create_task(self._worker()))
+        if self.interval > 0:
+            self._tasks.append(asyncio.create_task(self._sweep_loop()))
+        log.info(f"✅ Role sync started for '{self.role_name}' (sweep every {self.interval}s)")
+        return True
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': bool(self._tasks),
+            'pending': len(self.pending),
+            'sweeps': self.sweeps,
+            'totals': dict(self.totals),
+            'last_sweep': self.last_sweep,
+        }
@@ -0,0 +1,328 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - SQL TRACING
+# Per-statement timing via sqlite3's set_trace_callback, attributed to the
+# Database method that issued it, with a redacted slow-query log. Off by
+# default; SQL_TRACE_SAMPLE traces a fraction of Database calls
+# ==============================================================================
+
+from __future__ import annotations
+
+import functools
+import logging
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from config import Config
+
+# ==============================================================================
+# 🔧 LOGGING
+# ==============================================================================
+
+log = logging.getLogger("sql_trace")
+
+# ==============================================================================
+# 🕶️ REDACTION
+# sqlite3 hands the trace callback the *expanded* SQL, i.e. with bound
+# parameters inlined. Aggregates are keyed on the SQL as written (captured by
+# TracedCursor, placeholders intact), so the regexes below only run for the
+# slow log, for reports, and for statements issued outside TracedCursor.
+# ==============================================================================
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_BLOB_LITERAL = re.compile(r"\b[xX]\?")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def redact_sql(sql: str) -> str:
+    """Strip literal values and normalize whitespace."""
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _BLOB_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?, ...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+# ==============================================================================
+# 🔗 CONNECTION CLASSES
+# ==============================================================================
+
+# SQL text (as written) of the statement this thread is executing, and
+# whether the trace callback has seen its first step yet
+_statement = threading.local()
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Records the un-expanded SQL so the trace callback needn't redact it."""
+
+    def execute(self, sql, parameters=()):
+        _statement.sql, _statement.fresh = sql, True
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        _statement.sql, _statement.fresh = sql, True
+        return super().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        _statement.sql = None
+        return super().executescript(sql_script)
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors (including implicit ones) are TracedCursors."""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def commit(self):
+        _statement.sql, _statement.fresh = "COMMIT", True
+        return super().commit()
+
+    def rollback(self):
+        _statement.sql, _statement.fresh = "ROLLBACK", True
+        return super().rollback()
+
+# ==============================================================================
+# 📊 AGGREGATES
+# ==============================================================================
+
+class StatementStats:
+    """Count / total / max plus a bounded sample window for percentiles."""
+
+    __slots__ = ("count", "timed", "total", "max", "samples")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.timed = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: Optional[float]) -> None:
+        self.count += 1
+        if seconds is None:
+            return
+        self.timed += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'total_ms': round(self.total * 1000, 3),
+            'avg_ms': round(self.total / self.timed * 1000, 3) if self.timed else 0.0,
+            'p95_ms': round(self.percentile(0.95) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+# ==============================================================================
+# 🔍 QUERY TRACER
+# ==============================================================================
+
+class QueryTracer:
+    """
+    Attributes every SQL statement to the innermost traced Database method.
+
+    The trace callback only fires when a statement starts, so a statement is
+    timed until the next statement on the same thread or until its method
+    returns. This includes row fetching, which is usually what you want when
+    hunting for slow calls. Statements issued outside a traced method are
+    counted but not timed.
+
+    One execute() counts once: executemany rows, trigger bodies and FTS
+    bookkeeping that SQLite runs on its behalf extend its timing instead of
+    each being recorded (and locked) separately.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = Config.SQL_TRACE,
+        slow_ms: float = Config.SLOW_QUERY_MS,
+        window: int = 512,
+        sample: float = Config.SQL_TRACE_SAMPLE,
+    ):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.window = window
+        self.sample = sample
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._statements: Dict[tuple, StatementStats] = {}
+        self._methods: Dict[str, StatementStats] = {}
+        self.slow_log: Deque[Dict[str, Any]] = deque(maxlen=200)
+
+    # ==========================================================================
+    # 🧵 PER-THREAD STATE
+    # ==========================================================================
+
+    def _state(self) -> Any:
+        state = self._local
+        if not hasattr(state, "stack"):
+            state.stack = []
+            state.pending = None
+            state.muted = 0
+        return state
+
+    def _finish_pending(self, state: Any, now: float) -> None:
+        pending = state.pending
+        if pending is None:
+            return
+        state.pending = None
+        method, sql, started = pending
+        self._record(method, sql, now - started)
+
+    def _record(self, method: str, sql: str, seconds: Optional[float]) -> None:
+        with self._lock:
+            stats = self._statements.get((method, sql))
+            if stats is None:
+                stats = self._statements[(method, sql)] = StatementStats(self.window)
+            stats.add(seconds)
+
+        if seconds is not None and seconds * 1000 >= self.slow_ms:
+            entry = {
+                'at': int(time.time()),
+                'method': method,
+                'sql': redact_sql(sql),
+                'ms': round(seconds * 1000, 3),
+            }
+            self.slow_log.append(entry)
+            log.warning(f"🐢 Slow query ({entry['ms']}ms) in {method}: {entry['sql']}")
+
+    # ==========================================================================
+    # 🔌 HOOKS
+    # ==========================================================================
+
+    def _on_statement(self, sql: str) -> None:
+        now = time.perf_counter()
+        state = self._state()
+        if state.muted:
+            return
+        if sql.startswith("BEGIN"):
+            # Implicit transaction start, issued before the statement that needs it
+            key = "BEGIN"
+        elif getattr(_statement, "fresh", False):
+            _statement.fresh = False
+            key = _statement.sql
+        elif getattr(_statement, "sql", None) is not None:
+            return  # Another row / trigger step of the current statement: keep timing it
+        else:
+            key = redact_sql(sql)  # Not issued through TracedCursor
+        self._finish_pending(state, now)
+        if state.stack:
+            state.pending = (state.stack[-1], key, now)
+        else:
+            self._record("-", key, None)
+
+    @property
+    def connection_class(self) -> type:
+        """`factory=` for sqlite3.connect; plain connections when tracing is off."""
+        return TracedConnection if self.enabled else sqlite3.Connection
+
+    def attach(self, conn: sqlite3.Connection) -> sqlite3.Connection:
+        """Install the trace callback on a connection."""
+        if self.enabled:
+            conn.set_trace_callback(self._on_statement)
+        return conn
+
+    def instrument(self, cls: type) -> type:
+        """Wrap every public method of `cls` so statements are attributed to it."""
+        for attr, func in list(vars(cls).items()):
+            if attr.startswith("_") or not callable(func) or getattr(func, "__traced__", False):
+                continue
+
+            def make_wrapper(method: Callable, method_name: str) -> Callable:
+                @functools.wraps(method)
+                def wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return method(*args, **kwargs)
+                    state = self._state()
+                    if state.muted or (not state.stack and self.sample < 1.0 and random.random() >= self.sample):
+                        # Unsampled call: its statements (and nested calls) go untraced
+                        state.muted += 1
+                        try:
+                            return method(*args, **kwargs)
+                        finally:
+                            state.muted -= 1
+                    state.stack.append(method_name)
+                    started = time.perf_counter()
+                    try:
+                        return method(*args, **kwargs)
+                    finally:
+                        now = time.perf_counter()
+                        self._finish_pending(state, now)
+                        state.stack.pop()
+                        with self._lock:
+                            stats = self._methods.get(method_name)
+                            if stats is None:
+                                stats = self._methods[method_name] = StatementStats(self.window)
+                            stats.add(now - started)
+                wrapper.__traced__ = True
+                return wrapper
+
+            setattr(cls, attr, make_wrapper(func, attr))
+        return cls
+
+    # ==========================================================================
+    # 📤 REPORTING
+    # ==========================================================================
+
+    def top_statements(self, limit: int = 20, sort: str = "total_ms") -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [
+                {'method': method, 'sql': sql, **stats.to_dict()}
+                for (method, sql), stats in self._statements.items()
+            ]
+        for row in rows:
+            row['sql'] = redact_sql(row['sql'])
+        rows.sort(key=lambda r: r.get(sort, 0), reverse=True)
+        return rows[:limit]
+
+    def top_methods(self, limit: int = 20, sort: str = "total_ms") -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [{'method': name, **stats.to_dict()} for name, stats in self._methods.items()]
+        rows.sort(key=lambda r: r.get(sort, 0), reverse=True)
+        return rows[:limit]
+
+    def report(self, limit: int = 20, sort: str = "total_ms") -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'sample': self.sample,
+            'slow_ms': self.slow_ms,
+            'methods': self.top_methods(limit, sort),
+            'statements': self.top_statements(limit, sort),
+            'slow_queries': list(self.slow_log)[-limit:][::-1],
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self._methods.clear()
+            self.slow_log.clear()
+
+# ==============================================================================
+# 🌍 GLOBAL TRACER
+# ==============================================================================
+
+tracer = QueryTracer()
@@ -0,0 +1,135 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - STATIC PAGE CACHE
+# Renders fixed public pages once per process into bytes, with strong ETags,
+# 304 revalidation and precompressed gzip/brotli variants
+# ==============================================================================
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+from flask import Response, request
+
+from config import Config
+from compression import PREFERRED_ENCODINGS, compress, negotiate
+from metrics import metrics, CACHE_REQUESTS
+
+# ==============================================================================
+# 🔧 LOGGING
+# ==============================================================================
+
+log = logging.getLogger("static_pages")
+
+# ==============================================================================
+# 📄 RENDERED PAGE
+# ==============================================================================
+
+_ETAG_SUFFIX = {"br": "-br", "gzip": "-gz"}
+
+
+class RenderedPage:
+    """One page rendered to bytes plus its precompressed variants."""
+
+    __slots__ = ("name", "variants", "etags")
+
+    def __init__(self, name: str, html: str):
+        body = html.encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:20]
+        self.name = name
+        self.variants: Dict[Optional[str], bytes] = {None: body}
+        self.etags: Dict[Optional[str], str] = {None: f'"{digest}"'}
+        for encoding in PREFERRED_ENCODINGS:
+            compressed = compress(body, encoding)
+            if len(compressed) < len(body):
+                self.variants[encoding] = compressed
+                # Each representation needs its own strong validator
+                self.etags[encoding] = f'"{digest}{_ETAG_SUFFIX[encoding]}"'
+
+    def sizes(self) -> Dict[str, int]:
+        return {encoding or "identity": len(body) for encoding, body in self.variants.items()}
+
+# ==============================================================================
+# 🗄️ CACHE
+# ==============================================================================
+
+class StaticPageCache:
+    """
+    Registry of pages whose HTML does not depend on the request.
+
+    Pages are rendered lazily on first hit (or eagerly via `warm`) and kept
+    until `invalidate`; a deploy restarts the process, which is the only
+    time the templates change.
+    """
+
+    def __init__(self, max_age: int = Config.STATIC_PAGE_MAX_AGE):
+        self.max_age = max_age
+        self._renderers: Dict[str, Callable[[], str]] = {}
+        self._pages: Dict[str, RenderedPage] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, render: Callable[[], str]) -> None:
+        self._renderers[name] = render
+
+    def page(self, name: str) -> RenderedPage:
+        page = self._pages.get(name)
+        if page is not None:
+            metrics.inc(CACHE_REQUESTS, cache="static_pages", result="hit")
+            return page
+        metrics.inc(CACHE_REQUESTS, cache="static_pages", result="miss")
+        with self._lock:
+            page = self._pages.get(name)
+            if page is None:
+                page = self._pages[name] = RenderedPage(name, self._renderers[name]())
+                log.info(f"📄 Pre-rendered {name}: {page.sizes()}")
+        return page
+
+    def warm(self, names: Optional[List[str]] = None) -> None:
+        """Render pages up front; needs an application context."""
+        for name in names or list(self._renderers):
+            try:
+                self.page(name)
+            except Exception as e:
+                log.warning(f"Could not pre-render {name}: {e}")
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._pages.clear()
+            else:
+                self._pages.pop(name, None)
+
+    def respond(self, name: str) -> Response:
+        """Serve a cached page for the current request, honouring If-None-Match."""
+        page = self.page(name)
+        encoding = negotiate(request.headers.get("Accept-Encoding"), [e for e in page.variants if e])
+        etag = page.etags[encoding]
+
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={self.max_age}, must-revalidate",
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("If-None-Match", "")
+        if if_none_match.strip() == "*" or etag in _etag_list(if_none_match):
+            return Response(status=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(page.variants[encoding], content_type="text/html; charset=utf-8", headers=headers)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: page.sizes() for name, page in self._pages.items()}
+
+
+def _etag_list(header: str) -> List[str]:
+    # Weak comparison per RFC 9110 for If-None-Match: ignore the W/ prefix
+    return [tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()]
+
+# ==============================================================================
+# 🌍 GLOBAL CACHE
+# ==============================================================================
+
+static_pages = StaticPageCache()
@@ -0,0 +1,435 @@
+# ==============================================================================
+# 🍌 BANANA HUB ENTERPRISE - SYNTHETIC DATASET GENERATOR
+# Seeded, production-shaped data for every table, written in large batched
+# transactions so benchmarks and query-plan checks can run at real scale
+#
+#   python synthetic_data.py --db data/synthetic.db --users 1000000 --analytics 20000000
+# ==============================================================================
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import math
+import os
+import random
+import secrets
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from migrations import run_migrations
+
+try:
+    import bcrypt
+    BCRYPT_AVAILABLE = True
+except ImportError:
+    BCRYPT_AVAILABLE = False
+
+# ==============================================================================
+# 🔧 LOGGING & CONSTANTS
+# ==============================================================================
+
+log = logging.getLogger("synthetic_data")
+
+SYNTHETIC_PASSWORD = "synthetic-password"
+DISCORD_EPOCH_MS = 1420070400000
+
+# (event_type, weight) — mirrors what the bot and website actually log
+EVENT_MIX: Sequence[Tuple[str, float]] = (
+    ("script_auth", 0.52),
+    ("login", 0.24),
+    ("web_login", 0.09),
+    ("trial_auth", 0.08),
+    ("hwid_reset", 0.04),
+    ("backup", 0.01),
+    ("redeem", 0.02),
+)
+
+EVENT_DETAILS = {
+    "script_auth": "Successful script authentication",
+    "login": "User logged in",
+    "web_login": "Web panel login (username/password)",
+    "trial_auth": "Trial authentication",
+    "hwid_reset": "HWID reset",
+    "backup": "Backup created",
+    "redeem": "Key redeemed",
+}
+
+NAME_PARTS = (
+    "banana", "shadow", "nova", "pixel", "frost", "blaze", "ghost", "lunar", "turbo", "ninja",
+    "echo", "viper", "storm", "zen", "cyber", "drift", "apex", "sonic", "rogue", "ember",
+)
+
+# ==============================================================================
+# 🎲 DISTRIBUTIONS
+# ==============================================================================
+
+class Generator:
+    """All sampling goes through one seeded RNG so runs are reproducible."""
+
+    def __init__(self, seed: int, now: Optional[int] = None, history_days: int = 540):
+        # Imported here, not at module level: importing database opens
+        # Config.DB_FILE, which callers only point at their scratch file
+        # after importing this module
+        from database import KEY_ALPHABET
+
+        self.rng = random.Random(seed)
+        self.key_alphabet = KEY_ALPHABET
+        self.now = now or int(time.time())
+        self.start = self.now - history_days * 86400
+        self._snowflake_seq = 0
+        # Bursts model update releases / promos that spike activity
+        self.bursts = sorted(self.rng.uniform(self.start, self.now) for _ in range(max(3, history_days // 21)))
+
+    def growth_timestamp(self) -> int:
+        """Signup-style timestamp skewed toward recent dates (growing user base)."""
+        return int(self.start + (self.now - self.start) * math.sqrt(self.rng.random()))
+
+    def between(self, low: int, high: int, recent_bias: float = 1.0) -> int:
+        if high <= low:
+            return low
+        return int(low + (high - low) * (self.rng.random() ** (1.0 / recent_bias)))
+
+    def bursty_timestamp(self, not_before: int) -> int:
+        """70% of events cluster around release bursts, the rest spread evenly, with a daily cycle."""
+        rng = self.rng
+        if rng.random() < 0.7:
+            center = rng.choice(self.bursts)
+            ts = center + rng.expovariate(1 / (36 * 3600))
+        else:
+            ts = rng.uniform(not_before, self.now)
+        # Evening-heavy daily cycle: nudge toward 18:00-23:00 UTC
+        if rng.random() < 0.4:
+            day = int(ts) - int(ts) % 86400
+            ts = day + rng.randint(18 * 3600, 23 * 3600 + 3599)
+        return int(min(max(ts, not_before), self.now))
+
+    def snowflake(self, at: int) -> int:
+        """Discord-style snowflake: ms timestamp << 22 | worker/process/sequence bits."""
+        self._snowflake_seq = (self._snowflake_seq + 1) & 0xFFF
+        ms = at * 1000 + self.rng.randrange(1000) - DISCORD_EPOCH_MS
+        return (max(ms, 0) << 22) | (self.rng.randrange(1 << 10) << 12) | self._snowflake_seq
+
+    def license_key(self) -> str:
+        rng = self.rng
+        return "BANANA-" + "-".join("".join(rng.choices(self.key_alphabet, k=3)) for _ in range(3))
+
+    def trial_key(self) -> str:
+        return f"TRIAL-{self.rng.getrandbits(32):08X}-{self.rng.getrandbits(32):08X}"
+
+    def hwid(self) -> str:
+        return f"{self.rng.getrandbits(128):032x}"
+
+    def ip(self) -> str:
+        rng = self.rng
+        # A few hot /16s (shared ISPs / VPNs) plus a long tail
+        if rng.random() < 0.3:
+            return f"{rng.choice((24, 73, 98, 172))}.{rng.choice((16, 58, 201))}.{rng.randrange(256)}.{rng.randrange(1, 255)}"
+        return f"{rng.randrange(1, 224)}.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}"
+
+    def username(self, index: int) -> str:
+        rng = self.rng
+        base = rng.choice(NAME_PARTS) + rng.choice(NAME_PARTS).capitalize()
+        return f"{base}{index}"
+
+    def events_for_user(self, mean: float) -> int:
+        """Heavy-tailed activity: most users are quiet, a few are very active."""
+        if mean <= 0:
+            return 0
+        alpha = 1.6
+        scale = mean * (alpha - 1) / alpha
+        return int(scale / (self.rng.random() ** (1 / alpha)))
+
+# ==============================================================================
+# 💾 BULK WRITING
+# ==============================================================================
+
+def _batched(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    batch: List[tuple] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_insert(conn: sqlite3.Connection, sql: str, rows: Iterable[tuple], batch_size: int, label: str) -> int:
+    """executemany in `batch_size` transactions; returns the rows written."""
+    total = 0
+    started = time.perf_counter()
+    for batch in _batched(rows, batch_size):
+        conn.execute("BEGIN")
+        conn.executemany(sql, batch)
+        conn.execute("COMMIT")
+        total += len(batch)
+        if total % (batch_size * 10) == 0:
+            log.info(f"   {label}: {total:,} rows ({total / (time.perf_counter() - started):,.0f}/s)")
+    log.info(f"✅ {label}: {total:,} rows in {time.perf_counter() - started:.1f}s")
+    return total
+
+
+def _password_hash(password: str) -> str:
+    # Same formats as Database.hash_password; computed once and shared by every account
+    if BCRYPT_AVAILABLE:
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    salt = secrets.token_hex(16)
+    return f"{salt}${hashlib.sha256((salt + password).encode()).hexdigest()}"
+
+# ==============================================================================
+# 🏭 DATASET
+# ==============================================================================
+
+def generate(
+    conn: sqlite3.Connection,
+    users: int = 10_000,
+    analytics: Optional[int] = None,
+    unused_keys: Optional[int] = None,
+    trials: Optional[int] = None,
+    trial_sessions: Optional[int] = None,
+    blacklist_ratio: float = 0.01,
+    account_ratio: float = 0.4,
+    email_codes: Optional[int] = None,
+    seed: int = 1337,
+    batch_size: int = 50_000,
+    now: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Populate every table on an already-migrated connection.
+
+    Unset counts are derived from `users` (e.g. ~20 analytics events per
+    user) so a single --users flag scales the whole dataset.
+    """
+    gen = Generator(seed, now=now)
+    rng = gen.rng
+    analytics = analytics if analytics is not None else users * 20
+    unused_keys = unused_keys if unused_keys is not None else users // 10
+    trials = trials if trials is not None else users // 4
+    trial_sessions = trial_sessions if trial_sessions is not None else users // 20
+    email_codes = email_codes if email_codes is not None else max(1, users // 200)
+    counts: Dict[str, int] = {}
+
+    conn.isolation_level = None
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-262144")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+    # ---- users + their redeemed keys -------------------------------------------
+    log.info(f"🌱 Generating {users:,} users")
+    user_ids: List[int] = []
+    joined_at: List[int] = []
+    user_rows: List[tuple] = []
+    used_key_rows: List[tuple] = []
+    for _ in range(users):
+        joined = gen.growth_timestamp()
+        discord_id = gen.snowflake(joined - rng.randrange(3 * 365 * 86400))
+        key = gen.license_key()
+        last_login = gen.between(joined, gen.now, recent_bias=3.0) if rng.random() < 0.7 else None
+        hwid = gen.hwid() if rng.random() < 0.6 else None
+        user_ids.append(discord_id)
+        joined_at.append(joined)
+        user_rows.append((discord_id, key, hwid, joined, last_login))
+        used_key_rows.append((key, 'admin', joined - rng.randrange(1, 7 * 86400), 1, discord_id, joined))
+
+    counts['users'] = bulk_insert(
+        conn, "INSERT OR IGNORE INTO users (discord_id, key, hwid, joined_at, last_login) VALUES (?, ?, ?, ?, ?)",
+        user_rows, batch_size, "users"
+    )
+    del user_rows
+
+    def unused_key_rows() -> Iterator[tuple]:
+        for _ in range(unused_keys):
+            yield (gen.license_key(), 'admin', gen.growth_timestamp(), 0, None, None)
+
+    counts['keys'] = bulk_insert(
+        conn, "INSERT OR IGNORE INTO keys (key, created_by, created_at, used, used_by, used_at) VALUES (?, ?, ?, ?, ?, ?)",
+        iter(used_key_rows), batch_size, "keys (redeemed)"
+    )
+    del used_key_rows
+    counts['keys'] += bulk_insert(
+        conn, "INSERT OR IGNORE INTO keys (key, created_by, created_at, used, used_by, used_at) VALUES (?, ?, ?, ?, ?, ?)",
+        unused_key_rows(), batch_size, "keys (unused)"
+    )
+
+    # ---- accounts ------------------------------------------------------------
+    password_hash = _password_hash(SYNTHETIC_PASSWORD)
+
+    def account_rows() -> Iterator[tuple]:
+        for index, (discord_id, joined) in enumerate(zip(user_ids, joined_at)):
+            if rng.random() < account_ratio:
+                name = gen.username(index)
+                yield (discord_id, f"{name.lower()}@example.com", 1, name, password_hash,
+                       gen.between(joined, gen.now, recent_bias=0.5))
+
+    counts['accounts'] = bulk_insert(
+        conn, "INSERT OR IGNORE INTO accounts (discord_id, email, email_verified, username, password_hash, created_at) "
+              "VALUES (?, ?, ?, ?, ?, ?)",
+        account_rows(), batch_size, "accounts"
+    )
+
+    # ---- blacklist -----------------------------------------------------------
+    reasons = ("Chargeback", "Key sharing", "Exploiting", "Spam", "Ban evasion", "No reason")
+
+    def blacklist_rows() -> Iterator[tuple]:
+        for discord_id, joined in zip(user_ids, joined_at):
+            if rng.random() < blacklist_ratio:
+                yield (discord_id, rng.choice(reasons), gen.between(joined, gen.now))
+
+    counts['blacklist'] = bulk_insert(
+        conn, "INSERT OR IGNORE INTO blacklist (discord_id, reason, banned_at) VALUES (?, ?, ?)",
+        blacklist_rows(), batch_size, "blacklist"
+    )
+
+    # ---- trials --------------------------------------------------------------
+    def trial_rows() -> Iterator[tuple]:
+        for _ in range(trials):
+            # Most trial users never buy; some converted and are registered users
+            if user_ids and rng.random() < 0.3:
+                discord_id = rng.choice(user_ids)
+            else:
+                discord_id = gen.snowflake(gen.growth_timestamp())
+            # ~15% still active
+            if rng.random() < 0.15:
+                created = gen.now - rng.randrange(24 * 3600)
+            else:
+                created = gen.growth_timestamp() - 24 * 3600
+            yield (gen.trial_key(), discord_id, created, created + 24 * 3600, gen.ip())
+
+    counts['trials'] = bulk_insert(
+        conn, "INSERT OR IGNORE INTO trials (key, discord_id, created_at, expires_at, ip_address) VALUES (?, ?, ?, ?, ?)",
+        trial_rows(), batch_size, "trials"
+    )
+
+    def session_rows() -> Iterator[tuple]:
+        for _ in range(trial_sessions):
+            created = gen.now - int(rng.expovariate(1 / 7200))
+            step1 = rng.random() < 0.7
+            step2 = step1 and rng.random() < 0.6
+            step3 = step2 and rng.random() < 0.8
+            yield (f"{rng.getrandbits(256):064x}",
+                   gen.snowflake(created), created, created + 30 * 60,
+                   int(step1), int(step2), int(step3), gen.ip())
+
+    counts['trial_sessions'] = bulk_insert(
+        conn, "INSERT OR IGNORE INTO trial_sessions "
+              "(token, discord_id, created_at, expires_at, step1_done, step2_done, step3_done, ip_address) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        session_rows(), batch_size, "trial_sessions"
+    )
+
+    def email_code_rows() -> Iterator[tuple]:
+        for _ in range(email_codes):
+            created = gen.now - rng.randrange(3600)
+            discord_id = gen.snowflake(created)
+            yield (discord_id, f"pending{discord_id % 100000}@example.com", f"{rng.randrange(10**6):06d}",
+                   created, created + 600)
+
+    counts['email_codes'] = bulk_insert(
+        conn, "INSERT INTO email_codes (discord_id, email, code, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+        email_code_rows(), batch_size, "email_codes"
+    )
+
+    # ---- analytics -----------------------------------------------------------
+    event_types = [e for e, _ in EVENT_MIX]
+    event_weights = [w for _, w in EVENT_MIX]
+    mean_per_user = analytics / users if users else 0
+
+    def analytics_rows() -> Iterator[tuple]:
+        produced = 0
+        while produced < analytics:
+            index = rng.randrange(len(user_ids)) if user_ids else None
+            discord_id = user_ids[index] if index is not None else None
+            not_before = joined_at[index] if index is not None else gen.start
+            ip = gen.ip()
+            for _ in range(min(gen.events_for_user(mean_per_user) or 1, analytics - produced)):
+                event = rng.choices(event_types, event_weights)[0]
+                yield (event, discord_id, ip, EVENT_DETAILS[event], gen.bursty_timestamp(not_before))
+                produced += 1
+
+    counts['analytics'] = bulk_insert(
+        conn, "INSERT INTO analytics (event_type, discord_id, ip_address, details, timestamp) VALUES (?, ?, ?, ?, ?)",
+        analytics_rows(), batch_size, "analytics"
+    )
+
+    log.info("📐 Running ANALYZE")
+    conn.execute("ANALYZE")
+    return counts
+
+
+def open_database(path: str, force: bool = False) -> sqlite3.Connection:
+    """Create (or replace, with force) a migrated database file."""
+    if os.path.exists(path):
+        if not force:
+            raise FileExistsError(f"{path} already exists (use --force to overwrite)")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    run_migrations(conn)
+    return conn
+
+# ==============================================================================
+# 🖥️ CLI
+# ==============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic Banana Hub database")
+    parser.add_argument("--db", default="data/synthetic.db", help="Output SQLite file")
+    parser.add_argument("--force", action="store_true", help="Overwrite an existing file")
+    parser.add_argument("--seed", type=int, default=1337, help="RNG seed (same seed = same dataset)")
+    parser.add_argument("--users", type=int, default=10_000, help="Registered users")
+    parser.add_argument("--analytics", type=int, default=None, help="Analytics events (default: 20 per user)")
+    parser.add_argument("--unused-keys", type=int, default=None, help="Unredeemed keys (default: 10%% of users)")
+    parser.add_argument("--trials", type=int, default=None, help="Trial keys (default: 25%% of users)")
+    parser.add_argument("--trial-sessions", type=int, default=None, help="Trial sessions (default: 5%% of users)")
+    parser.add_argument("--email-codes", type=int, default=None, help="Pending email codes")
+    parser.add_argument("--blacklist-ratio", type=float, default=0.01, help="Fraction of users blacklisted")
+    parser.add_argument("--account-ratio", type=float, default=0.4, help="Fraction of users with web accounts")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Rows per transaction")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try:
+        conn = open_database(args.db, force=args.force)
+    except FileExistsError as e:
+        log.error(f"❌ {e}")
+        return 1
+
+    # generate() imports database, whose global connection opens DB_FILE;
+    # point it at the output file rather than the live database
+    os.environ.setdefault("DB_FILE", os.path.abspath(args.db))
+
+    started = time.perf_counter()
+    try:
+        counts = generate(
+            conn,
+            users=args.users,
+            analytics=args.analytics,
+            unused_keys=args.unused_keys,
+            trials=args.trials,
+            trial_sessions=args.trial_sessions,
+            blacklist_ratio=args.blacklist_ratio,
+            account_ratio=args.account_ratio,
+            email_codes=args.email_codes,
+            seed=args.seed,
+            batch_size=args.batch_size,
+        )
+    finally:
+        conn.close()
+
+    log.info(f"🍌 Done in {time.perf_counter() - started:.1f}s: " + ", ".join(f"{k}={v:,}" for k, v in counts.items()))
+    log.info(f"   Accounts use the password: {SYNTHETIC_PASSWORD}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
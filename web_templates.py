@@ -3011,6 +3011,51 @@ ADMIN_PAGE = BASE_HTML.replace('{BODY_CONTENT}', """
                         </table>
                     </div>
                 </div>
+                
+                <div class="card" style="margin-top: 1.5rem;">
+                    <div class="card-header">
+                        <div class="card-icon">
+                            <i class="fas fa-stopwatch"></i>
+                        </div>
+                        <div>
+                            <div class="card-title">Slow Requests</div>
+                            <div class="card-subtitle">Slowest recent requests over {{ slow_request_threshold|int }}ms, by span</div>
+                        </div>
+                    </div>
+                    
+                    <div class="table-container" style="margin-top: 1.5rem;">
+                        <table>
+                            <thead>
+                                <tr>
+                                    <th>Request</th>
+                                    <th>Status</th>
+                                    <th>Total</th>
+                                    <th>Breakdown</th>
+                                </tr>
+                            </thead>
+                            <tbody>
+                                {% for req in slow_requests %}
+                                <tr>
+                                    <td style="font-family: monospace; font-size: 0.875rem;">{{ req.method }} {{ req.path }}</td>
+                                    <td style="font-size: 0.875rem;">{{ req.status }}</td>
+                                    <td style="font-size: 0.875rem;">{{ req.total_ms }}ms</td>
+                                    <td style="font-size: 0.75rem;">
+                                        {% for category, part in req.breakdown.items() %}
+                                        <span class="badge badge-primary">{{ category }} {{ part.ms }}ms &times;{{ part.count }}</span>
+                                        {% else %}
+                                        <span style="color: var(--text-muted);">-</span>
+                                        {% endfor %}
+                                    </td>
+                                </tr>
+                                {% else %}
+                                <tr>
+                                    <td colspan="4" style="font-size: 0.875rem; color: var(--text-muted);">No slow requests recorded</td>
+                                </tr>
+                                {% endfor %}
+                            </tbody>
+                        </table>
+                    </div>
+                </div>
             </div>
             
             <!-- ===== SETTINGS PAGE ===== -->
@@ -3507,6 +3552,8 @@ TRIAL_CHECKPOINT_PAGE = BASE_HTML.replace('{BODY_CONTENT}', """
 TEMPLATES = {
     'landing': LANDING_PAGE,
     'login': LOGIN_PAGE,
+    'redeem': REDEEM_PAGE,
+    'status': STATUS_PAGE,
     'dashboard': DASHBOARD_PAGE,
     'admin': ADMIN_PAGE,
     'trial': TRIAL_PAGE,
@@ -3515,4 +3562,4 @@ TEMPLATES = {
 }
 
 # Export all templates
-__all__ = ['TEMPLATES', 'LANDING_PAGE', 'LOGIN_PAGE', 'DASHBOARD_PAGE', 'ADMIN_PAGE', 'TRIAL_PAGE', 'TRIAL_DASHBOARD_PAGE']
+__all__ = ['TEMPLATES', 'LANDING_PAGE', 'LOGIN_PAGE', 'REDEEM_PAGE', 'STATUS_PAGE', 'DASHBOARD_PAGE', 'ADMIN_PAGE', 'TRIAL_PAGE', 'TRIAL_DASHBOARD_PAGE']
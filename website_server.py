@@ -7,8 +7,6 @@ from __future__ import annotations
 
 import logging
 import os
-import random
-import string
 import time
 import json
 import urllib.request
@@ -17,12 +15,21 @@ from datetime import datetime, UTC
 from functools import wraps
 from typing import Optional, Dict, Any, List
 
-from flask import Flask, render_template_string, request, jsonify, redirect, url_for, session
+from flask import Flask, Response, g, render_template_string, request, jsonify, redirect, url_for, session
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 from config import Config
-from database import db
+from database import db, generate_license_key
+from reaper import reaper
+from abuse_guard import trial_guard
+from metrics import metrics, HTTP_REQUESTS, HTTP_LATENCY, CACHE_REQUESTS
+from sql_trace import tracer
+from identity_map import begin_scope, end_scope, current_map
+from request_trace import begin_trace, end_trace, current_trace, span, traced, slow_requests
 from web_templates import TEMPLATES
+from static_pages import static_pages
+from compression import compressor
 
 # ==============================================================================
 # 🔧 LOGGING
@@ -48,6 +55,93 @@ app.config['SESSION_REFRESH_EACH_REQUEST'] = True
 
 CORS(app)
 
+# Behind Render's proxy remote_addr is the proxy; trust exactly its X-Forwarded-For hop
+if Config.TRUSTED_PROXY_HOPS > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.TRUSTED_PROXY_HOPS)
+
+# ==============================================================================
+# 📈 REQUEST METRICS
+# ==============================================================================
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None:
+        endpoint = request.endpoint or 'unmatched'
+        metrics.observe(HTTP_LATENCY, time.perf_counter() - started, endpoint=endpoint)
+        metrics.inc(HTTP_REQUESTS, endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
+
+# ==============================================================================
+# 🗺️ REQUEST-SCOPED IDENTITY MAP
+# ==============================================================================
+
+@app.before_request
+def _begin_identity_scope():
+    g.identity_map_token = begin_scope()
+    g.identity_map = current_map()
+
+
+@app.teardown_request
+def _end_identity_scope(exc=None):
+    token = g.pop('identity_map_token', None)
+    if token is not None:
+        end_scope(token)
+
+# ==============================================================================
+# ⏱️ REQUEST TRACING
+# ==============================================================================
+
+@app.before_request
+def _begin_request_trace():
+    g.request_trace_token = begin_trace(request.method, request.path)
+
+
+def _sees_server_timing() -> bool:
+    """
+    Span timings leak work done per request (e.g. whether /login ran bcrypt,
+    i.e. whether the account exists), so only admins get the header. The
+    cookie check avoids touching the session, which would add Vary: Cookie
+    to cacheable public pages.
+    """
+    if request.headers.get('X-Admin-Key') == Config.ADMIN_API_KEY:
+        return True
+    return app.config['SESSION_COOKIE_NAME'] in request.cookies and bool(session.get('is_admin'))
+
+
+@app.after_request
+def _emit_server_timing(response):
+    trace = current_trace()
+    if trace is not None:
+        total = trace.elapsed()
+        if Config.SERVER_TIMING and _sees_server_timing():
+            response.headers['Server-Timing'] = trace.server_timing(total)
+        slow_requests.offer(trace, total, response.status_code)
+    return response
+
+
+@app.teardown_request
+def _end_request_trace(exc=None):
+    token = g.pop('request_trace_token', None)
+    if token is not None:
+        end_trace(token)
+
+# ==============================================================================
+# 🗜️ RESPONSE COMPRESSION
+# Registered after the metrics and tracing hooks so it runs before them
+# (after_request is LIFO) and its cost shows up in their timings
+# ==============================================================================
+
+@app.after_request
+def _compress_response(response):
+    with span("compress"):
+        return compressor.process(response, request.headers.get('Accept-Encoding'))
+
 # ==============================================================================
 # 🛡️ AUTHENTICATION DECORATORS
 # ==============================================================================
@@ -80,19 +174,50 @@ def require_admin(f):
 # 🔧 HELPER FUNCTIONS
 # ==============================================================================
 
+def render_page(name: str, **context) -> str:
+    """Render one of the TEMPLATES inside a `render` span."""
+    with span("render", name):
+        return render_template_string(TEMPLATES[name], **context)
+
+
+# Public pages with no per-request data: rendered once, served from bytes
+for _page in ('landing', 'login', 'trial', 'redeem', 'status'):
+    static_pages.register(_page, lambda name=_page: render_page(name))
+
+
 def generate_key() -> str:
     """Generate a random license key in BANANA-XXX-XXX-XXX format."""
-    chars = string.ascii_uppercase + string.digits
-    part1 = ''.join(random.choices(chars, k=3))
-    part2 = ''.join(random.choices(chars, k=3))
-    part3 = ''.join(random.choices(chars, k=3))
-    return f'BANANA-{part1}-{part2}-{part3}'
+    return generate_license_key()
+
+
+def stream_keys_file(keys: List[str], created_by: str, chunk_size: int = 1000) -> Response:
+    """Stream a batch of keys back as a downloadable text file."""
+    generated_at = datetime.now(UTC)
+    
+    def generate():
+        yield (
+            f"Banana Hub License Keys - Generated by {created_by}\n"
+            f"Date: {generated_at.strftime('%Y-%m-%d %H:%M:%S UTC')}\n"
+            f"Total: {len(keys)} keys\n"
+            + "=" * 50 + "\n\n"
+        )
+        for i in range(0, len(keys), chunk_size):
+            yield "\n".join(keys[i:i + chunk_size]) + "\n"
+    
+    filename = f"banana_keys_{generated_at.strftime('%Y%m%d_%H%M%S')}.txt"
+    return Response(
+        generate(),
+        mimetype='text/plain',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
 
 
 _discord_profile_cache: Dict[str, Dict[str, Any]] = {}
 _discord_profile_cache_ttl = 300
+metrics.gauge("discord_profile_cache_entries", "Cached Discord profiles", lambda: len(_discord_profile_cache))
 
 
+@traced("discord")
 def _discord_api_request(path: str) -> Optional[Dict[str, Any]]:
     """Fetch Discord API JSON using bot token; returns None on failure."""
     token = getattr(Config, 'BOT_TOKEN', '') or os.getenv("BOT_TOKEN", "")
@@ -118,7 +243,9 @@ def get_discord_profile(user_id: str) -> Dict[str, str]:
     now = time.time()
     cached = _discord_profile_cache.get(user_id)
     if cached and (now - cached.get("ts", 0)) < _discord_profile_cache_ttl:
+        metrics.inc(CACHE_REQUESTS, cache="discord_profile", result="hit")
         return cached["data"]
+    metrics.inc(CACHE_REQUESTS, cache="discord_profile", result="miss")
 
     guild_id = getattr(Config, 'GUILD_ID', None) or os.getenv("GUILD_ID")
     profile = None
@@ -354,7 +481,7 @@ def get_system_stats() -> Dict[str, int]:
 def landing_page():
     """Landing page with modern design."""
     try:
-        return render_template_string(TEMPLATES['landing'])
+        return static_pages.respond('landing')
     except Exception as e:
         log.error(f"Landing page error: {e}", exc_info=True)
         return f"<h1>Error Loading Page</h1><pre>{str(e)}</pre>", 500
@@ -463,7 +590,7 @@ def login():
     
     # GET request - show login form
     try:
-        return render_template_string(TEMPLATES['login'])
+        return static_pages.respond('login')
     except Exception as e:
         log.error(f"Login page error: {e}", exc_info=True)
         return f"<h1>Error Loading Login</h1><pre>{str(e)}</pre>", 500
@@ -473,7 +600,7 @@ def login():
 def trial_page():
     """Free 24-hour trial page."""
     try:
-        return render_template_string(TEMPLATES['trial'])
+        return static_pages.respond('trial')
     except Exception as e:
         log.error(f"Trial page error: {e}", exc_info=True)
         return f"<h1>Error Loading Trial</h1><pre>{str(e)}</pre>", 500
@@ -491,13 +618,12 @@ def trial_dashboard():
         if not trial:
             return "<h1>Invalid trial key</h1>", 404
 
-        expires_at = trial.get('expires_at')
-        if expires_at and datetime.fromisoformat(expires_at) <= datetime.now(UTC):
+        if not trial.get('active'):
             return "<h1>Trial expired</h1>", 403
 
         website_url = getattr(Config, 'WEBSITE_URL', 'https://banana-hub.onrender.com')
-        return render_template_string(
-            TEMPLATES['trial_dashboard'],
+        return render_page(
+            'trial_dashboard',
             trial=trial,
             website_url=website_url
         )
@@ -515,6 +641,18 @@ def logout():
     return redirect(url_for('index'))
 
 
+def trial_limited(rule: str, retry_after: int):
+    """429 for a trial start refused by the abuse guard."""
+    hours = max(1, round(retry_after / 3600))
+    response = jsonify({
+        'success': False,
+        'error': f'Too many trials started from your {"account" if rule == "discord_id" else "network"}. Try again in about {hours}h.',
+        'retry_after': retry_after,
+    })
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 429
+
+
 @app.route('/api/trial/start', methods=['POST'])
 def api_trial_start():
     """Start the Linkvertise trial flow (step 1)."""
@@ -528,6 +666,10 @@ def api_trial_start():
         if not discord_id.isdigit():
             return jsonify({'success': False, 'error': 'Invalid Discord ID'}), 400
 
+        # Networks over their limit are turned away before any database work
+        denial = trial_guard.check(request.remote_addr)
+        if denial:
+            return trial_limited(*denial)
 
         # If user already has an active trial, return it
         active = db.get_active_trial_by_user(discord_id)
@@ -543,9 +685,14 @@ def api_trial_start():
         if not links.get("step1") or not links.get("step2"):
             return jsonify({'success': False, 'error': 'Linkvertise not configured'}), 500
 
+        denial = trial_guard.check(request.remote_addr, discord_id)
+        if denial:
+            return trial_limited(*denial)
+
         token = db.create_trial_session(discord_id, request.remote_addr)
         if not token:
             return jsonify({'success': False, 'error': 'Failed to start trial flow (Rate limited?)'}), 500
+        trial_guard.record(request.remote_addr, discord_id)
 
         session['trial_token'] = token
         session['trial_discord_id'] = discord_id
@@ -604,8 +751,8 @@ def trial_checkpoint(step):
         if not next_url:
             return "<h1>Error: Step URL not configured</h1>", 500
 
-        return render_template_string(
-            TEMPLATES['checkpoint'],
+        return render_page(
+            'checkpoint',
             step=step,
             percent=percent,
             next_url=next_url
@@ -704,11 +851,11 @@ def trial_step3():
 
 @app.route('/redeem')
 def redeem_page():
-    return render_template_string(TEMPLATES['redeem'])
+    return static_pages.respond('redeem')
 
 @app.route('/status')
 def status_page():
-    return render_template_string(TEMPLATES['status'])
+    return static_pages.respond('status')
 
 @app.route('/api/redeem', methods=['POST'])
 def api_redeem():
@@ -785,8 +932,8 @@ def dashboard(page='overview'):
         website_url = getattr(Config, 'WEBSITE_URL', 'https://banana-hub.onrender.com')
         
         # Render dashboard template
-        return render_template_string(
-            TEMPLATES['dashboard'],
+        return render_page(
+            'dashboard',
             user=user_data,
             analytics=analytics,
             loader_script=loader_script,
@@ -869,8 +1016,8 @@ def admin_panel(page='dashboard'):
         website_url = getattr(Config, 'WEBSITE_URL', 'https://banana-hub.onrender.com')
         
         # Render admin template
-        return render_template_string(
-            TEMPLATES['admin'],
+        return render_page(
+            'admin',
             users=users,
             recent_users=users[:20] if users else [],
             unused_keys=unused_keys,
@@ -878,6 +1025,8 @@ def admin_panel(page='dashboard'):
             recent_keys=all_keys[:20] if all_keys else [],
             blacklisted=blacklisted,
             stats=stats,
+            slow_requests=slow_requests.slowest(20),
+            slow_request_threshold=slow_requests.threshold_ms,
             base_url=base_url,
             website_url=website_url
         )
@@ -937,8 +1086,7 @@ def api_verify():
         # Check trial key if user not registered
         trial = db.get_trial_by_key(key)
         if trial and str(trial.get('discord_id')) == str(user_id):
-            expires_at = trial.get('expires_at')
-            if expires_at and datetime.fromisoformat(expires_at) <= datetime.now(UTC):
+            if not trial.get('active'):
                 return jsonify({"success": False, "error": "Trial expired"}), 403
             db.log_event("trial_auth", user_id, request.remote_addr, "Trial authentication")
             return jsonify({"success": True, "message": "Trial Authenticated", "user_id": user_id, "trial": True})
@@ -949,8 +1097,7 @@ def api_verify():
         # Allow trial key for registered users too
         trial = db.get_trial_by_key(key)
         if trial and str(trial.get('discord_id')) == str(user_id):
-            expires_at = trial.get('expires_at')
-            if expires_at and datetime.fromisoformat(expires_at) <= datetime.now(UTC):
+            if not trial.get('active'):
                 return jsonify({"success": False, "error": "Trial expired"}), 403
             db.log_event("trial_auth", user_id, request.remote_addr, "Trial authentication")
             return jsonify({"success": True, "message": "Trial Authenticated", "user_id": user_id, "trial": True})
@@ -1010,6 +1157,80 @@ def api_admin_users():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/admin/users/page')
+@require_admin
+def api_admin_users_page():
+    """Cursor-paginated user listing; pass back `next_cursor` to get the following page, or `offset` to jump."""
+    try:
+        limit = request.args.get('limit', 10, type=int)
+        cursor = request.args.get('cursor') or None
+        offset = request.args.get('offset', 0, type=int)
+        try:
+            page = db.get_users_page(limit=limit, cursor=cursor, offset=offset)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        result = {'success': True, **page}
+        if request.args.get('include_total') in ('1', 'true'):
+            result['total'] = db.count_users()
+        return jsonify(result)
+        
+    except Exception as e:
+        log.error(f"Users page API error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def _search_bound(value: Optional[str], end_of_day: bool = False) -> Optional[int]:
+    """Epoch seconds from `YYYY-MM-DD` or a raw epoch; a bare date as an upper bound covers that whole day."""
+    if not value:
+        return None
+    if value.isdigit():
+        return int(value)
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=UTC)
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD or epoch seconds")
+    return int(day.timestamp()) + (86400 if end_of_day else 0)
+
+
+@app.route('/api/admin/search')
+@require_admin
+def api_admin_search():
+    """Full-text search over analytics details (reports, feedback, broadcasts, admin notes)."""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'success': False, 'error': 'Missing q'}), 400
+        event_types = [t.strip() for t in request.args.get('type', '').split(',') if t.strip()]
+        order = request.args.get('sort', 'rank')
+        if order not in ('rank', 'recent'):
+            order = 'rank'
+        
+        started = time.perf_counter()
+        try:
+            results = db.search_analytics(
+                query,
+                event_types=event_types or None,
+                since=_search_bound(request.args.get('since')),
+                until=_search_bound(request.args.get('until'), end_of_day=True),
+                limit=request.args.get('limit', 25, type=int),
+                order=order
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        return jsonify({
+            'success': True,
+            'results': results,
+            'count': len(results),
+            'took_ms': round((time.perf_counter() - started) * 1000, 2),
+        })
+        
+    except Exception as e:
+        log.error(f"Search API error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/admin/stats')
 @app.route('/api/stats')
 @require_admin
@@ -1033,18 +1254,20 @@ def api_status_check():
 @app.route('/api/generate-key', methods=['POST'])
 @require_admin
 def api_generate_key():
-    """Generate new license keys."""
+    """Generate new license keys.
+    
+    Accepts `count` (up to Config.KEY_BATCH_LIMIT) and an optional `format`
+    of `json` or `txt`. Batches above Config.KEY_FILE_THRESHOLD default to a
+    streamed text file.
+    """
     try:
-        data = request.get_json() or {}
-        count = min(int(data.get('count', 1)), 25)
-        
-        keys = []
-        admin_user = session.get('user_id', 'admin')
+        data = request.get_json(silent=True) or {}
+        count = max(1, min(int(data.get('count', 1)), Config.KEY_BATCH_LIMIT))
+        admin_user = str(session.get('user_id', 'admin'))
         
-        for _ in range(count):
-            key = generate_key()
-            if db.generate_key_entry(key, admin_user):
-                keys.append(key)
+        keys = db.mint_keys(count, admin_user)
+        if not keys:
+            return jsonify({'success': False, 'error': 'Failed to generate keys'}), 500
         
         try:
             db.log_event('key_generated', admin_user, request.remote_addr, f'Generated {len(keys)} keys')
@@ -1053,6 +1276,13 @@ def api_generate_key():
         
         log.info(f"Generated {len(keys)} keys by {admin_user}")
         
+        output_format = data.get('format') or request.args.get('format')
+        if not output_format:
+            output_format = 'txt' if len(keys) > Config.KEY_FILE_THRESHOLD else 'json'
+        
+        if output_format == 'txt':
+            return stream_keys_file(keys, admin_user)
+        
         return jsonify({'success': True, 'keys': keys, 'count': len(keys)})
         
     except Exception as e:
@@ -1067,11 +1297,14 @@ def api_whitelist_user():
     """Whitelist a user with auto-generated key."""
     try:
         data = request.get_json() or {}
-        discord_id = data.get('discord_id', '').strip()
+        discord_id = str(data.get('discord_id') or '').strip()
         
         if not discord_id:
             return jsonify({'error': 'Discord ID required'}), 400
         
+        if not discord_id.isdigit():
+            return jsonify({'error': 'Invalid Discord ID'}), 400
+        
         # Check if user already exists
         existing = db.get_user(discord_id)
         if existing and existing.get('key'):
@@ -1344,6 +1577,82 @@ def api_create_backup():
         log.error(f"Backup error: {e}")
         return jsonify({'error': str(e)}), 500
 
+
+@app.route('/metrics')
+@require_admin
+def prometheus_metrics():
+    """Prometheus scrape endpoint."""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.route('/api/admin/queries', methods=['GET', 'DELETE'])
+@require_admin
+def api_query_stats():
+    """Top SQL offenders by method and statement; DELETE resets the aggregates."""
+    try:
+        if request.method == 'DELETE':
+            tracer.reset()
+            return jsonify({'success': True})
+        limit = max(1, min(request.args.get('limit', 20, type=int), 200))
+        sort = request.args.get('sort', 'total_ms')
+        if sort not in ('total_ms', 'p95_ms', 'max_ms', 'avg_ms', 'count'):
+            sort = 'total_ms'
+        return jsonify(tracer.report(limit=limit, sort=sort))
+    except Exception as e:
+        log.error(f"Query stats API error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/admin/slow-requests', methods=['GET', 'DELETE'])
+@require_admin
+def api_slow_requests():
+    """Recent slow requests with their span breakdowns; DELETE clears the buffer."""
+    try:
+        if request.method == 'DELETE':
+            slow_requests.reset()
+            return jsonify({'success': True})
+        limit = max(1, min(request.args.get('limit', 20, type=int), 200))
+        order = request.args.get('order', 'slowest')
+        entries = slow_requests.recent(limit) if order == 'recent' else slow_requests.slowest(limit)
+        return jsonify({
+            'threshold_ms': slow_requests.threshold_ms,
+            'sampled': slow_requests.sampled,
+            'requests': entries,
+        })
+    except Exception as e:
+        log.error(f"Slow requests API error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/admin/reaper', methods=['GET', 'POST'])
+@require_admin
+def api_reaper():
+    """Expiry reaper metrics; POST runs a sweep immediately."""
+    try:
+        if request.method == 'POST':
+            return jsonify({'success': True, 'run': reaper.run_once()})
+        return jsonify(reaper.stats())
+    except Exception as e:
+        log.error(f"Reaper API error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/admin/trial-guard', methods=['GET', 'DELETE'])
+@require_admin
+def api_trial_guard():
+    """Trial abuse guard counters and busiest keys; DELETE ?key= unblocks an IP, subnet or Discord ID."""
+    try:
+        if request.method == 'DELETE':
+            key = request.args.get('key', '').strip()
+            if not key:
+                return jsonify({'success': False, 'error': 'Missing key'}), 400
+            return jsonify({'success': True, 'removed': trial_guard.forget(key)})
+        hottest = max(1, min(request.args.get('hottest', 10, type=int), 100))
+        return jsonify(trial_guard.stats(hottest))
+    except Exception as e:
+        log.error(f"Trial guard API error: {e}")
+        return jsonify({'error': str(e)}), 500
+
 # ==============================================================================
 # 📜 SCRIPT SERVING ROUTES
 # ==============================================================================
@@ -1531,6 +1840,10 @@ def run_server():
     log.info("=" * 70)
     log.info("✅ Server starting...")
     
+    reaper.start()
+    trial_guard.warm_up()
+    with app.app_context():
+        static_pages.warm()
     app.run(host='0.0.0.0', port=port, debug=debug_mode)
 
 